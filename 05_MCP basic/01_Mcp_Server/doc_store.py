@@ -0,0 +1,487 @@
+"""
+Document store for the DocumentMCP server.
+
+Readers work on immutable snapshots: an edit builds the next snapshot,
+copying only the index entries it touches, and publishes it with one
+reference swap. A reader never waits for a writer and never sees half an
+edit. Every document has a version number that grows with each edit, and
+an inverted index answers full-text searches ranked with BM25.
+
+Bodies are kept in memory as UTF-8 by default. Given a path, they are
+appended to a data file that is memory-mapped for reading, so the corpus
+can be larger than RAM (the OS pages bodies in and out); a journal next to
+it records where each version of each document starts, so the store
+reopens where it left off. Only the index lives in memory. Edits append,
+so old versions pile up in the file until compact() rewrites it with the
+current versions only (done automatically once the file outgrows them).
+
+Byte ranges, line ranges and chunks of a body are memoryview slices of the
+bytes or of the mapped file, so serving part of a large document never
+materializes the rest of it.
+"""
+
+import functools
+import heapq
+import itertools
+import json
+import math
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+TOKEN = re.compile(r"\w+")
+# BM25 parameters: term-frequency saturation and document-length normalization
+K1 = 1.2
+B = 0.75
+SNIPPET_CHARS = 160
+# Bytes of a body scanned at a time when indexing its lines
+LINE_SCAN_BLOCK = 1 << 20
+# Data files smaller than this are never compacted automatically
+COMPACT_MIN_BYTES = 1 << 20
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words of a text, as indexed and searched"""
+    return TOKEN.findall(text.lower())
+
+
+class VersionConflict(Exception):
+    """An edit expected a different version than the current one"""
+
+    def __init__(self, doc_id: str, expected: int, current: int):
+        super().__init__(f"Document '{doc_id}' is at version {current}, not {expected}")
+        self.doc_id = doc_id
+        self.expected = expected
+        self.current = current
+
+
+class MappedFile:
+    """Append-only file of document bodies, memory-mapped for reading"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a+b")
+        self._lock = threading.Lock()
+        self._map: Optional[mmap.mmap] = None
+        self._remap()
+
+    def _remap(self):
+        size = os.fstat(self._file.fileno()).st_size
+        # The previous map stays valid for views still using it and is freed with them
+        self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ) if size else None
+
+    @property
+    def size(self) -> int:
+        return len(self._map) if self._map is not None else 0
+
+    def append(self, blobs: List[bytes]) -> List[int]:
+        """Write bodies at the end of the file and return their offsets"""
+        with self._lock:
+            offset = os.fstat(self._file.fileno()).st_size
+            offsets = []
+            for blob in blobs:
+                offsets.append(offset)
+                self._file.write(blob)
+                offset += len(blob)
+            self._file.flush()
+            self._remap()
+            return offsets
+
+    def buffer(self) -> Union[mmap.mmap, bytes]:
+        """The current map, covering every body written so far"""
+        return self._map if self._map is not None else b""
+
+    def close(self):
+        # Open views keep their own map alive; only the file handle is released
+        self._map = None
+        self._file.close()
+
+
+@dataclass(frozen=True)
+class Document:
+    """One version of a document; its body is bytes or a range of a MappedFile"""
+
+    doc_id: str
+    version: int
+    size: int
+    body: Union[bytes, MappedFile]
+    offset: int = 0
+
+    def _buffer(self) -> Tuple[Union[bytes, mmap.mmap], int]:
+        """The buffer holding the body and where the body starts in it"""
+        if isinstance(self.body, bytes):
+            return self.body, 0
+        return self.body.buffer(), self.offset
+
+    def view(self) -> memoryview:
+        """The UTF-8 body without copying it"""
+        buffer, start = self._buffer()
+        return memoryview(buffer)[start:start + self.size]
+
+    def text(self) -> str:
+        return str(self.view(), "utf-8")
+
+    @functools.cached_property
+    def line_starts(self) -> array:
+        """Byte offset of every line, found once per document version"""
+        buffer, start = self._buffer()
+        starts = array("q", [0])
+        for block in range(0, self.size, LINE_SCAN_BLOCK):
+            parts = buffer[start + block:start + min(block + LINE_SCAN_BLOCK, self.size)].split(b"\n")
+            # Each line but the block's last ends in a newline; the next line starts after it
+            starts.extend(itertools.islice(
+                itertools.accumulate(map(len, parts[:-1]), lambda offset, length: offset + length + 1, initial=block),
+                1, None,
+            ))
+        if len(starts) > 1 and starts[-1] == self.size:
+            starts.pop()  # a final newline does not start another line
+        return starts
+
+    def byte_range(self, start: int, stop: Optional[int] = None) -> memoryview:
+        """Bytes [start, stop) of the body, clamped to its size"""
+        return self.view()[max(start, 0):stop]
+
+    def line_range(self, start: int, stop: Optional[int] = None) -> memoryview:
+        """Lines [start, stop) of the body (0-based), with their line breaks"""
+        starts = self.line_starts
+        start = min(max(start, 0), len(starts))
+        stop = len(starts) if stop is None else min(max(stop, start), len(starts))
+        begin = starts[start] if start < len(starts) else self.size
+        end = starts[stop] if stop < len(starts) else self.size
+        return self.view()[begin:end]
+
+    def chunk(self, offset: int, size: int) -> Tuple[memoryview, int]:
+        """
+        The chunk of at most `size` bytes starting at `offset`. It ends after
+        the last line break in that window, or else on a character boundary,
+        so every chunk decodes on its own.
+
+        Returns:
+            The chunk and the offset of the next one (the body size at the end)
+        """
+        if not 0 <= offset <= self.size:
+            raise ValueError(f"offset {offset} is outside the document")
+        end = min(offset + max(size, 4), self.size)
+        if end < self.size:
+            buffer, start = self._buffer()
+            newline = buffer.rfind(b"\n", start + offset, start + end)
+            if newline != -1:
+                end = newline + 1 - start
+            else:
+                view = self.view()
+                # Do not split a UTF-8 sequence: back up over continuation bytes
+                while end > offset + 1 and view[end] & 0xC0 == 0x80:
+                    end -= 1
+        return self.view()[offset:end], end
+
+
+class Snapshot:
+    """
+    The documents and index at one point in time. Never modified once
+    published; apply() returns the next snapshot.
+    """
+
+    __slots__ = ("documents", "postings", "lengths", "total_tokens")
+
+    def __init__(
+        self,
+        documents: Dict[str, Document],
+        postings: Dict[str, Dict[str, int]],
+        lengths: Dict[str, int],
+        total_tokens: int
+    ):
+        self.documents = documents
+        # term -> {doc_id: occurrences}
+        self.postings = postings
+        # doc_id -> number of tokens
+        self.lengths = lengths
+        self.total_tokens = total_tokens
+
+    @classmethod
+    def empty(cls) -> "Snapshot":
+        return cls({}, {}, {}, 0)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def get(self, doc_id: str) -> Optional[Document]:
+        return self.documents.get(doc_id)
+
+    def ids(self) -> List[str]:
+        return list(self.documents)
+
+    def apply(self, changes: Iterable[Tuple[Document, str]]) -> "Snapshot":
+        """
+        Next snapshot with each (document, text) added or replacing its
+        previous version. Top-level tables are copied once; a term's postings
+        are copied only if a change touches the term.
+        """
+        documents = dict(self.documents)
+        postings = dict(self.postings)
+        lengths = dict(self.lengths)
+        total_tokens = self.total_tokens
+        copied = set()
+
+        def update(term: str, doc_id: str, count: int):
+            if term not in copied:
+                postings[term] = dict(postings.get(term, ()))
+                copied.add(term)
+            if count:
+                postings[term][doc_id] = count
+            else:
+                postings[term].pop(doc_id, None)
+
+        for document, text in changes:
+            previous = documents.get(document.doc_id)
+            old_counts = Counter(tokenize(previous.text())) if previous is not None else Counter()
+            new_counts = Counter(tokenize(text))
+            for term in old_counts.keys() - new_counts.keys():
+                update(term, document.doc_id, 0)
+            for term, count in new_counts.items():
+                if old_counts.get(term) != count:
+                    update(term, document.doc_id, count)
+            total_tokens += sum(new_counts.values()) - lengths.get(document.doc_id, 0)
+            lengths[document.doc_id] = sum(new_counts.values())
+            documents[document.doc_id] = document
+        for term in copied:
+            if not postings[term]:
+                del postings[term]
+        return Snapshot(documents, postings, lengths, total_tokens)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Document, float]]:
+        """Documents matching any query word, best BM25 score first"""
+        if not self.documents:
+            return []
+        count = len(self.documents)
+        average_length = max(self.total_tokens / count, 1.0)
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            matches = self.postings.get(term)
+            if not matches:
+                continue
+            idf = math.log(1 + (count - len(matches) + 0.5) / (len(matches) + 0.5))
+            for doc_id, frequency in matches.items():
+                norm = K1 * (1 - B + B * self.lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (K1 + 1) / (frequency + norm)
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.documents[doc_id], score) for doc_id, score in best]
+
+
+def snippet(document: Document, query: str, width: int = SNIPPET_CHARS) -> str:
+    """Text around the first query word in a document, or its beginning"""
+    words = sorted(set(tokenize(query)), key=len, reverse=True)
+    view = document.view()
+    start = 0
+    if words:
+        pattern = re.compile(b"|".join(re.escape(word.encode()) for word in words), re.IGNORECASE)
+        # Searches the bytes in place; a large body is not decoded
+        match = pattern.search(view)
+        if match:
+            start = max(match.start() - width // 4, 0)
+    text = str(view[start:start + width * 4], "utf-8", errors="ignore")[:width]
+    return ("..." if start else "") + text.strip() + ("..." if start + len(text.encode()) < document.size else "")
+
+
+class DocumentStore:
+    """Versioned documents with copy-on-write snapshots and a full-text index"""
+
+    def __init__(self, path: Optional[str] = None, compact_ratio: float = 2.0):
+        """
+        Args:
+            path: Data file for on-disk mode (the journal is path + ".journal");
+                documents are kept in memory when omitted
+            compact_ratio: Compact the data file after an edit once it is this
+                many times the size of the current versions (0 disables it)
+        """
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.compactions = 0
+        # Size of the current versions, against which the data file is compacted
+        self._live_bytes = 0
+        self._write_lock = threading.Lock()
+        self._snapshot = Snapshot.empty()
+        self._file: Optional[MappedFile] = None
+        self._journal = None
+        if path:
+            self._open(path)
+
+    def _open(self, path: str):
+        self._finish_compaction(path)
+        self._file = MappedFile(path)
+        latest: Dict[str, Document] = {}
+        journal_path = path + ".journal"
+        if os.path.exists(journal_path):
+            with open(journal_path) as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # a torn last line from a crash
+                    if entry["offset"] + entry["size"] <= self._file.size:
+                        latest[entry["id"]] = Document(
+                            entry["id"], entry["version"], entry["size"], self._file, entry["offset"]
+                        )
+        self._journal = open(journal_path, "a")
+        self._snapshot = Snapshot.empty().apply((document, document.text()) for document in latest.values())
+        self._live_bytes = sum(document.size for document in latest.values())
+
+    @staticmethod
+    def _finish_compaction(path: str):
+        """
+        Complete or discard a compaction interrupted by a crash. The renamed
+        journal is its commit point: once it exists the new files are whole.
+        """
+        journal_path = path + ".journal"
+        if os.path.exists(journal_path + ".compact"):
+            if os.path.exists(path + ".compact"):
+                os.replace(path + ".compact", path)
+            os.replace(journal_path + ".compact", journal_path)
+        for leftover in (path + ".compact", journal_path + ".compact.tmp"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    def compact(self) -> int:
+        """
+        Rewrite the data file and journal with the current version of each
+        document only. Readers keep working on the old file until they drop
+        their snapshot.
+
+        Returns:
+            Bytes reclaimed (0 in memory mode)
+        """
+        if self._file is None:
+            return 0
+        with self._write_lock:
+            return self._compact()
+
+    def _compact(self) -> int:
+        path, journal_path = self.path, self.path + ".journal"
+        current = self._snapshot
+        before = self._file.size
+
+        with open(path + ".compact", "wb") as data:
+            entries, offset = [], 0
+            for document in current.documents.values():
+                data.write(document.view())
+                entries.append((document, offset))
+                offset += document.size
+            data.flush()
+            os.fsync(data.fileno())
+        with open(journal_path + ".compact.tmp", "w") as journal:
+            for document, offset in entries:
+                journal.write(json.dumps({
+                    "id": document.doc_id, "version": document.version,
+                    "offset": offset, "size": document.size,
+                }) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(journal_path + ".compact.tmp", journal_path + ".compact")
+
+        self._journal.close()
+        self._finish_compaction(path)
+        # The old MappedFile is not closed: snapshots still in use read from it
+        # and it is released with the last of them
+        self._file = MappedFile(path)
+        self._journal = open(journal_path, "a")
+        documents = {
+            document.doc_id: Document(document.doc_id, document.version, document.size, self._file, offset)
+            for document, offset in entries
+        }
+        # Same texts, so the index is shared with the previous snapshot
+        self._snapshot = Snapshot(documents, current.postings, current.lengths, current.total_tokens)
+        self.compactions += 1
+        return before - self._file.size
+
+    def snapshot(self) -> Snapshot:
+        """The current documents; stays consistent however long it is used"""
+        return self._snapshot
+
+    def get(self, doc_id: str) -> Optional[Document]:
+        return self._snapshot.get(doc_id)
+
+    def ids(self) -> List[str]:
+        return self._snapshot.ids()
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Document, float]]:
+        return self._snapshot.search(query, limit)
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def put(self, doc_id: str, text: str, expected_version: Optional[int] = None) -> Document:
+        """
+        Create or replace a document.
+
+        Args:
+            doc_id: Document ID
+            text: New content
+            expected_version: If given, the edit only applies while the document
+                is at this version (0 for "does not exist yet")
+
+        Returns:
+            The new version of the document
+
+        Raises:
+            VersionConflict: The document changed since expected_version
+        """
+        return self.put_many([(doc_id, text)], {doc_id: expected_version} if expected_version is not None else None)[0]
+
+    def put_many(self, items: Iterable[Tuple[str, str]], expected_versions: Optional[Dict[str, int]] = None) -> List[Document]:
+        """Create or replace several documents, published as one snapshot"""
+        items = list(items)
+        with self._write_lock:
+            current = self._snapshot
+            versions: Dict[str, int] = {}
+            for doc_id, _ in items:
+                if doc_id not in versions:
+                    previous = current.get(doc_id)
+                    versions[doc_id] = previous.version if previous is not None else 0
+                    expected = (expected_versions or {}).get(doc_id)
+                    if expected is not None and expected != versions[doc_id]:
+                        raise VersionConflict(doc_id, expected, versions[doc_id])
+
+            blobs = [text.encode("utf-8") for _, text in items]
+            offsets = self._file.append(blobs) if self._file is not None else [0] * len(blobs)
+            changes = []
+            for (doc_id, text), blob, offset in zip(items, blobs, offsets):
+                versions[doc_id] += 1
+                body = self._file if self._file is not None else blob
+                changes.append((Document(doc_id, versions[doc_id], len(blob), body, offset), text))
+
+            if self._journal is not None:
+                for document, _ in changes:
+                    self._journal.write(json.dumps({
+                        "id": document.doc_id, "version": document.version,
+                        "offset": document.offset, "size": document.size,
+                    }) + "\n")
+                self._journal.flush()
+            self._snapshot = current.apply(changes)
+            for doc_id in versions:
+                previous = current.get(doc_id)
+                self._live_bytes += self._snapshot.get(doc_id).size - (previous.size if previous is not None else 0)
+            if self._file is not None and self.compact_ratio and self._file.size >= COMPACT_MIN_BYTES:
+                if self._file.size > self.compact_ratio * self._live_bytes:
+                    self._compact()
+            return [document for document, _ in changes]
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "documents": len(snapshot),
+            "terms": len(snapshot.postings),
+            "tokens": snapshot.total_tokens,
+            "mode": "mmap" if self._file is not None else "memory",
+            "data_bytes": self._file.size if self._file is not None else sum(d.size for d in snapshot.documents.values()),
+            "compactions": self.compactions,
+        }
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+        if self._file is not None:
+            self._file.close()
@@ -4,13 +4,29 @@ Testing Your Resources
 You can test resources using the MCP Inspector. Start your server with:
 
         `uv run mcp dev mcp_server.py`
+
+Documents live in a DocumentStore (doc_store.py): in memory by default, or
+memory-mapped on disk when DOCS_STORE_PATH is set. Large documents can be
+read by line or byte range, or chunk by chunk with a cursor.
 """
 
+import base64
+import json
+import os
+from typing import Optional
+
 from mcp.server.fastmcp import FastMCP
 from fastapi import FastAPI
+
+from doc_store import DocumentStore, VersionConflict, snippet
+
 mcp = FastMCP("DocumentMCP", log_level="ERROR")
 
+# Page size of read_doc_chunk, decided by the server as with MCP pagination
+CHUNK_BYTES = int(os.getenv("DOCS_CHUNK_BYTES", "65536"))
 
+
+# Seed documents, added when the store is empty
 docs = {
     "deposition.md": "This deposition covers the testimony of Angela Smith, P.E.",
     "report.pdf": "The report details the state of a 20m condenser tower.",
@@ -20,25 +36,105 @@ docs = {
     "spec.txt": "These specifications define the technical requirements for the equipment.",
 }
 
+store = DocumentStore(os.getenv("DOCS_STORE_PATH") or None)
+if not len(store):
+    store.put_many(docs.items())
+
+
+def check_line_range(start: int, end: Optional[int]):
+    """Reject line ranges that are not 1-based and in order, rather than returning nothing"""
+    if start < 1 or (end is not None and end < start):
+        raise ValueError(f"Invalid line range: start {start}, end {end} (lines are 1-based and start <= end)")
+
+
+def encode_cursor(doc_id: str, version: int, offset: int) -> str:
+    """Opaque cursor for the next chunk of one version of a document"""
+    return base64.urlsafe_b64encode(json.dumps([doc_id, version, offset]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, int, int]:
+    try:
+        doc_id, version, offset = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(doc_id), int(version), int(offset)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+
 
 # ✅ Tool: Read a document
 @mcp.tool(
         name="read_doc",
-        description="Read the contents of a document by ID"
+        description="Read the contents of a document by ID, or only lines start_line to end_line (1-based, inclusive)"
+        )
+def read_doc(doc_id: str, start_line: Optional[int] = None, end_line: Optional[int] = None) -> str:
+    document = store.get(doc_id)
+    if document is None:
+        return "Document not found."
+    if start_line is None and end_line is None:
+        return document.text()
+    start = 1 if start_line is None else start_line
+    check_line_range(start, end_line)
+    return str(document.line_range(start - 1, end_line), "utf-8")
+
+# ✅ Tool: Read a large document chunk by chunk
+@mcp.tool(
+        name="read_doc_chunk",
+        description="Read a document one chunk at a time. Call without a cursor for the first chunk, "
+                    "then pass nextCursor until it is missing."
         )
-def read_doc(doc_id: str) -> str:
-    return docs.get(doc_id, "Document not found.")
+def read_doc_chunk(doc_id: str, cursor: Optional[str] = None) -> dict:
+    document = store.get(doc_id)
+    if document is None:
+        raise ValueError("Document not found.")
+    offset = 0
+    if cursor is not None:
+        cursor_doc, version, offset = decode_cursor(cursor)
+        if cursor_doc != doc_id or not 0 <= offset <= document.size:
+            raise ValueError("Invalid cursor")
+        if version != document.version:
+            raise ValueError(f"Document '{doc_id}' changed since this cursor was issued; start again without a cursor")
+    chunk, next_offset = document.chunk(offset, CHUNK_BYTES)
+    result = {
+        "doc_id": doc_id,
+        "version": document.version,
+        "start": offset,
+        "end": next_offset,
+        "size": document.size,
+        "text": str(chunk, "utf-8"),
+    }
+    if next_offset < document.size:
+        result["nextCursor"] = encode_cursor(doc_id, document.version, next_offset)
+    return result
 
 # ✅ Tool: Edit a document
 @mcp.tool(
         name="edit_doc",
-        description="Edit the contents of a document"
+        description="Edit the contents of a document. Pass expected_version "
+                    "(from search_docs) to only apply the edit if nobody changed it since."
         )
-def edit_doc(doc_id: str, new_content: str) -> str:
-    if doc_id in docs:
-        docs[doc_id] = new_content
-        return f"Document '{doc_id}' updated successfully."
-    return "Document not found."
+def edit_doc(doc_id: str, new_content: str, expected_version: Optional[int] = None) -> str:
+    if store.get(doc_id) is None:
+        return "Document not found."
+    try:
+        document = store.put(doc_id, new_content, expected_version)
+    except VersionConflict as e:
+        return f"Not updated: {e}."
+    return f"Document '{doc_id}' updated successfully (version {document.version})."
+
+# ✅ Tool: Full-text search
+@mcp.tool(
+        name="search_docs",
+        description="Search the documents' text; returns the best matches with their version and a snippet"
+        )
+def search_docs(query: str, limit: int = 10) -> list[dict]:
+    return [
+        {
+            "doc_id": document.doc_id,
+            "version": document.version,
+            "score": round(score, 4),
+            "snippet": snippet(document, query),
+        }
+        for document, score in store.search(query, max(1, min(limit, 100)))
+    ]
 
 # ✅ Resource: Return all doc IDs
 @mcp.resource(
@@ -46,15 +142,42 @@ def edit_doc(doc_id: str, new_content: str) -> str:
         mime_type="application/json"
     )
 def list_doc_ids() -> list[str]:
-    return list(docs.keys())
+    return store.ids()
 
 # ✅ Resource: Return contents of a particular doc
 @mcp.resource(
-        "docs://documents",
-        mime_type="application/json"
+        "docs://documents/{doc_id}",
+        mime_type="text/plain"
         )
 def get_doc_content(doc_id: str) -> str:
-    return docs.get(doc_id, "Document not found.")
+    document = store.get(doc_id)
+    return document.text() if document else "Document not found."
+
+# ✅ Resource: Lines start to end of a doc (1-based, inclusive)
+@mcp.resource(
+        "docs://documents/{doc_id}/lines/{start}-{end}",
+        mime_type="text/plain"
+        )
+def get_doc_lines(doc_id: str, start: int, end: int) -> str:
+    document = store.get(doc_id)
+    if document is None:
+        raise ValueError("Document not found.")
+    check_line_range(start, end)
+    return str(document.line_range(start - 1, end), "utf-8")
+
+# ✅ Resource: Bytes start to end of a doc (0-based, inclusive, like an HTTP Range)
+@mcp.resource(
+        "docs://documents/{doc_id}/bytes/{start}-{end}",
+        mime_type="application/octet-stream"
+        )
+def get_doc_bytes(doc_id: str, start: int, end: int) -> bytes:
+    document = store.get(doc_id)
+    if document is None:
+        raise ValueError("Document not found.")
+    if start < 0 or end < start:
+        raise ValueError(f"Invalid byte range {start}-{end}")
+    # Only the requested slice is copied, for base64 encoding
+    return document.byte_range(start, end + 1).tobytes()
 
 # ✅ Prompt: Rewrite a doc in markdown format
 @mcp.prompt(
@@ -0,0 +1,209 @@
+"""
+Load test: throughput of a stateful MCP server against its number of workers.
+
+For each worker count, starts router.py with that many workers of the app
+and drives it over TCP from several client processes, so that the load
+generator is not the single-core bottleneck itself. Every simulated client
+opens its own stateful session (initialize + initialized notification),
+calls a tool back to back on it, and deletes the session at the end.
+Reports requests/s, p50/p95/p99 latency, the speedup over the first
+worker count, and how the router spread the requests over the workers.
+
+Run from this directory:
+
+    uv run python load_test.py --workers 1 2 4 --clients 32 --requests 50
+    uv run python load_test.py --workers 4 --routers 2 --store sqlite
+    uv run python load_test.py --app ../05_Tool_Progress/server.py:mcp_app --tool count_numbers --arguments '{"n": 2}'
+
+Throughput only scales while there are idle cores: the workers, the
+router(s) and the client processes all share the host.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+from multiprocessing.pool import Pool
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+PROTOCOL_VERSION = "2025-06-18"
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+ROUTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "router.py")
+
+
+def parse_response(response: httpx.Response) -> Dict[str, Any]:
+    """Final JSON-RPC message of a JSON or SSE response (notifications come first)"""
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        messages = [line[5:] for line in response.text.splitlines() if line.startswith("data:")]
+        if not messages:
+            raise ValueError("no data in event stream")
+        return json.loads(messages[-1])
+    return response.json()
+
+
+async def run_session(
+    http: httpx.AsyncClient, tool: str, arguments: Dict[str, Any], requests: int, samples: List[Tuple[float, bool]]
+):
+    """One MCP session: initialize, `requests` tool calls, delete"""
+    response = await http.post("/mcp", headers=HEADERS, json={
+        "jsonrpc": "2.0", "id": 0, "method": "initialize",
+        "params": {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "multi-worker-load", "version": "1.0"},
+        },
+    })
+    response.raise_for_status()
+    headers = dict(HEADERS, **{
+        "mcp-session-id": response.headers["mcp-session-id"],
+        "mcp-protocol-version": PROTOCOL_VERSION,
+    })
+    await http.post("/mcp", headers=headers, json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+    try:
+        for request_id in range(1, requests + 1):
+            start = time.perf_counter()
+            try:
+                response = await http.post("/mcp", headers=headers, json={
+                    "jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+                    "params": {"name": tool, "arguments": arguments},
+                })
+                result = parse_response(response).get("result")
+                ok = response.status_code == 200 and result is not None and not result.get("isError")
+            except (httpx.HTTPError, ValueError):
+                ok = False
+            samples.append((time.perf_counter() - start, ok))
+    finally:
+        await http.delete("/mcp", headers=headers)
+
+
+async def run_sessions(url: str, sessions: int, tool: str, arguments: Dict[str, Any], requests: int):
+    samples: List[Tuple[float, bool]] = []
+    limits = httpx.Limits(max_connections=sessions, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120.0) as http:
+        start = time.time()
+        results = await asyncio.gather(
+            *(run_session(http, tool, arguments, requests, samples) for _ in range(sessions)), return_exceptions=True
+        )
+        end = time.time()
+    failed_sessions = sum(isinstance(result, BaseException) for result in results)
+    return start, end, samples, failed_sessions
+
+
+def client_process(job: Tuple[str, int, str, Dict[str, Any], int]):
+    """Entry point of one load-generating process"""
+    url, sessions, tool, arguments, requests = job
+    return asyncio.run(run_sessions(url, sessions, tool, arguments, requests))
+
+
+def start_router(args: argparse.Namespace, workers: int) -> subprocess.Popen:
+    router = subprocess.Popen([
+        sys.executable, ROUTER, args.app, "--workers", str(workers), "--routers", str(args.routers),
+        "--store", args.store, "--port", str(args.port),
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=os.path.dirname(ROUTER))
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if router.poll() is not None:
+            raise RuntimeError("router exited during start-up")
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}/router/stats", timeout=1.0).status_code == 200:
+                return router
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    stop_router(router)
+    raise RuntimeError("router did not start")
+
+
+def stop_router(router: subprocess.Popen):
+    if router.poll() is None:
+        router.send_signal(signal.SIGINT)
+    try:
+        router.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        router.kill()
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile (0-100) of already sorted values"""
+    if not ordered:
+        return math.nan
+    return ordered[max(math.ceil(p / 100 * len(ordered)), 1) - 1]
+
+
+def run(args: argparse.Namespace, workers: int, pool: Pool) -> Dict[str, Any]:
+    url = f"http://127.0.0.1:{args.port}"
+    router = start_router(args, workers)
+    try:
+        # Sessions split as evenly as possible over the client processes
+        processes = min(args.processes, args.clients)
+        jobs = [
+            (url, args.clients // processes + (index < args.clients % processes), args.tool, args.arguments, args.requests)
+            for index in range(processes)
+        ]
+        results = pool.map(client_process, jobs)
+        # The stats of one router process; with --routers > 1 it is a sample
+        spread = [worker["requests"] for worker in httpx.get(f"{url}/router/stats").json()["workers"]]
+    finally:
+        stop_router(router)
+
+    elapsed = max(end for _, end, _, _ in results) - min(start for start, _, _, _ in results)
+    samples = [sample for _, _, process_samples, _ in results for sample in process_samples]
+    latencies = sorted(latency for latency, _ in samples)
+    return {
+        "workers": workers,
+        "requests": len(samples),
+        "errors": sum(not ok for _, ok in samples),
+        "failed_sessions": sum(failed for _, _, _, failed in results),
+        "ops": len(samples) / elapsed if elapsed > 0 else math.nan,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "worker_requests": spread,
+    }
+
+
+def main(args: argparse.Namespace):
+    logging.disable(logging.INFO)
+    results = []
+    print(f"{'workers':>8}{'requests':>10}{'errors':>8}{'ops/s':>10}{'speedup':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  per worker")
+    with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+        for workers in args.workers:
+            result = run(args, workers, pool)
+            result["speedup"] = result["ops"] / results[0]["ops"] if results else 1.0
+            results.append(result)
+            print(
+                f"{workers:>8}{result['requests']:>10}{result['errors']:>8}{result['ops']:>10.0f}{result['speedup']:>8.2f}x"
+                f"{result['p50'] * 1e3:>10.1f}{result['p95'] * 1e3:>10.1f}{result['p99'] * 1e3:>10.1f}"
+                f"  {result['worker_requests']}"
+            )
+
+    if args.output:
+        settings = {key: value for key, value in vars(args).items() if key != "output"}
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "multi_worker_load", "cpus": os.cpu_count(), "settings": settings, "cases": results}, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="server:mcp_app", help="stateful MCP app to serve (see router.py)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to compare")
+    parser.add_argument("--routers", type=int, default=1, help="router processes")
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory", help="session store")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent MCP sessions")
+    parser.add_argument("--requests", type=int, default=50, help="tool calls per session")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="load-generating processes")
+    parser.add_argument("--tool", default="count_primes", help="tool to call")
+    parser.add_argument("--arguments", type=json.loads, default={"limit": 50000}, help="tool arguments as JSON")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="write results to this JSON file")
+    main(parser.parse_args())
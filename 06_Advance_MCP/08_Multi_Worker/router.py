@@ -0,0 +1,353 @@
+"""
+Session-affinity router: one port in front of several worker processes of a
+stateful MCP server.
+
+The MCP SDK keeps a stateful session in the memory of the process that
+created it, so a `stateless_http=False` server cannot simply be started
+with `uvicorn --workers N`: the kernel would spread a session's requests
+over processes that have never seen it. This router starts N uvicorn
+workers of the app, each on its own Unix socket, and proxies to them:
+
+* a request without an mcp-session-id (initialize) goes to the worker with
+  the fewest open sessions, and the session id of the response is recorded
+  in the session store (session_store.py);
+* every later request of that session -- POSTs, the GET event stream,
+  client responses to server requests such as roots/list, DELETE -- goes
+  to the same worker;
+* responses are streamed through, so progress and log notifications
+  arrive as they are sent.
+
+Run from this directory (the app is module:attribute or path/to/file.py:attribute):
+
+    uv run python router.py server:mcp_app --workers 4
+    uv run python router.py ../05_Tool_Progress/server.py:mcp_app --workers 4 --port 8000
+
+A single router process can saturate before the workers do; several
+routers share the port when they share a SQLite session store:
+
+    uv run python router.py server:mcp_app --workers 4 --routers 2 --store sqlite
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from session_store import SessionStore, store_from_env
+
+SESSION_HEADER = "mcp-session-id"
+# What the SDK answers for a session id it does not know
+UNKNOWN_SESSION = b"Bad Request: No valid session ID provided"
+# Connection-level headers are not forwarded; bodies are re-framed by each hop
+HOP_BY_HOP = {
+    "connection", "keep-alive", "proxy-connection", "te", "trailer",
+    "transfer-encoding", "upgrade", "content-length",
+}
+AFFINITY_CACHE_SIZE = 65536
+
+
+class AffinityRouter:
+    """Proxies MCP requests to the worker that owns their session"""
+
+    def __init__(self, sockets: List[str], store: SessionStore, path: str = "/mcp", session_ttl: float = 86400.0):
+        """
+        Args:
+            sockets: Unix socket path of each worker
+            store: Where session -> worker affinity is recorded
+            path: MCP endpoint path of the workers' app
+            session_ttl: Seconds after which abandoned (never deleted) sessions are forgotten
+        """
+        self.sockets = sockets
+        self.store = store
+        self.path = path
+        self.session_ttl = session_ttl
+        self.clients = [
+            httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(uds=socket),
+                base_url="http://mcp-worker",
+                # Event streams stay open as long as the tool runs
+                timeout=httpx.Timeout(30.0, read=None),
+            )
+            for socket in sockets
+        ]
+        self.open_sessions = [0] * len(sockets)
+        self.requests = [0] * len(sockets)
+        self.sessions_created = 0
+        self.unknown_sessions = 0
+        self.worker_errors = 0
+        self._affinity: "OrderedDict[str, int]" = OrderedDict()
+        self._next = 0
+        self._purger: Optional[asyncio.Task] = None
+
+    async def _call_store(self, method: str, *args: Any) -> Any:
+        # Shared stores do file I/O; keep it off the event loop
+        if self.store.shared:
+            return await asyncio.to_thread(getattr(self.store, method), *args)
+        return getattr(self.store, method)(*args)
+
+    def _remember(self, session_id: str, worker: int):
+        self._affinity[session_id] = worker
+        self._affinity.move_to_end(session_id)
+        if len(self._affinity) > AFFINITY_CACHE_SIZE:
+            self._affinity.popitem(last=False)
+
+    async def owner(self, session_id: str) -> Optional[int]:
+        """Worker of a session; a session never moves, so lookups are cached"""
+        worker = self._affinity.get(session_id)
+        if worker is None:
+            worker = await self._call_store("get", session_id)
+            if worker is not None:
+                self._remember(session_id, worker)
+        return worker
+
+    async def forget(self, session_id: str, worker: int):
+        self._affinity.pop(session_id, None)
+        if await self._call_store("delete", session_id):
+            self.open_sessions[worker] = max(self.open_sessions[worker] - 1, 0)
+
+    async def forget_worker(self, worker: int):
+        """Drop every session of a worker that no longer accepts connections"""
+        for session_id in [key for key, owner in self._affinity.items() if owner == worker]:
+            del self._affinity[session_id]
+        await self._call_store("delete_worker", worker)
+        self.open_sessions[worker] = 0
+
+    def candidates(self) -> List[int]:
+        """Workers for a new session: fewest open sessions first, rotating among ties"""
+        count = len(self.clients)
+        start, self._next = self._next, (self._next + 1) % count
+        order = [(start + offset) % count for offset in range(count)]
+        return sorted(order, key=lambda worker: self.open_sessions[worker])
+
+    async def handle(self, request: Request) -> Response:
+        session_id = request.headers.get(SESSION_HEADER)
+        if session_id is None:
+            workers = self.candidates()
+        else:
+            worker = await self.owner(session_id)
+            if worker is None:
+                self.unknown_sessions += 1
+                return Response(UNKNOWN_SESSION, status_code=400)
+            workers = [worker]
+
+        body = await request.body()
+        headers = [(key, value) for key, value in request.headers.items() if key not in HOP_BY_HOP]
+        # "/mcp/" and "/mcp" both reach the app's endpoint without a redirect
+        path = self.path + (f"?{request.url.query}" if request.url.query else "")
+        for worker in workers:
+            client = self.clients[worker]
+            try:
+                upstream = await client.send(
+                    client.build_request(request.method, path, headers=headers, content=body), stream=True
+                )
+                break
+            except httpx.TransportError as e:
+                self.worker_errors += 1
+                if isinstance(e, httpx.ConnectError):
+                    # The worker is gone, and all its sessions with it
+                    await self.forget_worker(worker)
+                elif session_id is not None:
+                    await self.forget(session_id, worker)
+                if session_id is not None:
+                    return Response(UNKNOWN_SESSION, status_code=400)
+        else:
+            return JSONResponse(
+                {"jsonrpc": "2.0", "id": None, "error": {"code": -32603, "message": "No MCP worker available"}},
+                status_code=502,
+            )
+        self.requests[worker] += 1
+
+        if session_id is None:
+            new_session = upstream.headers.get(SESSION_HEADER)
+            if new_session and upstream.status_code < 400:
+                await self._call_store("put", new_session, worker)
+                self._remember(new_session, worker)
+                self.open_sessions[worker] += 1
+                self.sessions_created += 1
+        elif upstream.status_code == 404 or (request.method == "DELETE" and upstream.status_code < 300):
+            await self.forget(session_id, worker)
+        elif upstream.status_code == 400:
+            content = await upstream.aread()
+            await upstream.aclose()
+            if content.startswith(UNKNOWN_SESSION):
+                # The worker restarted since the session was created
+                await self.forget(session_id, worker)
+            return Response(content, status_code=400, headers=self._response_headers(upstream))
+
+        return StreamingResponse(
+            self._relay(upstream), status_code=upstream.status_code, headers=self._response_headers(upstream)
+        )
+
+    @staticmethod
+    def _response_headers(upstream: httpx.Response) -> Dict[str, str]:
+        return {key: value for key, value in upstream.headers.items() if key.lower() not in HOP_BY_HOP}
+
+    @staticmethod
+    async def _relay(upstream: httpx.Response) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in upstream.aiter_raw():
+                yield chunk
+        finally:
+            await upstream.aclose()
+
+    async def _purge_expired(self):
+        while True:
+            await asyncio.sleep(min(self.session_ttl, 3600.0))
+            await self._call_store("purge", time.time() - self.session_ttl)
+            self._affinity.clear()
+            # Abandoned sessions never reach forget(): recount from the store
+            counts = await self._call_store("counts")
+            self.open_sessions = [counts.get(worker, 0) for worker in range(len(self.clients))]
+
+    async def start(self):
+        self._purger = asyncio.create_task(self._purge_expired())
+
+    async def close(self):
+        if self._purger is not None:
+            self._purger.cancel()
+        for client in self.clients:
+            await client.aclose()
+        self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "workers": [
+                {"socket": path, "requests": requests, "open_sessions": sessions}
+                for path, requests, sessions in zip(self.sockets, self.requests, self.open_sessions)
+            ],
+            "sessions_created": self.sessions_created,
+            "unknown_sessions": self.unknown_sessions,
+            "worker_errors": self.worker_errors,
+            "store": type(self.store).__name__,
+        }
+
+
+def create_app() -> Starlette:
+    """
+    Router app configured from the environment (so each `uvicorn --workers`
+    process builds its own): MCP_ROUTER_SOCKETS (worker sockets separated
+    by os.pathsep), MCP_ROUTER_PATH (default /mcp), MCP_SESSION_TTL and the
+    store settings read by store_from_env().
+    """
+    sockets = [path for path in os.environ["MCP_ROUTER_SOCKETS"].split(os.pathsep) if path]
+    path = os.getenv("MCP_ROUTER_PATH", "/mcp")
+    router = AffinityRouter(sockets, store_from_env(), path, float(os.getenv("MCP_SESSION_TTL", "86400")))
+
+    async def router_stats(request: Request) -> Response:
+        return JSONResponse(router.stats())
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        await router.start()
+        try:
+            yield
+        finally:
+            await router.close()
+
+    methods = ["GET", "POST", "DELETE"]
+    return Starlette(
+        routes=[
+            Route(path, router.handle, methods=methods),
+            Route(path.rstrip("/") + "/", router.handle, methods=methods),
+            Route("/router/stats", router_stats),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def start_workers(app: str, count: int, socket_dir: str, log_level: str = "warning") -> List[subprocess.Popen]:
+    """
+    Start `count` uvicorn processes of `app` on Unix sockets in socket_dir
+    and wait until they all listen.
+    """
+    target, _, attribute = app.rpartition(":")
+    app_dir = "."
+    if target.endswith(".py"):
+        app_dir, target = os.path.dirname(os.path.abspath(target)), os.path.basename(target)[:-3]
+
+    workers = []
+    for index in range(count):
+        path = os.path.join(socket_dir, f"worker-{index}.sock")
+        if os.path.exists(path):
+            os.unlink(path)
+        workers.append(subprocess.Popen([
+            sys.executable, "-m", "uvicorn", f"{target}:{attribute}",
+            "--app-dir", app_dir, "--uds", path, "--log-level", log_level, "--no-access-log",
+        ]))
+
+    deadline = time.monotonic() + 30
+    for index, worker in enumerate(workers):
+        path = os.path.join(socket_dir, f"worker-{index}.sock")
+        while not os.path.exists(path):
+            if worker.poll() is not None or time.monotonic() > deadline:
+                stop_workers(workers)
+                raise RuntimeError(f"worker {index} of {app} did not start")
+            time.sleep(0.05)
+    return workers
+
+
+def stop_workers(workers: List[subprocess.Popen]):
+    for worker in workers:
+        if worker.poll() is None:
+            worker.send_signal(signal.SIGINT)
+    for worker in workers:
+        try:
+            worker.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            worker.kill()
+
+
+def main(args: argparse.Namespace):
+    if args.routers > 1 and args.store == "memory":
+        sys.exit("several routers need a shared session store: use --store sqlite")
+
+    socket_dir = tempfile.mkdtemp(prefix="mcp-workers-")
+    workers = start_workers(args.app, args.workers, socket_dir, args.log_level)
+    os.environ["MCP_ROUTER_SOCKETS"] = os.pathsep.join(
+        os.path.join(socket_dir, f"worker-{index}.sock") for index in range(args.workers)
+    )
+    os.environ["MCP_ROUTER_PATH"] = args.path
+    os.environ["MCP_SESSION_STORE"] = args.store
+    if args.store == "sqlite":
+        os.environ.setdefault("MCP_SESSION_STORE_PATH", os.path.join(socket_dir, "sessions.sqlite3"))
+        # Sessions recorded by an earlier run point at workers that no longer have them
+        store_from_env().purge(float("inf"))
+    print(f"routing {args.host}:{args.port}{args.path} to {args.workers} worker(s) of {args.app}")
+    try:
+        uvicorn.run(
+            "router:create_app", factory=True, host=args.host, port=args.port, workers=args.routers,
+            log_level=args.log_level, access_log=False,
+            app_dir=os.path.dirname(os.path.abspath(__file__)),
+        )
+    finally:
+        stop_workers(workers)
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("app", help="stateful MCP app, module:attribute or path/to/file.py:attribute")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="MCP server processes")
+    parser.add_argument("--routers", type=int, default=1, help="router processes sharing the port")
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory", help="session store")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--path", default="/mcp", help="MCP endpoint path of the app")
+    parser.add_argument("--log-level", default="warning")
+    main(parser.parse_args())
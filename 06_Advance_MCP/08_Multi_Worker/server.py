@@ -0,0 +1,47 @@
+"""
+MCP Multi-Worker Demo Server
+A stateful server with a CPU-bound tool that logs and reports progress,
+used to show a stateful MCP server scaling across worker processes.
+
+    uv run python router.py server:mcp_app --workers 4
+"""
+import math
+import os
+
+from mcp.server.fastmcp import FastMCP, Context
+
+mcp = FastMCP("Multi-Worker Demo Server", stateless_http=False)
+
+
+@mcp.tool()
+async def count_primes(limit: int, ctx: Context, chunks: int = 4) -> dict:
+    """
+    Count the primes below `limit`, reporting progress along the way.
+
+    Args:
+        limit: Upper bound (exclusive), at most 10,000,000
+        chunks: Number of progress notifications
+
+    Returns:
+        The number of primes and the worker process that counted them
+    """
+    limit = max(2, min(limit, 10_000_000))
+    await ctx.info(f"Counting primes below {limit} in process {os.getpid()}")
+
+    root = math.isqrt(limit - 1)
+    every = max(1, root // max(1, chunks))
+    sieve = bytearray([1]) * limit
+    sieve[0] = sieve[1] = 0
+    for p in range(2, root + 1):
+        if sieve[p]:
+            # Pure Python holds the GIL: one worker process uses one core
+            for multiple in range(p * p, limit, p):
+                sieve[multiple] = 0
+        if p % every == 0:
+            await ctx.report_progress(progress=p, total=root)
+
+    return {"limit": limit, "primes": sum(sieve), "worker_pid": os.getpid()}
+
+
+# Setup the HTTP app; router.py runs several of these behind one port
+mcp_app = mcp.streamable_http_app()
@@ -0,0 +1,194 @@
+"""
+Session stores for the session-affinity router (router.py).
+
+A stateful MCP session is a live object -- its streams, tasks and pending
+server-to-client requests -- in the worker process that created it, so it
+cannot be handed to another process. What the router has to share is where
+each session lives: the store maps the mcp-session-id header to the worker
+that answered the session's initialize request.
+
+In-process memory is the default, for a single router process; the SQLite
+store (WAL mode) is shared by several router processes on one host.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class SessionStore:
+    """
+    Storage interface for session -> worker affinity.
+
+    Times are wall-clock (time.time()) so that entries written by one
+    process are interpreted correctly by another.
+    """
+
+    # Whether other processes see the same sessions (and calls may block on I/O)
+    shared = False
+
+    def get(self, session_id: str) -> Optional[int]:
+        """Index of the worker that owns the session, or None if unknown"""
+        raise NotImplementedError
+
+    def put(self, session_id: str, worker: int):
+        """Record the worker that created a session"""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> bool:
+        """Forget a session; returns whether it was known"""
+        raise NotImplementedError
+
+    def delete_worker(self, worker: int) -> int:
+        """Forget every session of a worker (it was restarted); returns how many"""
+        raise NotImplementedError
+
+    def purge(self, created_before: float) -> int:
+        """Forget sessions created before a time; returns how many"""
+        raise NotImplementedError
+
+    def counts(self) -> Dict[int, int]:
+        """Number of sessions per worker"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release files and connections"""
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process dictionary, for a single router process"""
+
+    def __init__(self):
+        self._sessions: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[int]:
+        entry = self._sessions.get(session_id)
+        return None if entry is None else entry[0]
+
+    def put(self, session_id: str, worker: int):
+        with self._lock:
+            self._sessions[session_id] = (worker, time.time())
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def delete_worker(self, worker: int) -> int:
+        with self._lock:
+            stale = [key for key, (owner, _) in self._sessions.items() if owner == worker]
+            for key in stale:
+                del self._sessions[key]
+            return len(stale)
+
+    def purge(self, created_before: float) -> int:
+        with self._lock:
+            stale = [key for key, (_, created_at) in self._sessions.items() if created_at < created_before]
+            for key in stale:
+                del self._sessions[key]
+            return len(stale)
+
+    def counts(self) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for worker, _ in list(self._sessions.values()):
+            counts[worker] = counts.get(worker, 0) + 1
+        return counts
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite session table in WAL mode, shared by every router process on the host.
+
+    Each thread gets its own connection. A session's worker never changes,
+    so routers cache lookups and only reads of unknown ids reach the file.
+    """
+
+    shared = True
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Database file path
+        """
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS mcp_sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " worker INTEGER NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS mcp_sessions_worker ON mcp_sessions(worker)")
+        conn.execute("CREATE INDEX IF NOT EXISTS mcp_sessions_created ON mcp_sessions(created_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, session_id: str) -> Optional[int]:
+        row = self._conn().execute(
+            "SELECT worker FROM mcp_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, session_id: str, worker: int):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO mcp_sessions (session_id, worker, created_at) VALUES (?, ?, ?)",
+                (session_id, worker, time.time()),
+            )
+
+    def delete(self, session_id: str) -> bool:
+        conn = self._conn()
+        with conn:
+            return conn.execute("DELETE FROM mcp_sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+
+    def delete_worker(self, worker: int) -> int:
+        conn = self._conn()
+        with conn:
+            return conn.execute("DELETE FROM mcp_sessions WHERE worker = ?", (worker,)).rowcount
+
+    def purge(self, created_before: float) -> int:
+        conn = self._conn()
+        with conn:
+            return conn.execute("DELETE FROM mcp_sessions WHERE created_at < ?", (created_before,)).rowcount
+
+    def counts(self) -> Dict[int, int]:
+        rows = self._conn().execute("SELECT worker, COUNT(*) FROM mcp_sessions GROUP BY worker").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def store_from_env() -> SessionStore:
+    """
+    Build the store selected by MCP_SESSION_STORE ("memory" or "sqlite"),
+    stored at MCP_SESSION_STORE_PATH for SQLite.
+    """
+    kind = os.getenv("MCP_SESSION_STORE", "memory").lower()
+    if kind == "memory":
+        return MemorySessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore(os.getenv("MCP_SESSION_STORE_PATH", "mcp_sessions.sqlite3"))
+    raise ValueError(f"Unknown MCP_SESSION_STORE: {kind}")
@@ -1,3 +1,7 @@
+import ast
+import math
+import operator
+
 from mcp.server.fastmcp import FastMCP
 
 
@@ -7,6 +11,44 @@ mcp = FastMCP(
 )
 
 
+# Arithmetic the calculator tool accepts; anything else (names, calls,
+# attributes) is rejected instead of being handed to eval()
+OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+MAX_EXPRESSION_LENGTH = 1000
+MAX_RESULT_DIGITS = 4300
+
+
+def safe_eval(expression: str):
+    """Evaluate plain arithmetic, refusing powers whose result would be huge"""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    return _eval_node(ast.parse(expression, mode="eval").body)
+
+
+def _eval_node(node):
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and type(node.op) in OPERATORS:
+        return OPERATORS[type(node.op)](_eval_node(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+        left, right = _eval_node(node.left), _eval_node(node.right)
+        if (isinstance(node.op, ast.Pow) and type(left) is int and type(right) is int
+                and abs(left) > 1 and right * math.log10(abs(left)) > MAX_RESULT_DIGITS):
+            raise ValueError(f"Result would have more than {MAX_RESULT_DIGITS} digits")
+        return OPERATORS[type(node.op)](left, right)
+    raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+
 
 @mcp.tool(name="text_translator", description="Translate text between languages")
 async def translate_text(text: str, target_language: str) -> str:
@@ -34,7 +76,7 @@ async def convert_units(value: float, from_unit: str, to_unit: str) -> str:
 @mcp.tool(name="calculator", description="Perform mathematical calculations")
 async def calculate(expression: str) -> str:
     try:
-        result = eval(expression)  # Be careful with eval in production
+        result = safe_eval(expression)
         return f"Result: {result}"
     except Exception as e:
         return f"Calculation error: {str(e)}"
@@ -0,0 +1,194 @@
+"""
+In-process load test of the calculator over streamable HTTP.
+
+Builds the FastMCP streamable HTTP app from mcp_calculator, runs its
+lifespan, and drives it through httpx's ASGI transport -- the full MCP
+request path (JSON-RPC, session handling, tool dispatch, SSE framing)
+without sockets or a separate server process. Each simulated client opens
+its own MCP session and issues tool calls back to back from a weighted mix.
+Reports throughput and p50/p95/p99 latency overall and per tool.
+
+Run from 09_Remote_MCP_Server:
+
+    uv run python benchmarks/calculator_load.py --clients 16 --requests 200 --output load.json
+    uv run python benchmarks/calculator_load.py --compare load.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report import compare, percentile, write_results  # noqa: E402
+from mcp_calculator import Calculator, mcp  # noqa: E402
+
+PROTOCOL_VERSION = "2025-06-18"
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+
+_RNG = random.Random(7)
+_VALUES = [round(_RNG.uniform(0, 1000), 2) for _ in range(500)]
+
+# (weight, tool, arguments)
+MIX: List[Tuple[int, str, Dict[str, Any]]] = [
+    (30, "calculate", {"expression": "10000 * (1 + 0.05/12) ** (12*10)"}),
+    (15, "calculate", {"expression": "sqrt(16) + sin(pi/2) + log(1000, 10)"}),
+    (10, "calculate", {"expression": "0.1 + 0.2", "mode": "decimal"}),
+    (5, "calculate", {"expression": "1/3 + 1/6", "mode": "fraction"}),
+    (10, "calculate_batch", {"expression": "a*x + b", "variables": {"a": [2.0] * 100, "b": [1.0] * 100, "x": _VALUES[:100]}}),
+    (15, "advanced_calculate", {"operation": "stats", "operands": _VALUES}),
+    (5, "advanced_calculate", {"operation": "median", "operands": _VALUES}),
+    (10, "convert_base", {"number": "7fffffffffffffff", "from_base": 16, "to_base": 10}),
+]
+
+
+def parse_response(response: httpx.Response) -> Dict[str, Any]:
+    """JSON-RPC message from a JSON or single-event SSE response"""
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        for line in response.text.splitlines():
+            if line.startswith("data:"):
+                return json.loads(line[5:])
+        raise ValueError("no data in event stream")
+    return response.json()
+
+
+class Client:
+    """One MCP session over the in-process transport"""
+
+    def __init__(self, http: httpx.AsyncClient):
+        self.http = http
+        self.headers = dict(HEADERS)
+        self.next_id = 0
+
+    async def request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.next_id += 1
+        response = await self.http.post(
+            "/mcp", headers=self.headers, json={"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params}
+        )
+        response.raise_for_status()
+        return parse_response(response)
+
+    async def open(self):
+        await self.request("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "calculator-load", "version": "1.0"},
+        })
+        self.headers["mcp-protocol-version"] = PROTOCOL_VERSION
+        # The session id comes back on the initialize response
+        self.headers["mcp-session-id"] = self.http.last_session_id
+        await self.http.post("/mcp", headers=self.headers, json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> bool:
+        message = await self.request("tools/call", {"name": name, "arguments": arguments})
+        result = message.get("result")
+        if result is None or result.get("isError"):
+            return False
+        return result.get("structuredContent", {}).get("result", {}).get("success", True)
+
+    async def close(self):
+        await self.http.delete("/mcp", headers=self.headers)
+
+
+class SessionTrackingClient(httpx.AsyncClient):
+    """AsyncClient that remembers the last mcp-session-id it was given"""
+
+    last_session_id = None
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        response = await super().send(request, **kwargs)
+        if "mcp-session-id" in response.headers:
+            self.last_session_id = response.headers["mcp-session-id"]
+        return response
+
+
+async def run_client(app, requests: int, seed: int, samples: List[Tuple[str, float, bool]]):
+    rng = random.Random(seed)
+    weights = [weight for weight, _, _ in MIX]
+    transport = httpx.ASGITransport(app=app)
+    async with SessionTrackingClient(transport=transport, base_url="http://localhost") as http:
+        client = Client(http)
+        await client.open()
+        try:
+            for _ in range(requests):
+                _, tool, arguments = rng.choices(MIX, weights)[0]
+                start = time.perf_counter()
+                try:
+                    ok = await client.call_tool(tool, arguments)
+                except (httpx.HTTPError, ValueError):
+                    ok = False
+                samples.append((tool, time.perf_counter() - start, ok))
+        finally:
+            await client.close()
+
+
+def summarize(name: str, samples: List[Tuple[str, float, bool]], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(latency for _, latency, _ in samples)
+    return {
+        "name": name,
+        "requests": len(samples),
+        "errors": sum(not ok for _, _, ok in samples),
+        "ops": len(samples) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1] if latencies else None,
+    }
+
+
+async def run(clients: int, requests: int) -> List[Dict[str, Any]]:
+    app = mcp.streamable_http_app()
+    samples: List[Tuple[str, float, bool]] = []
+    async with app.router.lifespan_context(app):
+        start = time.perf_counter()
+        await asyncio.gather(*(run_client(app, requests, seed, samples) for seed in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    results = [summarize("all", samples, elapsed)]
+    for tool in sorted({tool for tool, _, _ in samples}):
+        # Per-tool throughput is that tool's share of the same wall-clock time
+        results.append(summarize(tool, [sample for sample in samples if sample[0] == tool], elapsed))
+    return results
+
+
+def main(args: argparse.Namespace):
+    # The MCP server logs every request at INFO
+    logging.disable(logging.INFO)
+    try:
+        results = asyncio.run(run(args.clients, args.requests))
+    finally:
+        Calculator.SANDBOX.close()
+
+    print(f"{'':<20}{'requests':>10}{'errors':>8}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        print(
+            f"{result['name']:<20}{result['requests']:>10}{result['errors']:>8}{result['ops']:>10.0f}"
+            f"{result['p50'] * 1e3:>10.2f}{result['p95'] * 1e3:>10.2f}{result['p99'] * 1e3:>10.2f}"
+        )
+
+    settings = {"clients": args.clients, "requests": args.requests}
+    if args.output:
+        write_results(args.output, "calculator_load", settings, results)
+    if args.compare:
+        compare(results, args.compare, "ops", higher_is_better=True, threshold=args.threshold)
+        regressions = compare(results, args.compare, "p95", higher_is_better=False, threshold=args.threshold)
+        if regressions:
+            sys.exit(f"{regressions} case(s) with p95 latency worse by more than {args.threshold:g}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent MCP sessions")
+    parser.add_argument("--requests", type=int, default=200, help="tool calls per client")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change reported as a regression")
+    main(parser.parse_args())
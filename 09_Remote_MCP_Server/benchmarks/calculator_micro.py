@@ -0,0 +1,147 @@
+"""
+Microbenchmarks for the calculator tools, called directly (no transport).
+
+Each case is timed in rounds of a calibrated number of calls, like
+pytest-benchmark: per case the min/max/mean/median/stddev time per call and
+the throughput are reported. The corpus covers the kinds of expressions
+agents send (arithmetic, functions, finance formulas, big integers, the
+decimal and fraction modes) plus advanced_calculate and convert_base.
+
+Run from 09_Remote_MCP_Server:
+
+    uv run python benchmarks/calculator_micro.py --output micro.json
+    uv run python benchmarks/calculator_micro.py --compare micro.json --filter calculate
+    uv run python benchmarks/calculator_micro.py --cold   # compile on every call
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report import compare, write_results  # noqa: E402
+from mcp_calculator import Calculator, advanced_calculate, convert_base, convert_base_batch  # noqa: E402
+
+# (name, expression, mode, precision)
+EXPRESSIONS: List[Tuple[str, str, str, Any]] = [
+    ("arithmetic", "2 + 3 * 4", "float", None),
+    ("arithmetic_long", "(17.5 - 2.25) / 3 * 1.08 + 42 % 5 - 7 // 2", "float", None),
+    ("functions", "sqrt(16) + sin(pi/2) + log(1000, 10) * exp(0.5)", "float", None),
+    ("compound_interest", "10000 * (1 + 0.05/12) ** (12*10)", "float", None),
+    ("loan_payment", "250000 * (0.04/12) / (1 - (1 + 0.04/12) ** -360)", "float", None),
+    ("repeated_subterms", "sqrt(2)*3.5 + sqrt(2)*4.25 + sqrt(2)*7", "float", None),
+    ("bigint_power", "2**1000 % 97", "float", None),
+    ("bigint_factorial", "factorial(100) // factorial(98)", "float", None),
+    ("sandboxed", "factorial(floor(800.5)) % 1000003", "float", None),
+    ("decimal_sum", "0.1 + 0.2", "decimal", 28),
+    ("decimal_interest", "10000 * (1 + 0.05/12) ** 120", "decimal", 28),
+    ("decimal_pi_100", "pi * sqrt(2)", "decimal", 100),
+    ("fraction_sum", "1/3 + 1/6 - 1/7", "fraction", None),
+    ("fraction_power", "(2/3) ** 20 * 3 ** 19", "fraction", None),
+]
+
+
+def expression_cases(cold: bool) -> List[Tuple[str, Callable[[], Any]]]:
+    cases = []
+    for name, expression, mode, precision in EXPRESSIONS:
+        compiler = Calculator.compiler_for(mode)
+
+        def call(expression=expression, mode=mode, precision=precision, compiler=compiler):
+            if cold:
+                compiler.cache_clear()
+            return Calculator.evaluate_expression(expression, mode, precision)
+
+        cases.append((f"calculate.{name}", call))
+    return cases
+
+
+def tool_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    rng = random.Random(42)
+    small = [rng.uniform(0, 100) for _ in range(100)]
+    large = array('d', (rng.gauss(0, 1) for _ in range(10000)))
+    big_hex = format(rng.getrandbits(40000), "x")
+    numbers = [format(rng.getrandbits(64), "x") for _ in range(1000)]
+    return [
+        ("advanced_calculate.mean_100", lambda: advanced_calculate("mean", small)),
+        ("advanced_calculate.stats_10000", lambda: advanced_calculate("stats", large)),
+        ("advanced_calculate.median_10000", lambda: advanced_calculate("median", large)),
+        ("advanced_calculate.quantiles_10000", lambda: advanced_calculate("quantiles", large, quantiles=[0.5, 0.9, 0.99])),
+        ("convert_base.small", lambda: convert_base("ff", 16, 2)),
+        ("convert_base.big_hex_to_decimal", lambda: convert_base(big_hex, 16, 10)),
+        ("convert_base_batch.1000", lambda: convert_base_batch(numbers, 16, 10)),
+    ]
+
+
+def measure(function: Callable[[], Any], rounds: int, min_time: float) -> Dict[str, Any]:
+    """Calibrate calls per round to take about `min_time`, then time `rounds` rounds"""
+    function()  # warm up caches and the sandbox workers
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or iterations >= 1 << 20:
+            break
+        iterations *= 2 if elapsed <= 0 else max(2, min(int(min_time / elapsed) + 1, 10))
+
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        times.append((time.perf_counter() - start) / iterations)
+    mean = statistics.fmean(times)
+    return {
+        "rounds": rounds,
+        "iterations": iterations,
+        "min": min(times),
+        "max": max(times),
+        "mean": mean,
+        "median": statistics.median(times),
+        "stddev": statistics.stdev(times) if rounds > 1 else 0.0,
+        "ops": 1 / mean,
+    }
+
+
+def main(args: argparse.Namespace):
+    cases = expression_cases(args.cold) + tool_cases()
+    if args.filter:
+        cases = [(name, function) for name, function in cases if any(f in name for f in args.filter)]
+
+    results = []
+    print(f"{'case':<40}{'min us':>12}{'median us':>12}{'stddev us':>12}{'ops/s':>14}")
+    for name, function in cases:
+        result = {"name": name, **measure(function, args.rounds, args.min_time)}
+        results.append(result)
+        print(
+            f"{name:<40}{result['min'] * 1e6:>12.2f}{result['median'] * 1e6:>12.2f}"
+            f"{result['stddev'] * 1e6:>12.2f}{result['ops']:>14,.0f}"
+        )
+    Calculator.SANDBOX.close()
+
+    settings = {"rounds": args.rounds, "min_time": args.min_time, "cold": args.cold}
+    if args.output:
+        write_results(args.output, "calculator_micro", settings, results)
+    if args.compare:
+        regressions = compare(results, args.compare, "median", higher_is_better=False, threshold=args.threshold)
+        if regressions:
+            sys.exit(f"{regressions} case(s) slower by more than {args.threshold:g}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10, help="timed rounds per case")
+    parser.add_argument("--min-time", type=float, default=0.02, help="target seconds per round (sets calls per round)")
+    parser.add_argument("--cold", action="store_true", help="clear the compiled-expression cache before every call")
+    parser.add_argument("--filter", nargs="+", help="only run cases whose name contains one of these")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent slowdown reported as a regression")
+    main(parser.parse_args())
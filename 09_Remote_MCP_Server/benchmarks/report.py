@@ -0,0 +1,82 @@
+"""
+Shared result handling for the calculator benchmarks.
+
+Results are written as JSON together with the commit and interpreter they
+were measured on, and a previous run's file can be passed back in to print
+the change per case:
+
+    uv run python benchmarks/calculator_micro.py --output before.json
+    git checkout my-branch
+    uv run python benchmarks/calculator_micro.py --compare before.json
+"""
+
+import json
+import math
+import platform
+import subprocess
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def percentile(ordered: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile (0-100) of already sorted values"""
+    if not ordered:
+        return math.nan
+    rank = max(math.ceil(p / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def environment() -> Dict[str, Any]:
+    """Where the numbers come from: commit, interpreter and machine"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_results(path: str, benchmark: str, settings: Dict[str, Any], cases: List[Dict[str, Any]]):
+    with open(path, "w") as f:
+        json.dump(
+            {"benchmark": benchmark, "environment": environment(), "settings": settings, "cases": cases},
+            f,
+            indent=2,
+        )
+    print(f"results written to {path}")
+
+
+def compare(cases: List[Dict[str, Any]], baseline_path: str, metric: str, higher_is_better: bool, threshold: float) -> int:
+    """
+    Print the change of `metric` per case against a saved run.
+
+    Returns:
+        Number of cases that got worse by more than `threshold` percent
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {case["name"]: case for case in baseline["cases"]}
+    commit = baseline.get("environment", {}).get("commit") or "baseline"
+
+    regressions = 0
+    print(f"\nchange in {metric} vs {commit} ({'higher' if higher_is_better else 'lower'} is better)")
+    for case in cases:
+        old: Optional[Dict[str, Any]] = previous.get(case["name"])
+        if old is None or not old.get(metric):
+            print(f"  {case['name']:<40} (new)")
+            continue
+        change = (case[metric] - old[metric]) / old[metric] * 100
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"  {case['name']:<40}{change:>+9.1f}%{flag}")
+    return regressions
@@ -0,0 +1,114 @@
+"""
+Concurrent-request throughput benchmark for the Tavily search tools.
+
+Starts a local fake Tavily upstream with a fixed response delay, then fires
+N concurrent `web_search` tool calls through the FastMCP tool manager:
+
+- "blocking": the pre-async tool shape, a sync tool calling the blocking
+  TavilySearch.search (every call holds the event loop for the full delay)
+- "async":    the current async tool on the pooled aiohttp path
+
+Run from 09_Remote_MCP_Server:
+
+    uv run python benchmarks/search_concurrency.py --requests 50 --delay 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("TAVILY_API_KEY", "benchmark-key")
+
+import live_search  # noqa: E402
+from live_search import TavilySearch, mcp  # noqa: E402
+
+
+def start_fake_upstream(delay: float, port: int):
+    """
+    Serve a minimal /search endpoint that answers after `delay` seconds.
+
+    The server runs on its own loop in a daemon thread so that the blocking
+    mode cannot stall it.
+    """
+
+    async def handle(request: web.Request) -> web.Response:
+        body = await request.json()
+        await asyncio.sleep(delay)
+        return web.json_response({
+            "query": body["query"],
+            "answer": f"answer for {body['query']}",
+            "results": [
+                {"url": f"https://example.com/{i}", "title": f"Result {i}", "content": "lorem ipsum " * 20}
+                for i in range(body.get("max_results", 5))
+            ],
+        })
+
+    app = web.Application()
+    app.router.add_post("/search", handle)
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait(timeout=10)
+
+
+async def run_calls(tool_name: str, total: int, concurrency: int) -> Dict[str, Any]:
+    """Fire `total` tool calls with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await mcp.call_tool(tool_name, {"query": f"benchmark query {i}"})
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    return {"mode": tool_name, "requests": total, "seconds": elapsed, "req_per_s": total / elapsed}
+
+
+async def main(args: argparse.Namespace):
+    start_fake_upstream(args.delay, args.port)
+    # No result cache: the async pass reuses the blocking pass's queries and
+    # would otherwise be answered without touching the upstream
+    live_search.tavily_client = TavilySearch(base_url=f"http://127.0.0.1:{args.port}", use_cache=False)
+
+    @mcp.tool(name="blocking_web_search")
+    def blocking_web_search(query: str) -> Dict[str, Any]:
+        """Pre-async tool shape: blocking search on the event loop"""
+        return live_search.tavily_client.search(query=query)
+
+    try:
+        rows = [
+            await run_calls("blocking_web_search", args.requests, args.concurrency),
+            await run_calls("web_search", args.requests, args.concurrency),
+        ]
+    finally:
+        await live_search.default_transport.aclose()
+
+    print(f"{'mode':<22}{'requests':>10}{'seconds':>10}{'req/s':>10}")
+    for row in rows:
+        print(f"{row['mode']:<22}{row['requests']:>10}{row['seconds']:>10.2f}{row['req_per_s']:>10.1f}")
+    print(f"speedup: {rows[1]['req_per_s'] / rows[0]['req_per_s']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="total tool calls per mode")
+    parser.add_argument("--concurrency", type=int, default=25, help="tool calls in flight at once")
+    parser.add_argument("--delay", type=float, default=0.2, help="fake upstream latency in seconds")
+    parser.add_argument("--port", type=int, default=8765, help="port for the fake upstream")
+    asyncio.run(main(parser.parse_args()))
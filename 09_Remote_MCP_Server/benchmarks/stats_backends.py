@@ -0,0 +1,76 @@
+"""
+Pure-Python vs NumPy benchmark for the advanced_calculate statistics.
+
+Times each operation on random float64 inputs of several sizes with both
+backends forced, then reports the smallest size from which NumPy wins for
+every operation -- a starting point for CALC_NUMPY_THRESHOLD.
+
+Run from 09_Remote_MCP_Server:
+
+    uv run python benchmarks/stats_backends.py --sizes 100 1000 10000 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from array import array
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calculator_stats  # noqa: E402
+from mcp_calculator import advanced_calculate  # noqa: E402
+
+OPERATIONS = ["sum", "product", "mean", "median", "std_dev", "variance", "range", "stats"]
+
+
+def time_backend(operation: str, values: array, threshold: int, repeat: int) -> float:
+    """Best-of-`repeat` seconds for one advanced_calculate call with the given threshold"""
+    calculator_stats.NUMPY_THRESHOLD = threshold
+    timer = timeit.Timer(lambda: advanced_calculate(operation, values))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    rows = []
+    for size in sizes:
+        values = array('d', (random.gauss(0, 1) for _ in range(size)))
+        for operation in OPERATIONS:
+            python = time_backend(operation, values, size + 1, repeat)
+            numpy = time_backend(operation, values, 0, repeat)
+            rows.append({"size": size, "operation": operation, "python": python, "numpy": numpy})
+    return rows
+
+
+def main(args: argparse.Namespace):
+    if calculator_stats.np is None:
+        sys.exit("NumPy is not installed; nothing to compare")
+
+    original = calculator_stats.NUMPY_THRESHOLD
+    try:
+        rows = run(args.sizes, args.repeat)
+    finally:
+        calculator_stats.NUMPY_THRESHOLD = original
+
+    print(f"{'size':>8}  {'operation':<10}{'python ms':>12}{'numpy ms':>12}{'speedup':>10}")
+    for row in rows:
+        print(
+            f"{row['size']:>8}  {row['operation']:<10}{row['python'] * 1e3:>12.3f}"
+            f"{row['numpy'] * 1e3:>12.3f}{row['python'] / row['numpy']:>9.1f}x"
+        )
+
+    winning = [size for size in args.sizes if all(r["numpy"] < r["python"] for r in rows if r["size"] == size)]
+    if winning:
+        print(f"numpy wins every operation from {min(winning)} values (current threshold: {original})")
+    else:
+        print(f"numpy never wins every operation at these sizes (current threshold: {original})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000], help="input sizes to time")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repeats per measurement (best is kept)")
+    main(parser.parse_args())
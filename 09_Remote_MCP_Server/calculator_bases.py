@@ -0,0 +1,134 @@
+"""
+Integer <-> string conversion in bases 2-36 for the Calculator MCP server.
+Power-of-two bases are handled by bit slicing, and very large integers in
+other bases by divide-and-conquer against cached powers of the base. Both
+directions are subquadratic and avoid Python's int/str digit limit.
+"""
+
+import functools
+from typing import List
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Built-in format() codes for power-of-two bases
+_FORMAT_CODES = {2: "b", 8: "o", 16: "X"}
+
+# Integers up to this many bits are formatted digit by digit
+SMALL_BITS = 512
+
+# Strings up to this many digits are parsed by int() directly
+PARSE_CHUNK_DIGITS = 2000
+
+# Decimal integers up to this many bits go through str() (below its digit limit)
+DECIMAL_STR_BITS = 14000
+
+
+def check_base(base: int):
+    if not 2 <= base <= 36:
+        raise ValueError("Base must be between 2 and 36")
+
+
+def _is_power_of_two(base: int) -> bool:
+    return base & (base - 1) == 0
+
+
+@functools.lru_cache(maxsize=64)
+def _power(base: int, exponent: int) -> int:
+    return base ** exponent
+
+
+def _format_small(value: int, base: int) -> str:
+    """Digits of a small non-negative integer (empty string for 0)"""
+    if base == 10:
+        return str(value) if value else ""
+    digits = []
+    while value:
+        value, remainder = divmod(value, base)
+        digits.append(DIGITS[remainder])
+    return "".join(reversed(digits))
+
+
+def _format_bits(value: int, base: int) -> str:
+    """Power-of-two base: every digit is a fixed slice of the binary form"""
+    code = _FORMAT_CODES.get(base)
+    if code:
+        return format(value, code)
+    width = base.bit_length() - 1
+    bits = format(value, "b")
+    bits = "0" * (-len(bits) % width) + bits
+    return "".join(DIGITS[int(bits[i:i + width], 2)] for i in range(0, len(bits), width))
+
+
+def _format_split(value: int, base: int, powers: List[int], level: int, width: int) -> str:
+    """
+    Digits of `value` (< base ** 2 ** (level + 1)), left-padded to `width`.
+
+    Splits on base ** 2 ** level so each half is formatted independently.
+    """
+    if level < 0 or value.bit_length() <= SMALL_BITS:
+        return _format_small(value, base).rjust(width, "0")
+    high, low = divmod(value, powers[level])
+    half = 1 << level
+    if not high and not width:
+        return _format_split(low, base, powers, level - 1, 0)
+    high_width = max(width - half, 0)
+    return _format_split(high, base, powers, level - 1, high_width) + _format_split(low, base, powers, level - 1, half)
+
+
+def format_int(value: int, base: int) -> str:
+    """
+    Format an integer in `base` (2-36) with uppercase digits and a "-" sign.
+
+    Raises:
+        ValueError: If the base is out of range
+    """
+    check_base(base)
+    if value < 0:
+        return "-" + format_int(-value, base)
+    if value == 0:
+        return "0"
+    if _is_power_of_two(base):
+        return _format_bits(value, base)
+    if base == 10 and value.bit_length() <= DECIMAL_STR_BITS:
+        return str(value)
+    if value.bit_length() <= SMALL_BITS:
+        return _format_small(value, base)
+
+    # powers[i] = base ** 2 ** i, up to the first one above value
+    powers = [base]
+    while powers[-1] <= value:
+        powers.append(powers[-1] * powers[-1])
+    return _format_split(value, base, powers, len(powers) - 2, 0)
+
+
+def _parse_split(text: str, base: int) -> int:
+    if len(text) <= PARSE_CHUNK_DIGITS:
+        return int(text, base)
+    low_digits = len(text) // 2
+    return _parse_split(text[:-low_digits], base) * _power(base, low_digits) + _parse_split(text[-low_digits:], base)
+
+
+def parse_int(text: str, base: int) -> int:
+    """
+    Parse an integer written in `base` (2-36), like int(text, base).
+
+    Long strings in bases that are not powers of two are split in halves
+    and recombined, instead of int()'s quadratic parse.
+
+    Raises:
+        ValueError: If the text is not a valid number in that base
+    """
+    check_base(base)
+    text = text.strip()
+    if _is_power_of_two(base) or len(text) <= PARSE_CHUNK_DIGITS:
+        return int(text, base)
+    sign = -1 if text[0] == "-" else 1
+    digits = text[1:] if text[0] in "+-" else text
+    if not digits.isalnum():
+        raise ValueError(f"invalid literal for base {base}: {text[:20]}...")
+    return sign * _parse_split(digits, base)
+
+
+def convert(number: str, from_base: int, to_base: int) -> str:
+    """Re-write a number from one base in another"""
+    return format_int(parse_int(number, from_base), to_base)
@@ -0,0 +1,386 @@
+"""
+Decimal and exact-rational number modes for the Calculator MCP server.
+Each mode is a function table, a constant table and a literal type for
+ExpressionCompiler, so every mode goes through the same compiled-AST
+pipeline as float evaluation. Decimal functions compute at the precision of
+the current decimal context; constants are computed once per precision.
+The tables pickle, so sandbox workers can build the same compilers.
+"""
+
+import functools
+import math
+from decimal import Decimal, getcontext, localcontext
+from fractions import Fraction
+from typing import Any, Callable, Dict
+
+
+def integer(value: Any, name: str = "value") -> int:
+    """An integral int/Decimal/Fraction as int, for functions that need one"""
+    if type(value) is int:
+        return value
+    if isinstance(value, Fraction) or (isinstance(value, Decimal) and value.is_finite()):
+        if value == int(value):
+            return int(value)
+    raise ValueError(f"{name} must be an integer")
+
+
+def _round(value: Any, ndigits: Any = None) -> Any:
+    return round(value) if ndigits is None else round(value, integer(ndigits, "ndigits"))
+
+
+def _factorial(n: Any) -> int:
+    return math.factorial(integer(n))
+
+
+def _gcd(*values: Any) -> int:
+    return math.gcd(*(integer(value) for value in values))
+
+
+def _lcm(*values: Any) -> int:
+    return math.lcm(*(integer(value) for value in values))
+
+
+# Functions whose results are exact in every mode
+_EXACT_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    'abs': abs,
+    'round': _round,
+    'floor': math.floor,
+    'ceil': math.ceil,
+    'factorial': _factorial,
+    'gcd': _gcd,
+    'lcm': _lcm,
+}
+
+
+# Decimal mode
+
+# Largest number of integer digits of a sin/cos/tan argument
+MAX_ANGLE_DIGITS = 1000
+
+@functools.lru_cache(maxsize=32)
+def _pi(precision: int) -> Decimal:
+    """pi to `precision` digits (series from the decimal module documentation)"""
+    with localcontext() as ctx:
+        ctx.prec = precision + 2
+        three = Decimal(3)
+        lasts, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
+        while s != lasts:
+            lasts = s
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            t = (t * n) / d
+            s += t
+    with localcontext() as ctx:
+        ctx.prec = precision
+        return +s
+
+
+@functools.lru_cache(maxsize=32)
+def _e(precision: int) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec = precision
+        return Decimal(1).exp()
+
+
+def _precision() -> int:
+    return getcontext().prec
+
+
+def decimal_pi() -> Decimal:
+    return _pi(_precision())
+
+
+def decimal_e() -> Decimal:
+    return _e(_precision())
+
+
+def decimal_tau() -> Decimal:
+    return 2 * decimal_pi()
+
+
+def decimal_inf() -> Decimal:
+    return Decimal('Infinity')
+
+
+def decimal_nan() -> Decimal:
+    return Decimal('NaN')
+
+
+def _decimal(value: Any) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(value)
+
+
+def _series(x: Decimal, first: Decimal, start: int, sign: int) -> Decimal:
+    """x-power series sum of first * x**(start + 2k) / (start + 2k)! with alternating `sign`"""
+    i, lasts, s, fact, num, term_sign = start, 0, first, 1, first, 1
+    while s != lasts:
+        lasts = s
+        i += 2
+        fact *= i * (i - 1)
+        num *= x * x
+        term_sign *= sign
+        s += term_sign * num / fact
+    return s
+
+
+def _reduce_angle(x: Decimal) -> Decimal:
+    """x modulo 2*pi, with enough extra digits for the integer part of x"""
+    # Reduction works at (precision + integer digits of x): refuse arguments
+    # whose reduction would cost more than the evaluation itself
+    if x.adjusted() > MAX_ANGLE_DIGITS:
+        raise ValueError(f"trigonometric argument too large (more than {MAX_ANGLE_DIGITS} integer digits)")
+    with localcontext() as ctx:
+        ctx.prec += max(x.adjusted(), 0) + 2
+        return x % (2 * _pi(ctx.prec))
+
+
+def decimal_sin(x: Any) -> Decimal:
+    x = _decimal(x)
+    with localcontext() as ctx:
+        ctx.prec += 2
+        x = _reduce_angle(x)
+        s = _series(x, x, 1, -1)
+    return +s
+
+
+def decimal_cos(x: Any) -> Decimal:
+    x = _decimal(x)
+    with localcontext() as ctx:
+        ctx.prec += 2
+        x = _reduce_angle(x)
+        s = _series(x, Decimal(1), 0, -1)
+    return +s
+
+
+def decimal_tan(x: Any) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec += 2
+        cos = decimal_cos(x)
+        if not cos:
+            raise ValueError("math domain error")
+        s = decimal_sin(x) / cos
+    return +s
+
+
+def decimal_atan(x: Any) -> Decimal:
+    x = _decimal(x)
+    with localcontext() as ctx:
+        ctx.prec += 4
+        if x.is_infinite():
+            s = decimal_pi() / 2 * (1 if x > 0 else -1)
+        else:
+            # atan(x) = 2 atan(x / (1 + sqrt(1 + x^2))), twice, so the series converges fast
+            y = x
+            for _ in range(2):
+                y = y / (1 + (1 + y * y).sqrt())
+            # atan(y) = y - y^3/3 + y^5/5 - ...
+            lasts, s, num, i = 0, y, y, 1
+            while s != lasts:
+                lasts = s
+                i += 2
+                num *= -y * y
+                s += num / i
+            s *= 4
+    return +s
+
+
+def decimal_asin(x: Any) -> Decimal:
+    x = _decimal(x)
+    if abs(x) > 1:
+        raise ValueError("math domain error")
+    with localcontext() as ctx:
+        ctx.prec += 2
+        if abs(x) == 1:
+            s = decimal_pi() / 2 * x
+        else:
+            s = decimal_atan(x / (1 - x * x).sqrt())
+    return +s
+
+
+def decimal_acos(x: Any) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec += 2
+        s = decimal_pi() / 2 - decimal_asin(x)
+    return +s
+
+
+def decimal_sqrt(x: Any) -> Decimal:
+    x = _decimal(x)
+    if x < 0:
+        raise ValueError("math domain error")
+    return x.sqrt()
+
+
+def decimal_exp(x: Any) -> Decimal:
+    return _decimal(x).exp()
+
+
+def decimal_log(x: Any, base: Any = None) -> Decimal:
+    x = _decimal(x)
+    if x <= 0 or (base is not None and (_decimal(base) <= 0 or base == 1)):
+        raise ValueError("math domain error")
+    if base is None:
+        return x.ln()
+    with localcontext() as ctx:
+        ctx.prec += 2
+        s = x.ln() / _decimal(base).ln()
+    return +s
+
+
+def decimal_log10(x: Any) -> Decimal:
+    x = _decimal(x)
+    if x <= 0:
+        raise ValueError("math domain error")
+    return x.log10()
+
+
+def decimal_log2(x: Any) -> Decimal:
+    return decimal_log(x, 2)
+
+
+def decimal_sinh(x: Any) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec += 2
+        y = decimal_exp(x)
+        s = (y - 1 / y) / 2
+    return +s
+
+
+def decimal_cosh(x: Any) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec += 2
+        y = decimal_exp(x)
+        s = (y + 1 / y) / 2
+    return +s
+
+
+def decimal_tanh(x: Any) -> Decimal:
+    x = _decimal(x)
+    if abs(x) > 2 * _precision():
+        return Decimal(1 if x > 0 else -1)
+    with localcontext() as ctx:
+        ctx.prec += 2
+        y = decimal_exp(2 * x)
+        s = (y - 1) / (y + 1)
+    return +s
+
+
+def decimal_degrees(x: Any) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec += 2
+        s = _decimal(x) * 180 / decimal_pi()
+    return +s
+
+
+def decimal_radians(x: Any) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec += 2
+        s = _decimal(x) * decimal_pi() / 180
+    return +s
+
+
+def decimal_factorial(n: Any) -> Decimal:
+    """n! rounded to the context precision (overflows past the context's Emax)"""
+    n = integer(n)
+    if n < 0:
+        raise ValueError("factorial() not defined for negative values")
+    if n <= 1000:
+        return +Decimal(math.factorial(n))
+    result = Decimal(math.factorial(1000))
+    for k in range(1001, n + 1):
+        result *= k
+    return result
+
+
+def decimal_pow(base: Any, exponent: Any, modulus: Any = None) -> Decimal:
+    if modulus is None:
+        return _decimal(base) ** _decimal(exponent)
+    return pow(_decimal(integer(base)), _decimal(integer(exponent)), _decimal(integer(modulus)))
+
+
+DECIMAL_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    **_EXACT_FUNCTIONS,
+    'sqrt': decimal_sqrt,
+    'pow': decimal_pow,
+    'log': decimal_log,
+    'log10': decimal_log10,
+    'log2': decimal_log2,
+    'exp': decimal_exp,
+    'sin': decimal_sin,
+    'cos': decimal_cos,
+    'tan': decimal_tan,
+    'asin': decimal_asin,
+    'acos': decimal_acos,
+    'atan': decimal_atan,
+    'sinh': decimal_sinh,
+    'cosh': decimal_cosh,
+    'tanh': decimal_tanh,
+    'degrees': decimal_degrees,
+    'radians': decimal_radians,
+    'factorial': decimal_factorial,
+}
+
+# Lazy constants: called at evaluation time, so they follow the precision
+DECIMAL_CONSTANTS: Dict[str, Callable[[], Decimal]] = {
+    'pi': decimal_pi,
+    'e': decimal_e,
+    'tau': decimal_tau,
+    'inf': decimal_inf,
+    'nan': decimal_nan,
+}
+
+
+# Fraction (exact) mode
+
+class _NotExact:
+    """Stand-in for a function or constant without rational values (a class, so it pickles)"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, *args: Any) -> Any:
+        raise ValueError(f"{self.name} has no exact rational value; use mode 'decimal'")
+
+
+def fraction_pow(base: Any, exponent: Any, modulus: Any = None) -> Any:
+    """Powers with integral exponents only, so results stay rational"""
+    exponent = integer(exponent, "exponent")
+    if modulus is not None:
+        return pow(integer(base), exponent, integer(modulus, "modulus"))
+    return Fraction(base) ** exponent
+
+
+def fraction_sqrt(x: Any) -> Fraction:
+    """Square root of a perfect-square rational"""
+    x = Fraction(x)
+    if x < 0:
+        raise ValueError("math domain error")
+    numerator, denominator = math.isqrt(x.numerator), math.isqrt(x.denominator)
+    if numerator * numerator != x.numerator or denominator * denominator != x.denominator:
+        raise ValueError(f"sqrt({x}) is irrational; use mode 'decimal'")
+    return Fraction(numerator, denominator)
+
+
+FRACTION_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    **_EXACT_FUNCTIONS,
+    'sqrt': fraction_sqrt,
+    'pow': fraction_pow,
+    **{
+        name: _NotExact(f"{name}()")
+        for name in ('log', 'log10', 'log2', 'exp', 'sin', 'cos', 'tan', 'asin', 'acos', 'atan',
+                     'sinh', 'cosh', 'tanh', 'degrees', 'radians')
+    },
+}
+
+FRACTION_CONSTANTS: Dict[str, Callable[[], Any]] = {
+    name: _NotExact(name) for name in ('pi', 'e', 'tau', 'inf', 'nan')
+}
+
+
+def format_exact(value: Any) -> str:
+    """Text form of a Decimal/Fraction/int result ("1/3", "0.10", "NaN", "-Infinity")"""
+    if isinstance(value, Decimal) and not value.is_finite():
+        if value.is_nan():
+            return "NaN"
+        return "Infinity" if value > 0 else "-Infinity"
+    return str(value)
@@ -0,0 +1,196 @@
+"""
+Per-session statistics accumulators for the Calculator MCP server.
+An agent creates a named accumulator, pushes values as they arrive and asks
+for statistics at any time, instead of resending the whole history to
+advanced_calculate. Accumulators belong to the MCP session that created
+them and disappear with it (stateful HTTP mode keeps one session per client).
+"""
+
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence
+
+from calculator_stats import RunningStats, StatsError, TDigest, quantiles as exact_quantiles
+
+WINDOW_TYPES = ("none", "tumbling", "sliding")
+
+# Quantiles reported when the caller does not ask for specific ones
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class _LocalSession:
+    """Stand-in session for calls made outside an MCP request (e.g. direct calls)"""
+    pass
+
+
+LOCAL_SESSION = _LocalSession()
+
+
+class Accumulator:
+    """
+    Streaming statistics over everything pushed, plus an optional window.
+
+    - Exact moments (count, sum, mean, variance, min, max) over all values
+    - Approximate quantiles over all values from a t-digest
+    - "tumbling": stats of the current block of `window_size` values and of
+      the last completed blocks
+    - "sliding": exact stats of the most recent `window_size` values
+    """
+
+    def __init__(
+        self,
+        window_type: str = "none",
+        window_size: Optional[int] = None,
+        compression: float = 100.0,
+        history: int = 10
+    ):
+        """
+        Args:
+            window_type: "none", "tumbling" or "sliding"
+            window_size: Values per window (required unless window_type is "none")
+            compression: t-digest compression for the all-time quantiles
+            history: Completed tumbling windows kept
+        """
+        if window_type not in WINDOW_TYPES:
+            raise StatsError(f"Unknown window type: {window_type} (expected one of {', '.join(WINDOW_TYPES)})")
+        if window_type != "none" and (not window_size or window_size < 1):
+            raise StatsError("window_size must be a positive number of values")
+        self.window_type = window_type
+        self.window_size = window_size if window_type != "none" else None
+        self.compression = compression
+        self.created = time.time()
+        self.last_used = time.monotonic()
+
+        self.total = RunningStats()
+        self.digest = TDigest(compression)
+        self._window_stats = RunningStats()
+        self._window_digest = TDigest(compression)
+        self._completed: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._recent: Deque[float] = deque(maxlen=window_size if window_type == "sliding" else 0)
+
+    def push(self, values: Sequence[float]):
+        """Add values in arrival order"""
+        self.total.extend(values)
+        self.digest.extend(values)
+        if self.window_type == "sliding":
+            self._recent.extend(values)
+        elif self.window_type == "tumbling":
+            start = 0
+            while start < len(values):
+                room = self.window_size - self._window_stats.count
+                block = values[start:start + room]
+                self._window_stats.extend(block)
+                self._window_digest.extend(block)
+                start += len(block)
+                if self._window_stats.count == self.window_size:
+                    self._completed.append(self._summary(self._window_stats, self._window_digest.quantile, DEFAULT_QUANTILES))
+                    self._window_stats = RunningStats()
+                    self._window_digest = TDigest(self.compression)
+
+    @staticmethod
+    def _summary(stats: RunningStats, quantile, qs: Iterable[float]) -> Dict[str, Any]:
+        if not stats.count:
+            return {"count": 0}
+        summary = stats.summary()
+        summary["quantiles"] = {str(q): quantile(q) for q in qs}
+        return summary
+
+    def stats(self, qs: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+        """
+        Current statistics.
+
+        Returns:
+            "all" (exact moments, approximate quantiles) and, for windowed
+            accumulators, "window" plus "completed_windows" for tumbling ones
+        """
+        qs = tuple(qs) if qs else DEFAULT_QUANTILES
+        if any(not 0 <= q <= 1 for q in qs):
+            raise StatsError("Quantiles must be between 0 and 1")
+        result: Dict[str, Any] = {
+            "window_type": self.window_type,
+            "window_size": self.window_size,
+            "all": self._summary(self.total, self.digest.quantile, qs),
+        }
+        if self.window_type == "sliding":
+            recent = list(self._recent)
+            window: Dict[str, Any] = {"count": 0}
+            if recent:
+                window = RunningStats(recent).summary()
+                window["quantiles"] = dict(zip((str(q) for q in qs), exact_quantiles(recent, qs)))
+            result["window"] = window
+        elif self.window_type == "tumbling":
+            result["window"] = self._summary(self._window_stats, self._window_digest.quantile, qs)
+            result["completed_windows"] = list(self._completed)
+        return result
+
+
+class AccumulatorStore:
+    """
+    Named accumulators per MCP session.
+
+    Sessions are held weakly, so a session's accumulators are dropped once
+    the session object goes away; idle accumulators are also purged after
+    `idle_timeout` seconds and each session may hold at most `max_per_session`.
+    """
+
+    def __init__(self, max_per_session: int = 32, idle_timeout: float = 3600.0):
+        """
+        Args:
+            max_per_session: Accumulators one session may hold at once
+            idle_timeout: Seconds after the last use before an accumulator is dropped
+        """
+        self.max_per_session = max_per_session
+        self.idle_timeout = idle_timeout
+        self._sessions: "weakref.WeakKeyDictionary[Any, Dict[str, Accumulator]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _accumulators(self, session: Any) -> Dict[str, Accumulator]:
+        accumulators = self._sessions.setdefault(session, {})
+        cutoff = time.monotonic() - self.idle_timeout
+        for name in [name for name, accumulator in accumulators.items() if accumulator.last_used < cutoff]:
+            del accumulators[name]
+        return accumulators
+
+    def create(self, session: Any, name: str, **options: Any) -> Accumulator:
+        """Create (or replace) the named accumulator of a session"""
+        with self._lock:
+            accumulators = self._accumulators(session)
+            if name not in accumulators and len(accumulators) >= self.max_per_session:
+                raise StatsError(f"Too many accumulators in this session (max {self.max_per_session})")
+            accumulator = Accumulator(**options)
+            accumulators[name] = accumulator
+            return accumulator
+
+    def get(self, session: Any, name: str) -> Accumulator:
+        """The named accumulator of a session"""
+        with self._lock:
+            accumulator = self._accumulators(session).get(name)
+            if accumulator is None:
+                raise StatsError(f"No accumulator named '{name}' in this session")
+            accumulator.last_used = time.monotonic()
+            return accumulator
+
+    def close(self, session: Any, name: str) -> Accumulator:
+        """Remove the named accumulator and return it"""
+        with self._lock:
+            accumulator = self._accumulators(session).pop(name, None)
+            if accumulator is None:
+                raise StatsError(f"No accumulator named '{name}' in this session")
+            return accumulator
+
+    def names(self, session: Any) -> List[str]:
+        with self._lock:
+            return sorted(self._accumulators(session))
+
+    def stats(self) -> Dict[str, Any]:
+        """Live sessions and accumulators"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            return {
+                "sessions": len(sessions),
+                "accumulators": sum(len(accumulators) for accumulators in sessions),
+                "max_per_session": self.max_per_session,
+                "idle_timeout": self.idle_timeout,
+            }
@@ -0,0 +1,476 @@
+"""
+Statistics engine for the Calculator MCP server.
+Moments are accumulated in a single pass (Welford's algorithm), order
+statistics use selection instead of a full sort, and operands can arrive as
+packed float64 data instead of long JSON lists. Inputs at or above
+NUMPY_THRESHOLD values are handed to NumPy when it is installed.
+"""
+
+import base64
+import math
+import os
+import random
+import sys
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+# NumPy is optional; without it every operation uses the pure-Python engine
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Below this size sorting a copy (in C) beats partitioning in Python
+SELECT_SORT_THRESHOLD = 8192
+
+# Values per block in RunningStats.extend
+EXTEND_BLOCK_SIZE = 4096
+
+# Smallest input handed to NumPy (see benchmarks/stats_backends.py)
+NUMPY_THRESHOLD = int(os.getenv("CALC_NUMPY_THRESHOLD", "1000"))
+
+# Operations the NumPy backend implements; mode stays on hash counting
+NUMPY_OPERATIONS = frozenset({
+    "sum", "product", "mean", "average", "median", "std_dev", "standard_deviation",
+    "variance", "min", "max", "range", "quantiles", "stats",
+})
+
+
+class StatsError(ValueError):
+    """Raised when operands cannot be decoded or a statistic is undefined"""
+    pass
+
+
+Operands = Union[Sequence[float], str, bytes]
+
+
+def decode_operands(operands: Operands) -> array:
+    """
+    Normalize operands to a packed array('d').
+
+    Args:
+        operands: A list of numbers, an array('d'), raw little-endian float64
+            bytes, or the same bytes base64-encoded as a string
+
+    Raises:
+        StatsError: If the operands are not numbers or not valid packed data
+    """
+    if isinstance(operands, array) and operands.typecode == 'd':
+        return operands
+    if isinstance(operands, str):
+        try:
+            operands = base64.b64decode(operands, validate=True)
+        except ValueError:
+            raise StatsError("Packed operands must be base64-encoded float64 data")
+    if isinstance(operands, (bytes, bytearray, memoryview)):
+        if len(operands) % 8:
+            raise StatsError("Packed operands must be a whole number of float64 values")
+        values = array('d')
+        values.frombytes(operands)
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+    try:
+        return array('d', operands)
+    except TypeError:
+        # Numeric strings and other float()-convertible values
+        try:
+            return array('d', (float(x) for x in operands))
+        except (TypeError, ValueError):
+            raise StatsError("Operands must be numbers")
+
+
+def encode_operands(values: Iterable[float]) -> str:
+    """Pack numbers as base64 little-endian float64 (the inverse of decode_operands)"""
+    packed = array('d', values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+class RunningStats:
+    """Count, sum, mean, variance, min and max accumulated in one pass"""
+
+    __slots__ = ("count", "total", "mean", "m2", "minimum", "maximum")
+
+    def __init__(self, values: Iterable[float] = ()):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.extend(values)
+
+    def push(self, x: float):
+        """Add one value"""
+        self.count += 1
+        self.total += x
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.minimum:
+            self.minimum = x
+        if x > self.maximum:
+            self.maximum = x
+
+    def extend(self, values: Iterable[float]):
+        """
+        Add many values.
+
+        Values are taken in cache-sized blocks: each block's mean and squared
+        deviations are computed with C-level sum/min/max while it is hot, then
+        merged in, so the data is still read once and stays numerically stable.
+        """
+        if not isinstance(values, (list, tuple, array)):
+            values = list(values)
+        for start in range(0, len(values), EXTEND_BLOCK_SIZE):
+            block = values[start:start + EXTEND_BLOCK_SIZE]
+            count = len(block)
+            total = sum(block)
+            mean = total / count
+            self._merge_moments(
+                count,
+                total,
+                mean,
+                sum([(x - mean) * (x - mean) for x in block]),
+                min(block),
+                max(block),
+            )
+
+    def _merge_moments(self, count: int, total: float, mean: float, m2: float, minimum: float, maximum: float):
+        """Combine with the moments of another set of values (Chan et al.)"""
+        if not count:
+            return
+        combined = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / combined
+        self.m2 += m2 + delta * delta * self.count * count / combined
+        self.count = combined
+        self.total += total
+        self.minimum = min(self.minimum, minimum)
+        self.maximum = max(self.maximum, maximum)
+
+    def merge(self, other: "RunningStats"):
+        """Combine with stats of another set of values"""
+        self._merge_moments(other.count, other.total, other.mean, other.m2, other.minimum, other.maximum)
+
+    @property
+    def variance(self) -> float:
+        """Population variance"""
+        return self.m2 / self.count if self.count else math.nan
+
+    @property
+    def sample_variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std_dev(self) -> float:
+        return math.sqrt(self.variance) if self.count else math.nan
+
+    def summary(self) -> Dict[str, Any]:
+        """All moments at once"""
+        if not self.count:
+            raise StatsError("No operands provided")
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.mean,
+            "variance": self.variance,
+            "std_dev": self.std_dev,
+            "min": self.minimum,
+            "max": self.maximum,
+            "range": self.maximum - self.minimum,
+        }
+
+
+def select(values: Sequence[float], k: int) -> float:
+    """
+    k-th smallest value (0-based) by selection, without sorting everything.
+
+    Floyd-Rivest style: two pivots taken from a sorted random sample bracket
+    the k-th value, and one filtering pass keeps only the values between them
+    (usually a tiny fraction). If the bracket misses or does not shrink the
+    input (many duplicates), a random-pivot quickselect round is used
+    instead. Expected work is linear.
+    """
+    if not 0 <= k < len(values):
+        raise StatsError(f"Order statistic {k} out of range for {len(values)} values")
+    while len(values) > SELECT_SORT_THRESHOLD:
+        n = len(values)
+        sample_size = max(64, int(n ** 0.5))
+        sample = sorted(values[i] for i in random.sample(range(n), sample_size))
+        position = k * sample_size // n
+        spread = int(sample_size ** 0.5)
+        low = sample[max(0, position - spread)]
+        high = sample[min(sample_size - 1, position + spread)]
+        below = sum(map(low.__gt__, values))
+        middle = [x for x in values if low <= x <= high]
+        if below <= k < below + len(middle) < below + n:
+            values, k = middle, k - below
+            continue
+
+        pivot = values[random.randrange(n)]
+        lows = [x for x in values if x < pivot]
+        if k < len(lows):
+            values = lows
+            continue
+        highs = [x for x in values if x > pivot]
+        equal = n - len(lows) - len(highs)
+        if k < len(lows) + equal:
+            return pivot
+        k -= len(lows) + equal
+        values = highs
+    return sorted(values)[k]
+
+
+def quantile(values: Sequence[float], q: float) -> float:
+    """
+    q-quantile (0 <= q <= 1) with linear interpolation between order
+    statistics (the same definition as numpy.quantile's default).
+    """
+    if not 0 <= q <= 1:
+        raise StatsError("Quantiles must be between 0 and 1")
+    if not len(values):
+        raise StatsError("No operands provided")
+    if any(map(math.isnan, values)):
+        return math.nan
+    position = (len(values) - 1) * q
+    lower = int(position)
+    fraction = position - lower
+    low = select(values, lower)
+    if not fraction:
+        return low
+    return low + fraction * (select(values, lower + 1) - low)
+
+
+def quantiles(values: Sequence[float], qs: Sequence[float]) -> List[float]:
+    """Several quantiles; sorts once when that is cheaper than repeated selection"""
+    if len(qs) <= 2 or len(values) <= SELECT_SORT_THRESHOLD:
+        return [quantile(values, q) for q in qs]
+    if any(map(math.isnan, values)):
+        return [math.nan] * len(qs)
+    ordered = sorted(values)
+    result = []
+    for q in qs:
+        if not 0 <= q <= 1:
+            raise StatsError("Quantiles must be between 0 and 1")
+        position = (len(ordered) - 1) * q
+        lower = int(position)
+        fraction = position - lower
+        upper = ordered[min(lower + 1, len(ordered) - 1)]
+        result.append(ordered[lower] + fraction * (upper - ordered[lower]) if fraction else ordered[lower])
+    return result
+
+
+def mode(values: Iterable[float]) -> Union[float, List[float]]:
+    """Most frequent value by hash counting, or all of them on a tie"""
+    counts = Counter(values)
+    if not counts:
+        raise StatsError("No operands provided")
+    max_count = max(counts.values())
+    modes = [value for value, count in counts.items() if count == max_count]
+    return modes[0] if len(modes) == 1 else modes
+
+
+def describe(values: Sequence[float], qs: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+    """Moments from one pass plus median (and optional quantiles) by selection"""
+    result = RunningStats(values).summary()
+    result["median"] = quantile(values, 0.5)
+    if qs:
+        result["quantiles"] = dict(zip((str(q) for q in qs), quantiles(values, qs)))
+    return result
+
+
+def use_numpy(operation: str, count: int, threshold: Optional[int] = None) -> bool:
+    """Whether `operation` over `count` values should go to the NumPy backend"""
+    threshold = NUMPY_THRESHOLD if threshold is None else threshold
+    return np is not None and count >= threshold and operation in NUMPY_OPERATIONS
+
+
+def numpy_calculate(operation: str, values: Sequence[float], qs: Optional[Sequence[float]] = None) -> Any:
+    """
+    NumPy implementation of the advanced_calculate operations.
+
+    An array('d') is wrapped without copying. Results are plain Python
+    floats, with the same definitions as the pure-Python engine (population
+    variance, linearly interpolated quantiles).
+    """
+    if np is None:
+        raise StatsError("NumPy is not installed")
+    if isinstance(values, array):
+        data = np.frombuffer(values, dtype=np.float64)
+    else:
+        data = np.asarray(values, dtype=np.float64)
+    if not data.size:
+        raise StatsError("No operands provided")
+
+    if operation == "sum":
+        return float(data.sum())
+    if operation == "product":
+        return float(data.prod())
+    if operation in ("mean", "average"):
+        return float(data.mean())
+    if operation == "median":
+        return float(np.median(data))
+    if operation in ("std_dev", "standard_deviation"):
+        return float(data.std())
+    if operation == "variance":
+        return float(data.var())
+    if operation == "min":
+        return float(data.min())
+    if operation == "max":
+        return float(data.max())
+    if operation == "range":
+        return float(np.ptp(data))
+    if operation == "quantiles":
+        if not qs:
+            raise StatsError("No quantiles provided")
+        return dict(zip((str(q) for q in qs), _numpy_quantiles(data, qs)))
+    if operation == "stats":
+        minimum, maximum = float(data.min()), float(data.max())
+        variance = float(data.var())
+        result = {
+            "count": int(data.size),
+            "sum": float(data.sum()),
+            "mean": float(data.mean()),
+            "variance": variance,
+            "std_dev": math.sqrt(variance),
+            "min": minimum,
+            "max": maximum,
+            "range": maximum - minimum,
+            "median": float(np.median(data)),
+        }
+        if qs:
+            result["quantiles"] = dict(zip((str(q) for q in qs), _numpy_quantiles(data, qs)))
+        return result
+    raise StatsError(f"Unknown operation: {operation}")
+
+
+def _numpy_quantiles(data: Any, qs: Sequence[float]) -> List[float]:
+    if any(not 0 <= q <= 1 for q in qs):
+        raise StatsError("Quantiles must be between 0 and 1")
+    return [float(value) for value in np.quantile(data, qs)]
+
+
+class TDigest:
+    """
+    Merging t-digest for approximate quantiles in bounded memory.
+
+    Values are buffered and periodically merged into at most about
+    `compression` centroids, kept small near the tails (k1 scale function)
+    so extreme quantiles stay accurate. Min and max are exact.
+    """
+
+    def __init__(self, compression: float = 100.0, buffer_size: int = 500):
+        """
+        Args:
+            compression: Accuracy/size trade-off (roughly the centroid count)
+            buffer_size: Values buffered before they are merged in
+        """
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self._means: List[float] = []
+        self._weights: List[float] = []
+        self._buffer: List[float] = []
+
+    def __len__(self) -> int:
+        return self.count + len(self._buffer)
+
+    def add(self, x: float):
+        self._buffer.append(x)
+        if len(self._buffer) >= self.buffer_size:
+            self._compress()
+
+    def extend(self, values: Iterable[float]):
+        self._buffer.extend(values)
+        if len(self._buffer) >= self.buffer_size:
+            self._compress()
+
+    def merge(self, other: "TDigest"):
+        """Fold another digest's centroids into this one"""
+        other._compress()
+        self._compress()
+        if not other.count:
+            return
+        self._merge_points(list(zip(other._means, other._weights)) + list(zip(self._means, self._weights)))
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def centroids(self) -> int:
+        self._compress()
+        return len(self._means)
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q(self, k: float) -> float:
+        return (math.sin(min(k, self.compression / 4) * 2 * math.pi / self.compression) + 1) / 2
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        buffer, self._buffer = self._buffer, []
+        self.minimum = min(self.minimum, min(buffer))
+        self.maximum = max(self.maximum, max(buffer))
+        self._merge_points(list(zip(self._means, self._weights)) + [(x, 1.0) for x in buffer])
+
+    def _merge_points(self, points: List[tuple]):
+        """Greedily merge sorted (mean, weight) points under the k1 size limit"""
+        points.sort()
+        total = sum(weight for _, weight in points)
+        means: List[float] = []
+        weights: List[float] = []
+        mean, weight = points[0]
+        merged = 0.0
+        limit = total * self._q(self._k(0.0) + 1)
+        for next_mean, next_weight in points[1:]:
+            if merged + weight + next_weight <= limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                merged += weight
+                limit = total * self._q(self._k(merged / total) + 1)
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self._means, self._weights = means, weights
+        self.count = int(round(total))
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (0 <= q <= 1) by interpolating between centroid centers"""
+        if not 0 <= q <= 1:
+            raise StatsError("Quantiles must be between 0 and 1")
+        self._compress()
+        if not self.count:
+            raise StatsError("No values")
+        if q == 0:
+            return self.minimum
+        if q == 1:
+            return self.maximum
+        means, weights = self._means, self._weights
+        if len(means) == 1:
+            return means[0]
+
+        target = q * self.count
+        if target < weights[0] / 2:
+            return self.minimum + (means[0] - self.minimum) * target / (weights[0] / 2)
+        if target > self.count - weights[-1] / 2:
+            tail = self.count - target
+            return self.maximum - (self.maximum - means[-1]) * tail / (weights[-1] / 2)
+
+        center = weights[0] / 2
+        for i in range(len(means) - 1):
+            next_center = center + (weights[i] + weights[i + 1]) / 2
+            if target <= next_center:
+                fraction = (target - center) / (next_center - center)
+                return means[i] + fraction * (means[i + 1] - means[i])
+            center = next_center
+        return means[-1]
@@ -1,40 +1,25 @@
 # combined_mcp.py
-import os
-from mcp.server.fastmcp import FastMCP
-# import functions from your tool files (make sure these files do NOT create their own FastMCP)
-from mcp_calculator import calculate, advanced_calculate, convert_base
-from live_search import web_search, news_search
+# Tool modules are mounted under a name prefix; each mounted tool is the module's own,
+# so every tool of both servers is available with no wrappers to keep in sync.
+# tools/list is answered from each module's cached manifest (see lazy_tools.py), and a
+# module is only imported by the first call of one of its tools
+from lazy_tools import ComposedServer
 
 # Create one MCP server
-mcp = FastMCP("Combined MCP Server")
+mcp = ComposedServer("Combined MCP Server")
 
-# --------- Calculator tools ---------
-@mcp.tool()
-def calc_eval(expression: str):
-    """Evaluate a math expression like '2+2'."""
-    return calculate(expression)
+# --------- Calculator tools (calc_calculate, calc_convert_base, ...) ---------
+mcp.mount("calc", "mcp_calculator")
 
-@mcp.tool()
-def calc_advanced(operation: str, operands: list, **kwargs):
-    """Perform advanced calculations like add, subtract, multiply, etc."""
-    return advanced_calculate(operation, operands, **kwargs)
+# --------- Tavily search tools (tavily_web_search, tavily_multi_search, ...) ---------
+mcp.mount("tavily", "live_search", on_load="start_shared_resources", on_close="close_shared_resources")
 
-@mcp.tool()
-def calc_convert(number: str, from_base: int, to_base: int):
-    """Convert a number between bases (e.g. binary to decimal)."""
-    return convert_base(number, from_base, to_base)
-
-# --------- Tavily search tools ---------
-@mcp.tool()
-def tavily_web_search(query: str, api_key: str = None, max_results: int = 5, search_depth: str = "basic", include_answer: bool = True):
-    """Search the web with Tavily."""
-    return web_search(query, api_key=api_key, max_results=max_results, search_depth=search_depth, include_answer=include_answer)
-
-@mcp.tool()
-def tavily_news_search(query: str, api_key: str = None, days: int = 7, max_results: int = 5, include_answer: bool = True):
-    """Search for news articles with Tavily."""
-    return news_search(query, api_key=api_key, days=days, max_results=max_results, include_answer=include_answer)
+# --------- Server status ---------
+@mcp.resource("stats://tool-modules", mime_type="application/json")
+def tool_module_stats():
+    """Which tool modules have been loaded, their import times and mounted tools"""
+    return mcp.registry.stats()
 
 
     
-app = mcp.streamable_http_app()
\ No newline at end of file
+app = mcp.registry.attach_lifespan(mcp.streamable_http_app())
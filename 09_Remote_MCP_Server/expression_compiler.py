@@ -0,0 +1,724 @@
+"""
+AST-based expression compiler for the Calculator MCP server.
+Parses an expression once, validates it against a whitelist of node types,
+functions and constants, and compiles it into a reusable Python function.
+Compiled forms are kept in a bounded LRU keyed by the normalized expression.
+
+When a digit limit is set, integer sizes are bounded at compile time: powers
+and factorials whose result provably exceeds the limit are rejected, the ones
+whose operands are not known until evaluation get a cheap runtime check, and
+every compiled form carries a rough cost estimate.
+
+Other number types (e.g. Decimal, Fraction) reuse the same pipeline: numeric
+literals are converted from their source text, and constants given as
+callables are evaluated at call time (so they can follow a decimal precision).
+
+Before code generation the tree is optimized: cheap constant subtrees are
+folded, a few exact algebraic identities are applied and repeated subtrees
+are computed once. The savings matter most for batch evaluation, where every
+operation removed is removed once per point.
+"""
+
+import ast
+import functools
+import math
+import operator
+from fractions import Fraction
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression is malformed or uses something not allowed"""
+    pass
+
+
+# Operators allowed in expressions; "^" (BitXor) is rewritten to "**"
+BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.BitXor)
+UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+
+class CompiledExpression:
+    """A validated expression compiled into a Python function"""
+
+    def __init__(
+        self,
+        source: str,
+        variables: Tuple[str, ...],
+        function: Callable[..., Any],
+        tree: ast.expr,
+        cost: float = 0.0,
+        guarded: bool = False,
+        nodes_saved: int = 0
+    ):
+        """
+        Args:
+            source: Normalized expression text
+            variables: Names of the free variables, in parameter order
+            function: Compiled function taking the variables positionally
+            tree: Validated expression AST (after rewriting and optimization)
+            cost: Estimated work in rough "digit operations"
+            guarded: Whether some power/factorial is only bounded at runtime
+            nodes_saved: Operations per evaluation removed by the optimizer
+        """
+        self.source = source
+        self.variables = variables
+        self.function = function
+        self.tree = tree
+        self.cost = cost
+        self.guarded = guarded
+        self.nodes_saved = nodes_saved
+
+    def __call__(self, *args: Any) -> Any:
+        return self.function(*args)
+
+    def evaluate(self, values: Optional[Mapping[str, Any]] = None) -> Any:
+        """Evaluate with variables bound by name"""
+        values = values or {}
+        missing = [name for name in self.variables if name not in values]
+        if missing:
+            raise ExpressionError(f"Missing values for variables: {', '.join(missing)}")
+        return self.function(*(values[name] for name in self.variables))
+
+    def map(self, columns: Sequence[Sequence[Any]], size: int) -> List[Any]:
+        """
+        Evaluate once per point of equal-length columns (one per variable).
+
+        Points where the expression is undefined (division by zero, domain
+        or overflow errors) evaluate to None.
+        """
+        if not columns:
+            return [_evaluate_point(self.function)] * size
+        try:
+            return list(map(self.function, *columns))
+        except (ArithmeticError, ValueError):
+            # Some point is undefined: redo point by point so only it becomes None
+            return [_evaluate_point(self.function, *point) for point in zip(*columns)]
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r}, variables={self.variables})"
+
+
+def _evaluate_point(function: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return function(*args)
+    except (ArithmeticError, ValueError):
+        return None
+
+
+class _Validator(ast.NodeTransformer):
+    """Checks every node against the whitelist and rewrites names and "^" """
+
+    def __init__(
+        self,
+        functions: Mapping[str, Any],
+        constants: Mapping[str, Any],
+        allow_variables: bool,
+        source: str = "",
+        number: Optional[Callable[[Any], Any]] = None,
+        exact: bool = False
+    ):
+        self.functions = functions
+        self.constants = constants
+        self.allow_variables = allow_variables
+        self.source = source
+        self.number = number
+        self.exact = exact
+        self.variables = set()
+        self.literals: List[Any] = []
+        self._literal_indexes: Dict[str, int] = {}
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
+
+    def visit_Expression(self, node: ast.Expression) -> ast.AST:
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if type(node.value) not in (int, float):
+            raise ExpressionError(f"Unsupported literal: {node.value!r}")
+        if self.number is None:
+            return node
+        # Floats are converted from their source text, so "0.1" is exactly one tenth
+        text = ast.get_source_segment(self.source, node).replace("_", "")
+        if text not in self._literal_indexes:
+            try:
+                self.literals.append(self.number(node.value if type(node.value) is int else text))
+            except (ArithmeticError, ValueError):
+                raise ExpressionError(f"Invalid number: {text}")
+            self._literal_indexes[text] = len(self.literals) - 1
+        index = ast.Constant(self._literal_indexes[text])
+        return ast.copy_location(ast.Subscript(value=ast.Name(id="_literals", ctx=ast.Load()), slice=index, ctx=ast.Load()), node)
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        if not isinstance(node.op, BINARY_OPERATORS):
+            raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        if isinstance(node.op, ast.BitXor):
+            node.op = ast.Pow()
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        if self.exact and isinstance(node.op, ast.Pow):
+            # Exact powers go through pow(), which refuses non-integral exponents
+            return ast.copy_location(ast.Call(func=ast.Name(id="pow", ctx=ast.Load()), args=[node.left, node.right], keywords=[]), node)
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        if not isinstance(node.op, UNARY_OPERATORS):
+            raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if not isinstance(node.func, ast.Name) or node.func.id not in self.functions:
+            name = node.func.id if isinstance(node.func, ast.Name) else type(node.func).__name__
+            raise ExpressionError(f"Unknown function: {name}")
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not supported")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in self.constants:
+            if callable(self.constants[node.id]):
+                return ast.copy_location(ast.Call(func=ast.Name(id=f"_constant_{node.id}", ctx=ast.Load()), args=[], keywords=[]), node)
+            return ast.copy_location(ast.Constant(self.constants[node.id]), node)
+        if node.id in self.functions:
+            raise ExpressionError(f"Function '{node.id}' must be called")
+        if not self.allow_variables or node.id.startswith("_"):
+            raise ExpressionError(f"Unknown name: {node.id}")
+        self.variables.add(node.id)
+        return node
+
+
+# Size classes tracked by the cost estimator
+_INT, _FLOAT, _UNKNOWN = "int", "float", "unknown"
+
+
+class _CostEstimator(ast.NodeTransformer):
+    """
+    Bounds integer results of the validated tree in log10 space.
+
+    Integers are the only values whose cost grows with their size: floats
+    overflow quickly instead. Known integer powers and factorials over the
+    digit limit raise ExpressionError; powers and factorials of values not
+    known until evaluation are rewritten to call checked versions.
+    """
+
+    def __init__(self, max_digits: int, literals: Sequence[Any] = (), exact: bool = False):
+        self.max_digits = max_digits
+        self.literals = literals
+        self.exact = exact
+        self.sizes: Dict[ast.AST, Tuple[str, float]] = {}
+        self.costs: Dict[ast.AST, float] = {}
+        self.cost = 0.0
+        self.guarded = False
+
+    def size(self, node: ast.AST) -> Tuple[str, float]:
+        return self.sizes.get(node, (_UNKNOWN, 0.0))
+
+    def result(self, node: ast.AST, kind: str, digits: float = 0.0, cost: float = 1.0) -> ast.AST:
+        if kind == _INT and digits > self.max_digits:
+            raise ExpressionError(f"Result too large: more than {self.max_digits} digits")
+        self.sizes[node] = (kind, digits)
+        self.costs[node] = cost + sum(self.costs.get(child, 0.0) for child in ast.iter_child_nodes(node))
+        self.cost += cost
+        return node
+
+    def guard(self, node: ast.AST, name: str, args: List[ast.expr]) -> ast.AST:
+        """Replace `node` with a call to the runtime-checked function `name`"""
+        self.guarded = True
+        call = ast.copy_location(ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[]), node)
+        return self.result(call, _UNKNOWN, cost=self.max_digits)
+
+    def power(self, node: ast.AST, base: ast.expr, exponent: ast.expr, guard_name: str) -> ast.AST:
+        (base_kind, base_digits), (exp_kind, exp_digits) = self.size(base), self.size(exponent)
+        if _FLOAT in (base_kind, exp_kind):
+            return self.result(node, _FLOAT)
+        if base_kind == _INT and exp_kind == _INT:
+            if base_digits == 0:
+                return self.result(node, _INT)
+            digits = 10 ** min(exp_digits, 20) * base_digits
+            return self.result(node, _INT, digits, cost=digits)
+        return self.guard(node, guard_name, [base, exponent])
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if isinstance(node.value, int):
+            return self.result(node, _INT, math.log10(max(abs(node.value), 1)))
+        return self.result(node, _FLOAT)
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        return self.result(node, _UNKNOWN)
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        # A converted literal: rationals are sized like integers, other types stay bounded
+        digits = _exact_digits(self.literals[node.slice.value])
+        if digits is None:
+            return self.result(node, _FLOAT)
+        return self.result(node, _INT, digits)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        return self.result(node, *self.size(node.operand))
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return self.power(node, node.left, node.right, "_checked_pow")
+
+        (left_kind, left), (right_kind, right) = self.size(node.left), self.size(node.right)
+        if self.exact:
+            # Rational results: numerators and denominators are cross-multiplied
+            if left_kind != _INT or right_kind != _INT:
+                return self.result(node, _UNKNOWN)
+            return self.result(node, _INT, left + right + math.log10(2), cost=1 + (left + right) / 100)
+        if isinstance(node.op, ast.Div) or _FLOAT in (left_kind, right_kind):
+            return self.result(node, _FLOAT)
+        if left_kind != _INT or right_kind != _INT:
+            return self.result(node, _UNKNOWN)
+        if isinstance(node.op, ast.Mult):
+            return self.result(node, _INT, left + right, cost=1 + (left + right) / 100)
+        if isinstance(node.op, ast.FloorDiv):
+            return self.result(node, _INT, left)
+        if isinstance(node.op, ast.Mod):
+            return self.result(node, _INT, min(left, right))
+        return self.result(node, _INT, max(left, right) + math.log10(2))
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        name = node.func.id
+        sizes = [self.size(arg) for arg in node.args]
+
+        if name == "pow" and len(node.args) == 2:
+            return self.power(node, node.args[0], node.args[1], "_checked_pow_call")
+        if name == "factorial" and len(node.args) == 1:
+            kind, digits = sizes[0]
+            if kind != _INT:
+                return self.guard(node, "_checked_factorial", node.args)
+            result_digits = _factorial_digits(10 ** min(digits, 20))
+            return self.result(node, _INT, result_digits, cost=result_digits)
+        if sizes and all(kind == _INT for kind, _ in sizes):
+            if name == "lcm":
+                return self.result(node, _INT, sum(digits for _, digits in sizes))
+            if name in ("gcd", "abs", "round", "floor", "ceil", "pow"):
+                return self.result(node, _INT, max(digits for _, digits in sizes))
+        if name in ("floor", "ceil", "round") or self.exact:
+            return self.result(node, _UNKNOWN)
+        return self.result(node, _FLOAT)
+
+
+def _factorial_digits(n: float) -> float:
+    """Decimal digits of n! (log10 via the gamma function)"""
+    return math.lgamma(n + 1) / math.log(10) if n > 1 else 0.0
+
+
+def _digits(value: int) -> float:
+    return value.bit_length() * math.log10(2)
+
+
+def _exact_digits(value: Any) -> Optional[float]:
+    """Digits of an int, or of the larger term of a Fraction; None for other types"""
+    if type(value) is int:
+        return _digits(value)
+    if type(value) is Fraction:
+        return max(_digits(value.numerator), _digits(value.denominator))
+    return None
+
+
+def _as_int(value: Any) -> Optional[int]:
+    """An int, or an integral Fraction, as int; None for anything else"""
+    if type(value) is int:
+        return value
+    if type(value) is Fraction and value.denominator == 1:
+        return value.numerator
+    return None
+
+
+# Operation nodes, counted for the optimizer's savings
+_OPERATIONS = (ast.BinOp, ast.UnaryOp, ast.Call)
+
+
+def _operations(node: ast.AST) -> int:
+    return sum(isinstance(child, _OPERATIONS) for child in ast.walk(node))
+
+
+def _is_int(node: ast.AST, value: int) -> bool:
+    return isinstance(node, ast.Constant) and type(node.value) is int and node.value == value
+
+
+class _Optimizer:
+    """
+    Rewrites a validated tree into an equivalent one with fewer operations.
+
+    - Constant folding: subtrees without variables whose estimated cost is at
+      most `fold_cost` are evaluated once, at compile time; subtrees that fail
+      (1/0, log(-1)) are left for evaluation to report
+    - Identities exact for ints and floats: x*1, 1*x, x-0, x**1 (also in
+      its runtime-checked form), +x, -(-x); x+0 and 0+x only when x is an
+      int, since -0.0 + 0 is 0.0
+    - Common subexpressions: every repeated subtree is computed once and
+      reused through an assignment expression (all functions are pure and
+      there is no short-circuiting, so every occurrence is always evaluated)
+
+    Folding and identities need plain int/float literals and the cost
+    estimator's sizes; other number types only get subexpression elimination.
+    """
+
+    def __init__(
+        self,
+        functions: Mapping[str, Any],
+        evaluate: Callable[[ast.expr], Any],
+        estimator: Optional[_CostEstimator] = None,
+        fold_cost: float = 0.0,
+        max_digits: Optional[int] = None
+    ):
+        self.functions = functions
+        self.evaluate = evaluate
+        self.estimator = estimator
+        self.fold_cost = fold_cost
+        self.max_digits = max_digits
+        self.folded = 0
+        self.simplified = 0
+        self.eliminated = 0
+
+    def optimize(self, node: ast.expr) -> ast.expr:
+        if self.estimator is not None:
+            node = self.fold(node, self._constants(node))
+            node = self.simplify(node)
+        return self.eliminate(node)
+
+    # Constant folding
+
+    def _constants(self, tree: ast.AST) -> set:
+        """Nodes whose value does not depend on variables or evaluation-time state"""
+        constants = set()
+
+        def visit(node: ast.AST) -> bool:
+            children = [visit(child) for child in ast.iter_child_nodes(node)]
+            if isinstance(node, ast.Constant):
+                constant = True
+            elif isinstance(node, (ast.BinOp, ast.UnaryOp)):
+                constant = all(children)
+            elif isinstance(node, ast.Call):
+                # Checked wrappers and lazy constants ("_" names) stay at evaluation
+                constant = node.func.id in self.functions and all(children[1:])
+            else:
+                constant = isinstance(node, (ast.operator, ast.unaryop, ast.expr_context))
+            if constant:
+                constants.add(node)
+            return constant
+
+        visit(tree)
+        return constants
+
+    def _value(self, node: ast.expr) -> Any:
+        """The folded value of a constant subtree, or None to leave it in place"""
+        if self.estimator.costs.get(node, math.inf) > self.fold_cost:
+            return None
+        try:
+            value = self.evaluate(node)
+        except Exception:
+            return None
+        if isinstance(value, float) and math.isfinite(value):
+            return float(value)
+        if type(value) is int and (self.max_digits is None or _digits(value) <= self.max_digits):
+            return value
+        return None
+
+    def fold(self, node: ast.expr, constants: set) -> ast.expr:
+        if node in constants and not isinstance(node, ast.Constant):
+            value = self._value(node)
+            if value is not None:
+                self.folded += 1
+                return ast.copy_location(ast.Constant(value), node)
+        if isinstance(node, ast.BinOp):
+            node.left = self.fold(node.left, constants)
+            node.right = self.fold(node.right, constants)
+        elif isinstance(node, ast.UnaryOp):
+            node.operand = self.fold(node.operand, constants)
+        elif isinstance(node, ast.Call):
+            node.args = [self.fold(arg, constants) for arg in node.args]
+        return node
+
+    # Algebraic identities
+
+    def simplify(self, node: ast.expr) -> ast.expr:
+        if isinstance(node, ast.BinOp):
+            node.left = self.simplify(node.left)
+            node.right = self.simplify(node.right)
+            op, left, right = node.op, node.left, node.right
+            if isinstance(op, ast.Mult) and _is_int(right, 1) or isinstance(op, ast.Sub) and _is_int(right, 0):
+                return self._simplified(left)
+            if isinstance(op, ast.Pow) and _is_int(right, 1):
+                return self._simplified(left)
+            if isinstance(op, ast.Mult) and _is_int(left, 1):
+                return self._simplified(right)
+            # -0.0 + 0 is 0.0: adding zero is only an identity for integers
+            if isinstance(op, ast.Add) and _is_int(right, 0) and self._is_integer(left):
+                return self._simplified(left)
+            if isinstance(op, ast.Add) and _is_int(left, 0) and self._is_integer(right):
+                return self._simplified(right)
+        elif isinstance(node, ast.UnaryOp):
+            node.operand = self.simplify(node.operand)
+            if isinstance(node.op, ast.UAdd):
+                return self._simplified(node.operand)
+            if isinstance(node.op, ast.USub) and isinstance(node.operand, ast.UnaryOp) and isinstance(node.operand.op, ast.USub):
+                return self._simplified(node.operand.operand)
+        elif isinstance(node, ast.Call):
+            node.args = [self.simplify(arg) for arg in node.args]
+            if node.func.id == "_checked_pow" and _is_int(node.args[1], 1):
+                return self._simplified(node.args[0])
+        return node
+
+    def _is_integer(self, node: ast.expr) -> bool:
+        """Whether a subtree is known to evaluate to an int"""
+        if isinstance(node, ast.Constant):
+            return type(node.value) is int
+        return self.estimator.size(node)[0] == _INT
+
+    def _simplified(self, node: ast.expr) -> ast.expr:
+        self.simplified += 1
+        return node
+
+    # Common-subexpression elimination
+
+    def _keys(self, tree: ast.AST) -> Dict[ast.AST, int]:
+        """Structural id per node: equal ids mean equal subtrees"""
+        table: Dict[tuple, int] = {}
+        keys: Dict[ast.AST, int] = {}
+
+        def visit(node: ast.AST) -> int:
+            children = tuple(visit(child) for child in ast.iter_child_nodes(node))
+            if isinstance(node, ast.Constant):
+                label = (type(node.value).__name__, repr(node.value))
+            elif isinstance(node, ast.Name):
+                label = node.id
+            else:
+                label = None
+            key = table.setdefault((type(node).__name__, label, children), len(table))
+            keys[node] = key
+            return key
+
+        visit(tree)
+        return keys
+
+    def eliminate(self, tree: ast.expr) -> ast.expr:
+        keys = self._keys(tree)
+        counts: Dict[int, int] = {}
+        for node in ast.walk(tree):
+            if isinstance(node, _OPERATIONS):
+                counts[keys[node]] = counts.get(keys[node], 0) + 1
+        names: Dict[int, str] = {}
+        used = set()
+
+        def visit(node: ast.expr) -> ast.expr:
+            key = keys.get(node)
+            repeated = isinstance(node, _OPERATIONS) and counts[key] > 1
+            if repeated and key in names:
+                # Evaluated before: the earlier occurrence comes first in evaluation order
+                used.add(names[key])
+                return ast.copy_location(ast.Name(id=names[key], ctx=ast.Load()), node)
+            if repeated:
+                names[key] = f"_cse{len(names)}"
+            if isinstance(node, ast.BinOp):
+                node.left = visit(node.left)
+                node.right = visit(node.right)
+            elif isinstance(node, ast.UnaryOp):
+                node.operand = visit(node.operand)
+            elif isinstance(node, ast.Call):
+                node.args = [visit(arg) for arg in node.args]
+            if repeated:
+                target = ast.Name(id=names[key], ctx=ast.Store())
+                return ast.copy_location(ast.NamedExpr(target=target, value=node), node)
+            return node
+
+        tree = visit(tree)
+        self.eliminated = len(used)
+        return _Unassign(used).visit(tree) if len(used) < len(names) else tree
+
+
+class _Unassign(ast.NodeTransformer):
+    """Drops assignment expressions whose name is never read"""
+
+    def __init__(self, used: set):
+        self.used = used
+
+    def visit_NamedExpr(self, node: ast.NamedExpr) -> ast.AST:
+        self.generic_visit(node)
+        return node if node.target.id in self.used else node.value
+
+
+class ExpressionCompiler:
+    """Compiles expressions against a fixed set of functions and constants"""
+
+    def __init__(
+        self,
+        functions: Dict[str, Any],
+        constants: Dict[str, Any],
+        cache_size: int = 1024,
+        max_digits: Optional[int] = None,
+        max_length: int = 10000,
+        number: Optional[Callable[[Any], Any]] = None,
+        exact: bool = False,
+        optimize: bool = True,
+        fold_cost: float = 1000.0
+    ):
+        """
+        Args:
+            functions: Callable names allowed in expressions
+            constants: Constant names, inlined at compile time; callables are
+                called at evaluation time instead
+            cache_size: Number of compiled expressions kept in the LRU
+            max_digits: Largest integer result (in decimal digits) a power or
+                factorial may produce; None disables cost estimation
+            max_length: Longest expression accepted, in characters
+            number: Type built from each numeric literal (from the source text
+                for floats), e.g. Decimal; None keeps Python ints and floats
+            exact: Rational arithmetic: "**" calls the `pow` function, and the
+                cost estimator bounds numerator/denominator growth of every operation
+            optimize: Fold constants, apply identities and share repeated subtrees
+            fold_cost: Largest estimated cost of a constant subtree evaluated at
+                compile time (folding needs max_digits and plain literals)
+        """
+        self.functions = dict(functions)
+        self.constants = dict(constants)
+        self.max_digits = max_digits
+        self.max_length = max_length
+        self.number = number
+        self.exact = exact
+        self.optimize = optimize
+        self.fold_cost = fold_cost
+        self.optimizer_stats = {"folded": 0, "simplified": 0, "eliminated": 0, "nodes_saved": 0}
+        self._namespace = {"__builtins__": {}, **self.functions}
+        self._namespace.update({
+            f"_constant_{name}": value for name, value in self.constants.items() if callable(value)
+        })
+        if max_digits is not None:
+            self._namespace.update({
+                "_checked_pow": self._checked(operator.pow, self._pow_digits),
+                "_checked_pow_call": self._checked(self.functions.get("pow", pow), self._pow_digits),
+                "_checked_factorial": self._checked(self.functions.get("factorial", math.factorial), self._factorial_digits),
+            })
+        self._compile_cached = functools.lru_cache(maxsize=cache_size)(self._compile)
+
+    @staticmethod
+    def _pow_digits(base: Any, exponent: Any = None, *modulus: Any) -> float:
+        exponent = _as_int(exponent)
+        digits = _exact_digits(base)
+        if modulus or digits is None or exponent is None or exponent == 0 or abs(base) in (0, 1):
+            return 0.0
+        if type(base) is int:
+            digits = math.log10(abs(base))
+        return abs(exponent) * digits
+
+    @staticmethod
+    def _factorial_digits(n: Any) -> float:
+        n = _as_int(n)
+        return _factorial_digits(n) if n is not None else 0.0
+
+    def _checked(self, function: Callable[..., Any], digits: Callable[..., float]) -> Callable[..., Any]:
+        """Wrap `function` so it refuses integer results over max_digits"""
+        max_digits = self.max_digits
+
+        def checked(*args: Any) -> Any:
+            if digits(*args) > max_digits:
+                raise OverflowError(f"more than {max_digits} digits")
+            return function(*args)
+
+        return checked
+
+    def check_result(self, value: Any):
+        """Raise OverflowError if an integer (or rational) result is over max_digits"""
+        if self.max_digits is not None and (_exact_digits(value) or 0) > self.max_digits:
+            raise OverflowError(f"more than {self.max_digits} digits")
+
+    @staticmethod
+    def normalize(expression: str) -> str:
+        """Cache key for an expression: all whitespace removed"""
+        return "".join(expression.split())
+
+    def compile(self, expression: str, allow_variables: bool = False) -> CompiledExpression:
+        """
+        Compile an expression, reusing a cached compiled form when possible.
+
+        Args:
+            expression: Expression text
+            allow_variables: Treat unknown names as free variables instead of errors
+
+        Raises:
+            ExpressionError: If the expression is malformed or not allowed
+        """
+        if not isinstance(expression, str) or not expression.strip():
+            raise ExpressionError("Empty expression")
+        if len(expression) > self.max_length:
+            raise ExpressionError(f"Expression too long: more than {self.max_length} characters")
+        return self._compile_cached(self.normalize(expression), allow_variables)
+
+    def cache_info(self):
+        """functools-style hits/misses/currsize of the compiled-expression LRU"""
+        return self._compile_cached.cache_info()
+
+    def cache_clear(self):
+        self._compile_cached.cache_clear()
+
+    def _compile(self, source: str, allow_variables: bool) -> CompiledExpression:
+        try:
+            tree = ast.parse(source, mode="eval")
+            validator = _Validator(self.functions, self.constants, allow_variables, source, self.number, self.exact)
+            tree = validator.visit(tree)
+            estimator = None
+            if self.max_digits is not None:
+                estimator = _CostEstimator(self.max_digits, validator.literals, self.exact)
+                tree.body = estimator.visit(tree.body)
+            nodes_saved = 0
+            if self.optimize:
+                tree.body, nodes_saved = self._optimize(tree.body, estimator)
+            variables = tuple(sorted(validator.variables))
+            function = self._build_function(tree.body, variables, tuple(validator.literals))
+        except SyntaxError as e:
+            raise ExpressionError(f"Invalid syntax: {e.msg}")
+        except (RecursionError, MemoryError):
+            raise ExpressionError("Expression is too deeply nested")
+
+        if estimator is None:
+            return CompiledExpression(source, variables, function, tree.body, nodes_saved=nodes_saved)
+        # Optimization may have removed every runtime check
+        guarded = estimator.guarded and any(
+            isinstance(node, ast.Call) and node.func.id.startswith("_checked_") for node in ast.walk(tree.body)
+        )
+        return CompiledExpression(source, variables, function, tree.body, estimator.cost, guarded, nodes_saved)
+
+    def _optimize(self, body: ast.expr, estimator: Optional[_CostEstimator]) -> Tuple[ast.expr, int]:
+        """Run the optimizer over a validated tree; returns it with the operations saved"""
+        before = _operations(body)
+        optimizer = _Optimizer(
+            self.functions,
+            lambda node: self._build_function(node, ())(),
+            estimator if self.number is None else None,
+            self.fold_cost,
+            self.max_digits
+        )
+        body = optimizer.optimize(body)
+        saved = before - _operations(body)
+        stats = self.optimizer_stats
+        stats["folded"] += optimizer.folded
+        stats["simplified"] += optimizer.simplified
+        stats["eliminated"] += optimizer.eliminated
+        stats["nodes_saved"] += saved
+        return body, saved
+
+    def _build_function(self, body: ast.expr, variables: Tuple[str, ...], literals: Tuple[Any, ...] = ()) -> Callable[..., Any]:
+        """Wrap the expression in `lambda <variables>: <body>` and compile it"""
+        function = ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg=name) for name in variables],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=body,
+        )
+        code = compile(ast.fix_missing_locations(ast.Expression(body=function)), "<expression>", "eval")
+        # Converted literals cannot be code constants; they live in the function's globals
+        namespace = {**self._namespace, "_literals": literals} if literals else self._namespace
+        return eval(code, namespace)
@@ -0,0 +1,241 @@
+"""
+Worker-process pool for running expensive expression evaluations.
+Each worker owns its own ExpressionCompiler; a call that exceeds its
+wall-clock budget gets its worker killed and replaced, so one pathological
+expression cannot pin the server process.
+"""
+
+import decimal
+import multiprocessing
+import queue
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+from expression_compiler import ExpressionCompiler
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+class EvaluationTimeout(Exception):
+    """Raised when an evaluation does not finish within its time budget"""
+    pass
+
+
+class WorkerCrashed(Exception):
+    """Raised when a worker dies mid-evaluation (e.g. hits its memory limit)"""
+    pass
+
+
+def _worker_main(
+    conn,
+    functions: Dict[str, Any],
+    constants: Dict[str, Any],
+    max_digits: Optional[int],
+    memory_limit_mb: int,
+    modes: Dict[str, Dict[str, Any]]
+):
+    """Worker loop: receive (expression, columns, size, mode, precision), send back (ok, value)"""
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    compilers = {"float": ExpressionCompiler(functions, constants, max_digits=max_digits)}
+    compilers.update({mode: ExpressionCompiler(**options) for mode, options in modes.items()})
+    conn.send((True, None))  # ready
+    while True:
+        try:
+            expression, columns, size, mode, precision = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            compiler = compilers[mode]
+            compiled = compiler.compile(expression, allow_variables=columns is not None)
+            with decimal.localcontext() as ctx:
+                if precision is not None:
+                    ctx.prec = precision
+                if columns is None:
+                    value = compiled()
+                    compiler.check_result(value)
+                else:
+                    value = compiled.map(columns, size)
+            conn.send((True, value))
+        except Exception as e:
+            try:
+                conn.send((False, e))
+            except Exception:
+                conn.send((False, RuntimeError(str(e))))
+
+
+class _Worker:
+    """One worker process and the parent end of its pipe"""
+
+    def __init__(self, context, args: tuple, startup_timeout: float = 30.0):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, *args), daemon=True)
+        self.process.start()
+        child_conn.close()
+        # Wait for the worker to be ready so startup does not eat into evaluation budgets
+        try:
+            if not self.conn.poll(startup_timeout):
+                raise WorkerCrashed("Evaluation worker did not start")
+            self.conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+            raise WorkerCrashed("Evaluation worker did not start")
+        except WorkerCrashed:
+            self.kill()
+            raise
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class EvaluationPool:
+    """
+    Fixed-size pool of evaluation workers with kill-on-timeout.
+
+    Workers are started on first use. Calls are blocking and thread-safe;
+    async callers should run them in a thread.
+    """
+
+    def __init__(
+        self,
+        functions: Dict[str, Any],
+        constants: Dict[str, Any],
+        max_digits: Optional[int] = None,
+        workers: int = 2,
+        timeout: float = 2.0,
+        memory_limit_mb: int = 0,
+        modes: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            functions: Function table for the workers' compilers (must be picklable)
+            constants: Constant table for the workers' compilers
+            max_digits: Integer digit limit passed to the workers' compilers
+            workers: Number of worker processes
+            timeout: Default wall-clock budget per evaluation, in seconds
+            memory_limit_mb: Address-space limit per worker (0 disables it)
+            modes: ExpressionCompiler keyword arguments of other evaluation
+                modes (e.g. Decimal literals), by mode name; "float" uses the
+                tables above
+        """
+        self._args = (dict(functions), dict(constants), max_digits, memory_limit_mb, dict(modes or {}))
+        self._context = multiprocessing.get_context("spawn")
+        self.size = workers
+        self.timeout = timeout
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.evaluations = 0
+        self.timeouts = 0
+        self.crashes = 0
+
+    def _checkout(self, timeout: float) -> _Worker:
+        """Take an idle worker, starting one if the pool is not full yet"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Evaluation pool is closed")
+            if self._started < self.size:
+                self._started += 1
+                try:
+                    return _Worker(self._context, self._args)
+                except Exception:
+                    self._started -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise EvaluationTimeout(f"No evaluation worker free within {timeout:g}s")
+
+    def _discard(self, worker: _Worker):
+        worker.kill()
+        with self._lock:
+            self._started -= 1
+
+    def evaluate(
+        self,
+        expression: str,
+        columns: Optional[Sequence[Sequence[Any]]] = None,
+        size: int = 0,
+        timeout: Optional[float] = None,
+        mode: str = "float",
+        precision: Optional[int] = None
+    ) -> Any:
+        """
+        Evaluate an expression in a worker process.
+
+        Args:
+            expression: Expression text (compiled in the worker)
+            columns: Per-variable arrays for a batch evaluation, or None for a single value
+            size: Number of points in the batch
+            timeout: Wall-clock budget in seconds (defaults to the pool timeout)
+            mode: Compiler to use ("float" or one of the pool's modes)
+            precision: Decimal context precision of the evaluation (None keeps the default)
+
+        Returns:
+            The value, or a list of values (None where undefined) for a batch
+
+        Raises:
+            EvaluationTimeout: If the budget runs out; the worker is killed
+            WorkerCrashed: If the worker dies during the evaluation
+            Exception: Whatever the evaluation itself raised
+        """
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._checkout(timeout)
+        self.evaluations += 1
+        try:
+            worker.conn.send((
+                expression, None if columns is None else [list(column) for column in columns], size, mode, precision
+            ))
+            if not worker.conn.poll(timeout):
+                self.timeouts += 1
+                self._discard(worker)
+                worker = None
+                raise EvaluationTimeout(f"Evaluation exceeded {timeout:g}s")
+            ok, value = worker.conn.recv()
+        except (EOFError, OSError):
+            self.crashes += 1
+            self._discard(worker)
+            worker = None
+            raise WorkerCrashed("Evaluation worker died")
+        finally:
+            if worker is not None:
+                self._idle.put(worker)
+
+        if not ok:
+            raise value
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size and evaluation counters"""
+        return {
+            "workers": self._started,
+            "max_workers": self.size,
+            "timeout": self.timeout,
+            "evaluations": self.evaluations,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+        }
+
+    def close(self):
+        """Kill all workers"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(worker)
@@ -0,0 +1,358 @@
+"""
+Lazy composition of MCP servers from tool modules.
+
+ComposedServer.mount() adds every tool, resource and prompt of another
+module's FastMCP server under a name prefix. The mounted tools go into the
+composed server's own tool table, so a call is dispatched and validated once,
+by the original tool, with no wrapper in between. A mounted module (with its
+dependencies and start-up work) is only imported by the first call of one
+of its tools (or read of one of its resources, or request for one of its
+prompts), so start-up time and memory do not grow with every module mounted.
+
+Listings are answered from a manifest of each mounted server: the tool
+schemas, resources, templates and prompts it would list. The manifest is
+generated once in a child process, so the server process itself never
+imports the module for it, and cached in the module's __pycache__ like
+a .pyc file; it is regenerated when the module's source changes.
+
+Generate a manifest by hand (it is written to the output path as JSON):
+
+    python lazy_tools.py <module> [server] <output.json>
+"""
+
+import asyncio
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Sequence
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import ContentBlock, GetPromptResult, Prompt as MCPPrompt, Resource as MCPResource
+from mcp.types import ResourceTemplate as MCPResourceTemplate, Tool as MCPTool
+
+
+class LazyModule:
+    """A tool module that is imported on first use"""
+
+    def __init__(self, name: str, on_load: Optional[str] = None, on_close: Optional[str] = None):
+        """
+        Args:
+            name: Importable module name
+            on_load: Function of the module called (on the event loop) right after import
+            on_close: Function of the module called when the server shuts down,
+                if the module was loaded; may be async
+        """
+        self.name = name
+        self.on_load = on_load
+        self.on_close = on_close
+        self.module: Optional[ModuleType] = None
+        self.import_seconds: Optional[float] = None
+        self.tools: List[str] = []
+        self._lock = threading.Lock()
+        self._loading: Optional[asyncio.Future] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.module is not None
+
+    def _import(self) -> ModuleType:
+        with self._lock:
+            if self.module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self.name)
+                self.import_seconds = time.perf_counter() - start
+                self.module = module
+            return self.module
+
+    async def load(self) -> ModuleType:
+        """
+        Import the module off the event loop, then run its on_load hook.
+
+        Concurrent first calls share one import.
+        """
+        if self.module is not None:
+            return self.module
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        try:
+            return await asyncio.shield(self._loading)
+        except Exception:
+            self._loading = None
+            raise
+
+    async def _load(self) -> ModuleType:
+        module = await asyncio.to_thread(self._import)
+        if self.on_load:
+            result = getattr(module, self.on_load)()
+            if inspect.isawaitable(result):
+                await result
+        return module
+
+    async def close(self):
+        if self.module is not None and self.on_close:
+            result = getattr(self.module, self.on_close)()
+            if inspect.isawaitable(result):
+                await result
+
+
+class ToolRegistry:
+    """Lazily loaded tool modules of one FastMCP server"""
+
+    def __init__(self, mcp: FastMCP):
+        self.mcp = mcp
+        self.modules: Dict[str, LazyModule] = {}
+
+    def module(self, name: str, on_load: Optional[str] = None, on_close: Optional[str] = None) -> LazyModule:
+        """Declare a tool module (not imported until it is first needed)"""
+        if name not in self.modules:
+            self.modules[name] = LazyModule(name, on_load=on_load, on_close=on_close)
+        return self.modules[name]
+
+    def attach_lifespan(self, app):
+        """Close the loaded modules' resources when a Starlette app shuts down"""
+        inner_lifespan = app.router.lifespan_context
+
+        @asynccontextmanager
+        async def lifespan(starlette_app):
+            async with inner_lifespan(starlette_app):
+                try:
+                    yield
+                finally:
+                    for module in self.modules.values():
+                        await module.close()
+
+        app.router.lifespan_context = lifespan
+        return app
+
+    def stats(self) -> Dict[str, Any]:
+        """Which modules are loaded and how long their imports took"""
+        return {
+            name: {
+                "loaded": module.loaded,
+                "import_seconds": module.import_seconds,
+                "tools": list(module.tools),
+            }
+            for name, module in self.modules.items()
+        }
+
+
+def describe_server(server: FastMCP) -> Dict[str, List[Dict[str, Any]]]:
+    """What a FastMCP server lists, as JSON-ready MCP objects"""
+
+    async def collect() -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            "tools": await server.list_tools(),
+            "resources": await server.list_resources(),
+            "resource_templates": await server.list_resource_templates(),
+            "prompts": await server.list_prompts(),
+        }
+
+    return {
+        kind: [item.model_dump(mode="json", exclude_none=True) for item in items]
+        for kind, items in asyncio.run(collect()).items()
+    }
+
+
+def _template_pattern(uri_template: str) -> "re.Pattern[str]":
+    # Same matching as FastMCP's ResourceTemplate.matches
+    return re.compile("^" + uri_template.replace("{", "(?P<").replace("}", ">[^/]+)") + "$")
+
+
+class _Mount:
+    """A FastMCP server of a lazily imported module, merged on first use"""
+
+    def __init__(self, prefix: str, module: LazyModule, server: str):
+        self.prefix = prefix
+        self.module = module
+        self.server = server
+        self.merged = False
+        self._lock = asyncio.Lock()
+        manifest = self._manifest()
+        self.tools = [
+            MCPTool.model_validate(dict(tool, name=prefix + tool["name"])) for tool in manifest["tools"]
+        ]
+        self.resources = [MCPResource.model_validate(resource) for resource in manifest["resources"]]
+        self.templates = [MCPResourceTemplate.model_validate(template) for template in manifest["resource_templates"]]
+        self.prompts = [
+            MCPPrompt.model_validate(dict(prompt, name=prefix + prompt["name"])) for prompt in manifest["prompts"]
+        ]
+        self._tool_names = {tool.name for tool in self.tools}
+        self._prompt_names = {prompt.name for prompt in self.prompts}
+        self._uris = {str(resource.uri) for resource in self.resources}
+        self._patterns = [_template_pattern(template.uriTemplate) for template in self.templates]
+
+    def _manifest(self) -> Dict[str, Any]:
+        """The cached manifest of the mounted server, regenerated if its source changed"""
+        spec = importlib.util.find_spec(self.module.name)
+        if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+            raise ImportError(f"Cannot find the source of module {self.module.name}")
+        with open(spec.origin, "rb") as f:
+            source = hashlib.sha256(f.read()).hexdigest()
+        path = os.path.join(os.path.dirname(spec.origin), "__pycache__", f"{self.module.name}.{self.server}.mcp-manifest.json")
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+            if manifest.get("source") == source:
+                return manifest
+        except (OSError, ValueError):
+            pass
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        output = path + f".{os.getpid()}.tmp"
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, sys.path)))
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), self.module.name, self.server, output],
+            env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+        with open(output) as f:
+            manifest = dict(json.load(f), source=source)
+        with open(output, "w") as f:
+            json.dump(manifest, f)
+        os.replace(output, path)
+        return manifest
+
+    def owns_tool(self, name: str) -> bool:
+        return name in self._tool_names
+
+    def owns_prompt(self, name: str) -> bool:
+        return name in self._prompt_names
+
+    def owns_resource(self, uri: str) -> bool:
+        return uri in self._uris or any(pattern.match(uri) for pattern in self._patterns)
+
+    async def merge(self, parent: FastMCP):
+        """Import the module and copy its server's tools, resources and prompts into `parent`"""
+        async with self._lock:
+            if self.merged:
+                return
+            server: FastMCP = getattr(await self.module.load(), self.server)
+            for tool in server._tool_manager.list_tools():
+                # Rebuilt from the original function: same schema and validation, new name
+                parent._tool_manager.add_tool(
+                    tool.fn,
+                    name=self.prefix + tool.name,
+                    title=tool.title,
+                    description=tool.description,
+                    annotations=tool.annotations,
+                )
+                self.module.tools.append(self.prefix + tool.name)
+            for resource in server._resource_manager.list_resources():
+                parent._resource_manager.add_resource(resource)
+            for template in server._resource_manager.list_templates():
+                parent._resource_manager.add_template(
+                    template.fn,
+                    template.uri_template,
+                    name=template.name,
+                    title=template.title,
+                    description=template.description,
+                    mime_type=template.mime_type,
+                )
+            for prompt in server._prompt_manager.list_prompts():
+                parent._prompt_manager.add_prompt(prompt.model_copy(update={"name": self.prefix + prompt.name}))
+            self.merged = True
+
+
+class ComposedServer(FastMCP):
+    """
+    FastMCP server that mounts the servers of other tool modules.
+
+    List requests add the manifests of the mounts not merged yet to the
+    composed server's own items and import nothing. call_tool(),
+    get_prompt() and read_resource() merge only the mount that owns the
+    name or URI, and nothing for the composed server's own items.
+    """
+
+    def __init__(self, name: Optional[str] = None, **settings: Any):
+        super().__init__(name, **settings)
+        self.registry = ToolRegistry(self)
+        self._mounts: List[_Mount] = []
+
+    def mount(
+        self,
+        prefix: str,
+        module: str,
+        server: str = "mcp",
+        on_load: Optional[str] = None,
+        on_close: Optional[str] = None,
+        separator: str = "_"
+    ):
+        """
+        Mount the FastMCP server `server` of `module` under `prefix`.
+
+        Its tools and prompts are named "<prefix><separator><name>";
+        resources keep their URIs. The module's manifest is read (or, if
+        missing or stale, generated in a child process) right away.
+
+        Args:
+            prefix: Name prefix of the mounted tools and prompts
+            module: Importable module name (not imported until needed)
+            server: Name of the module's FastMCP instance
+            on_load: Module function called on the event loop after import
+            on_close: Module function called at shutdown if the module was loaded
+            separator: Joins the prefix and the tool name
+        """
+        lazy = self.registry.module(module, on_load=on_load, on_close=on_close)
+        self._mounts.append(_Mount(prefix + separator, lazy, server))
+
+    def _pending(self) -> List[_Mount]:
+        return [mount for mount in self._mounts if not mount.merged]
+
+    async def list_tools(self) -> List[MCPTool]:
+        # Merged mounts' tools are in the tool manager already
+        tools = await super().list_tools()
+        return tools + [tool for mount in self._pending() for tool in mount.tools]
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Sequence[ContentBlock] | Dict[str, Any]:
+        if self._tool_manager.get_tool(name) is None:
+            for mount in self._pending():
+                if mount.owns_tool(name):
+                    await mount.merge(self)
+        return await super().call_tool(name, arguments)
+
+    async def list_resources(self) -> List[MCPResource]:
+        resources = await super().list_resources()
+        return resources + [resource for mount in self._pending() for resource in mount.resources]
+
+    async def list_resource_templates(self) -> List[MCPResourceTemplate]:
+        templates = await super().list_resource_templates()
+        return templates + [template for mount in self._pending() for template in mount.templates]
+
+    async def read_resource(self, uri: Any) -> Any:
+        if not self._has_resource(str(uri)):
+            for mount in self._pending():
+                if mount.owns_resource(str(uri)):
+                    await mount.merge(self)
+                    break
+        return await super().read_resource(uri)
+
+    def _has_resource(self, uri: str) -> bool:
+        """Whether a resource or template matches `uri`, without creating it"""
+        manager = self._resource_manager
+        return uri in manager._resources or any(template.matches(uri) for template in manager._templates.values())
+
+    async def list_prompts(self) -> List[MCPPrompt]:
+        prompts = await super().list_prompts()
+        return prompts + [prompt for mount in self._pending() for prompt in mount.prompts]
+
+    async def get_prompt(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> GetPromptResult:
+        if self._prompt_manager.get_prompt(name) is None:
+            for mount in self._pending():
+                if mount.owns_prompt(name):
+                    await mount.merge(self)
+        return await super().get_prompt(name, arguments)
+
+
+if __name__ == "__main__":
+    module_name, server_name, output_path = (sys.argv[1], "mcp", sys.argv[2]) if len(sys.argv) == 3 else sys.argv[1:4]
+    with open(output_path, "w") as output:
+        json.dump(describe_server(getattr(importlib.import_module(module_name), server_name)), output)
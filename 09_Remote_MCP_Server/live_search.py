@@ -3,14 +3,25 @@ Professional Tavily Live Search MCP Server Tool using FastMCP SDK
 Provides real-time web search capabilities through Tavily API.
 """
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
-from typing import Dict, Any, List, Optional
+import socket
+import threading
+import weakref
+import atexit
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
 from datetime import datetime
 import asyncio
 import aiohttp
+from search_cache import SearchCache
+from search_limits import UpstreamLimiter, RateLimitTimeout
+from search_retry import RetryPolicy, HedgePolicy
 
 # Initialize FastMCP server
 mcp = FastMCP("Tavily Search Server")
@@ -19,25 +30,324 @@ class TavilySearchError(Exception):
     """Custom exception for Tavily search errors"""
     pass
 
+class TavilyRateLimitError(TavilySearchError):
+    """Raised when a search cannot be admitted by the upstream limiter in time"""
+    pass
+
+class TavilyTransientError(TavilySearchError):
+    """Raised for failures worth retrying: timeouts, connection errors, 429 and 5xx"""
+    pass
+
+def _is_transient_status(status: Optional[int]) -> bool:
+    return status is not None and (status == 429 or status >= 500)
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that enables TCP keep-alive on pooled sockets"""
+
+    def __init__(self, keepalive_interval: int, **kwargs):
+        self.keepalive_interval = keepalive_interval
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        socket_options = [
+            (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        # Not every platform exposes the keep-alive tuning knobs
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keepalive_interval))
+        if hasattr(socket, "TCP_KEEPINTVL"):
+            socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, self.keepalive_interval))
+        kwargs["socket_options"] = socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+class SearchTransport:
+    """
+    Long-lived, pooled HTTP transport shared by Tavily clients.
+
+    The sync path uses one requests.Session with a tuned adapter, the async
+    path one aiohttp.ClientSession per event loop. Both keep connections
+    alive so repeated searches skip the TCP+TLS handshake.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 20,
+        keepalive_timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0
+    ):
+        """
+        Initialize the transport
+
+        Args:
+            pool_size: Maximum number of pooled connections per session
+            keepalive_timeout: Seconds an idle connection is kept open
+            connect_timeout: Seconds allowed to establish a connection
+            read_timeout: Seconds allowed to wait for the response
+        """
+        if pool_size < 1:
+            raise TavilySearchError("pool_size must be at least 1")
+
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._async_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @classmethod
+    def from_env(cls) -> "SearchTransport":
+        """Build a transport from TAVILY_POOL_SIZE, TAVILY_KEEPALIVE_TIMEOUT,
+        TAVILY_CONNECT_TIMEOUT and TAVILY_READ_TIMEOUT"""
+        return cls(
+            pool_size=int(os.getenv("TAVILY_POOL_SIZE", "20")),
+            keepalive_timeout=float(os.getenv("TAVILY_KEEPALIVE_TIMEOUT", "30")),
+            connect_timeout=float(os.getenv("TAVILY_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("TAVILY_READ_TIMEOUT", "30")),
+        )
+
+    @property
+    def timeout(self) -> tuple:
+        """(connect, read) timeout tuple for requests"""
+        return (self.connect_timeout, self.read_timeout)
+
+    @property
+    def session(self) -> requests.Session:
+        """Pooled requests.Session for the sync path, created on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    adapter = _KeepAliveAdapter(
+                        keepalive_interval=max(1, int(self.keepalive_timeout)),
+                        pool_connections=4,
+                        pool_maxsize=self.pool_size,
+                        max_retries=0
+                    )
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def get_async_session(self) -> aiohttp.ClientSession:
+        """Pooled aiohttp.ClientSession bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.connect_timeout + self.read_timeout,
+                    connect=self.connect_timeout,
+                    sock_read=self.read_timeout
+                )
+            )
+            self._async_sessions[loop] = session
+        return session
+
+    def close(self):
+        """Close the sync session and drop its pooled connections"""
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    async def aclose(self):
+        """Close the async session of the running loop and the sync session"""
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+        self.close()
+
+# Shared transport used by every client unless one is passed explicitly
+default_transport = SearchTransport.from_env()
+atexit.register(default_transport.close)
+
+# Shared result cache (set TAVILY_CACHE_ENABLED=0 to disable)
+default_cache = SearchCache.from_env() if os.getenv("TAVILY_CACHE_ENABLED", "1") != "0" else None
+
+# Marker left in place of duplicate results until the enclosing list is decoded
+_DUPLICATE = object()
+
+class ResultProjection:
+    """
+    Trims Tavily results while the response JSON is decoded.
+    
+    Result objects are projected as json.loads builds them (via object_hook),
+    so unwanted fields, over-long content and duplicate URLs never reach the
+    assembled response, the cache or the MCP reply.
+    """
+    
+    RESULT_FIELDS = ("title", "url", "content", "raw_content", "score", "published_date")
+    
+    def __init__(
+        self,
+        fields: Optional[List[str]] = None,
+        max_content_chars: Optional[int] = None,
+        dedupe_urls: bool = False
+    ):
+        """
+        Initialize the projection
+        
+        Args:
+            fields: Result fields to keep ("url" is always kept); None keeps all
+            max_content_chars: Cap for "content" and "raw_content" strings
+            dedupe_urls: Drop results whose URL was already seen in the response
+        """
+        if fields is not None:
+            unknown = sorted(set(fields) - set(self.RESULT_FIELDS))
+            if unknown:
+                raise TavilySearchError(
+                    f"Unknown result fields {unknown}; choose from {list(self.RESULT_FIELDS)}"
+                )
+            fields = ["url"] + [name for name in self.RESULT_FIELDS if name in fields and name != "url"]
+        if max_content_chars is not None and max_content_chars < 1:
+            raise TavilySearchError("max_content_chars must be at least 1")
+        
+        self.fields = fields
+        self.max_content_chars = max_content_chars
+        self.dedupe_urls = dedupe_urls
+    
+    @classmethod
+    def build(
+        cls,
+        fields: Optional[List[str]] = None,
+        max_content_chars: Optional[int] = None,
+        dedupe_urls: bool = False
+    ) -> Optional["ResultProjection"]:
+        """Return a projection, or None when nothing would be trimmed"""
+        if fields is None and max_content_chars is None and not dedupe_urls:
+            return None
+        return cls(fields, max_content_chars, dedupe_urls)
+    
+    def cache_key(self) -> Dict[str, Any]:
+        """Projection settings, part of the cache key of projected responses"""
+        return {
+            "fields": self.fields,
+            "max_content_chars": self.max_content_chars,
+            "dedupe_urls": self.dedupe_urls
+        }
+    
+    def loads(self, text) -> Dict[str, Any]:
+        """json.loads replacement that projects result objects as they are decoded"""
+        seen_urls = set()
+        
+        def hook(obj: Dict[str, Any]):
+            if "url" in obj and ("content" in obj or "title" in obj):
+                if self.dedupe_urls:
+                    url = str(obj["url"]).rstrip("/")
+                    if url in seen_urls:
+                        return _DUPLICATE
+                    seen_urls.add(url)
+                if self.fields is not None:
+                    obj = {name: obj[name] for name in self.fields if name in obj}
+                if self.max_content_chars is not None:
+                    for name in ("content", "raw_content"):
+                        value = obj.get(name)
+                        if isinstance(value, str) and len(value) > self.max_content_chars:
+                            obj[name] = value[:self.max_content_chars]
+                return obj
+            results = obj.get("results")
+            if self.dedupe_urls and isinstance(results, list):
+                obj["results"] = [result for result in results if result is not _DUPLICATE]
+            return obj
+        
+        return json.loads(text, object_hook=hook)
+
 class TavilySearch:
     """Professional Tavily search client with comprehensive search capabilities"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        transport: Optional[SearchTransport] = None,
+        base_url: Optional[str] = None,
+        cache: Optional[SearchCache] = None,
+        use_cache: bool = True,
+        limiter: Optional[UpstreamLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None
+    ):
         """
         Initialize Tavily search client
         
         Args:
             api_key: Tavily API key (if not provided, will look for TAVILY_API_KEY env var)
+            transport: Pooled HTTP transport (defaults to the shared module transport)
+            base_url: API base URL (defaults to TAVILY_BASE_URL or https://api.tavily.com)
+            cache: Result cache (defaults to the shared module cache)
+            use_cache: Set to False to always call the API
+            limiter: Upstream rate/concurrency limiter for this key (defaults to one built from env)
+            retry_policy: Backoff and budget for transient failures (defaults to one built from env)
+            hedge_policy: Latency-percentile hedging (defaults to one built from env, off unless configured)
         """
         self.api_key = api_key or os.getenv('TAVILY_API_KEY')
         if not self.api_key:
             raise TavilySearchError("Tavily API key not provided. Set TAVILY_API_KEY environment variable.")
         
-        self.base_url = "https://api.tavily.com"
+        self.transport = transport or default_transport
+        self.base_url = base_url or os.getenv("TAVILY_BASE_URL", "https://api.tavily.com")
+        self.cache = (cache or default_cache) if use_cache else None
+        self.limiter = limiter or UpstreamLimiter.from_env()
+        self.retry_policy = retry_policy or RetryPolicy.from_env()
+        self.hedge_policy = hedge_policy or HedgePolicy.from_env()
+        self.usage = {
+            "requests": 0,
+            "upstream_calls": 0,
+            "errors": 0,
+            "last_used": None
+        }
         self.headers = {
             "Content-Type": "application/json"
         }
     
+    def _build_payload(
+        self,
+        query: str,
+        search_depth: str,
+        topic: str,
+        days: Optional[int],
+        max_results: int,
+        include_images: bool,
+        include_answer: bool,
+        include_raw_content: bool,
+        include_domains: Optional[List[str]],
+        exclude_domains: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        """Build the /search request body shared by the sync and async paths"""
+        payload = {
+            "api_key": self.api_key,
+            "query": query,
+            "search_depth": search_depth,
+            "topic": topic,
+            "max_results": max_results,
+            "include_images": include_images,
+            "include_answer": include_answer,
+            "include_raw_content": include_raw_content
+        }
+        
+        # Add optional parameters
+        if days is not None:
+            payload["days"] = days
+        if include_domains:
+            payload["include_domains"] = include_domains
+        if exclude_domains:
+            payload["exclude_domains"] = exclude_domains
+        
+        return payload
+    
     def search(
         self,
         query: str,
@@ -49,7 +359,8 @@ class TavilySearch:
         include_answer: bool = True,
         include_raw_content: bool = False,
         include_domains: Optional[List[str]] = None,
-        exclude_domains: Optional[List[str]] = None
+        exclude_domains: Optional[List[str]] = None,
+        projection: Optional[ResultProjection] = None
     ) -> Dict[str, Any]:
         """
         Perform a search using Tavily API
@@ -65,98 +376,410 @@ class TavilySearch:
             include_raw_content: Whether to include raw content
             include_domains: List of domains to include
             exclude_domains: List of domains to exclude
+            projection: Result trimming applied while the response is parsed
         
         Returns:
-            Dictionary containing search results
+            Dictionary containing search results (shared with the cache, do not mutate)
         """
-        endpoint = f"{self.base_url}/search"
+        payload = self._build_payload(
+            query, search_depth, topic, days, max_results, include_images,
+            include_answer, include_raw_content, include_domains, exclude_domains
+        )
         
-        payload = {
-            "api_key": self.api_key,
-            "query": query,
-            "search_depth": search_depth,
-            "topic": topic,
-            "max_results": max_results,
-            "include_images": include_images,
-            "include_answer": include_answer,
-            "include_raw_content": include_raw_content
-        }
+        self._record_request()
+        if self.cache is None:
+            return self._fetch(payload, projection)
+        return self.cache.get_or_fetch_sync(
+            self._cache_payload(payload, projection),
+            lambda: self._fetch(payload, projection)
+        )
+    
+    async def async_search(
+        self,
+        query: str,
+        search_depth: str = "basic",
+        topic: str = "general",
+        days: Optional[int] = None,
+        max_results: int = 5,
+        include_images: bool = False,
+        include_answer: bool = True,
+        include_raw_content: bool = False,
+        include_domains: Optional[List[str]] = None,
+        exclude_domains: Optional[List[str]] = None,
+        projection: Optional[ResultProjection] = None
+    ) -> Dict[str, Any]:
+        """
+        Asynchronous version of search method. Identical in-flight queries
+        share one upstream call.
+        """
+        payload = self._build_payload(
+            query, search_depth, topic, days, max_results, include_images,
+            include_answer, include_raw_content, include_domains, exclude_domains
+        )
         
-        # Add optional parameters
-        if days is not None:
-            payload["days"] = days
-        if include_domains:
-            payload["include_domains"] = include_domains
-        if exclude_domains:
-            payload["exclude_domains"] = exclude_domains
+        self._record_request()
+        if self.cache is None:
+            return await self._afetch(payload, projection)
+        return await self.cache.get_or_fetch(
+            self._cache_payload(payload, projection),
+            lambda: self._afetch(payload, projection)
+        )
+    
+    @staticmethod
+    def _cache_payload(
+        payload: Dict[str, Any],
+        projection: Optional[ResultProjection]
+    ) -> Dict[str, Any]:
+        """Payload used for the cache key: projected responses are cached separately"""
+        if projection is None:
+            return payload
+        return {**payload, "projection": projection.cache_key()}
+    
+    def _record_request(self):
+        self.usage["requests"] += 1
+        self.usage["last_used"] = datetime.now().isoformat()
+    
+    def _fetch(
+        self,
+        payload: Dict[str, Any],
+        projection: Optional[ResultProjection] = None
+    ) -> Dict[str, Any]:
+        """Sync upstream call with retries for transient failures"""
+        return self.retry_policy.run_sync(
+            lambda: self._post(payload, projection),
+            is_retryable=lambda e: isinstance(e, TavilyTransientError)
+        )
+    
+    async def _afetch(
+        self,
+        payload: Dict[str, Any],
+        projection: Optional[ResultProjection] = None
+    ) -> Dict[str, Any]:
+        """Async upstream call with hedging, retried within the call budget"""
+        return await self.retry_policy.run(
+            lambda: self.hedge_policy.run(lambda: self._apost(payload, projection)),
+            is_retryable=lambda e: isinstance(e, TavilyTransientError),
+            on_timeout=lambda budget: TavilySearchError(f"Search exceeded its {budget:g}s budget")
+        )
+    
+    def _post(
+        self,
+        payload: Dict[str, Any],
+        projection: Optional[ResultProjection] = None
+    ) -> Dict[str, Any]:
+        """Send a /search request on the pooled sync session"""
+        endpoint = f"{self.base_url}/search"
+        
+        try:
+            self.limiter.acquire_sync()
+        except RateLimitTimeout as e:
+            raise TavilyRateLimitError(str(e))
         
+        self.usage["upstream_calls"] += 1
+        status = None
+        started = time.monotonic()
         try:
-            response = requests.post(
+            response = self.transport.session.post(
                 endpoint,
                 json=payload,
                 headers=self.headers,
-                timeout=30
+                timeout=self.transport.timeout
             )
+            status = response.status_code
             response.raise_for_status()
+            if projection is not None:
+                return projection.loads(response.content)
             return response.json()
             
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            self.usage["errors"] += 1
+            raise TavilyTransientError(f"Search request failed: {str(e)}")
         except requests.exceptions.RequestException as e:
+            self.usage["errors"] += 1
+            if _is_transient_status(status):
+                raise TavilyTransientError(f"Search request failed: {str(e)}")
             raise TavilySearchError(f"Search request failed: {str(e)}")
         except json.JSONDecodeError as e:
+            self.usage["errors"] += 1
             raise TavilySearchError(f"Invalid JSON response: {str(e)}")
+        finally:
+            self.limiter.release(status, time.monotonic() - started)
     
-    async def async_search(
+    async def _apost(
         self,
-        query: str,
-        search_depth: str = "basic",
-        topic: str = "general",
-        days: Optional[int] = None,
-        max_results: int = 5,
-        include_images: bool = False,
-        include_answer: bool = True,
-        include_raw_content: bool = False,
-        include_domains: Optional[List[str]] = None,
-        exclude_domains: Optional[List[str]] = None
+        payload: Dict[str, Any],
+        projection: Optional[ResultProjection] = None
     ) -> Dict[str, Any]:
-        """
-        Asynchronous version of search method
-        """
+        """Send a /search request on the pooled async session"""
         endpoint = f"{self.base_url}/search"
         
-        payload = {
-            "api_key": self.api_key,
-            "query": query,
-            "search_depth": search_depth,
-            "topic": topic,
-            "max_results": max_results,
-            "include_images": include_images,
-            "include_answer": include_answer,
-            "include_raw_content": include_raw_content
-        }
-        
-        # Add optional parameters
-        if days is not None:
-            payload["days"] = days
-        if include_domains:
-            payload["include_domains"] = include_domains
-        if exclude_domains:
-            payload["exclude_domains"] = exclude_domains
+        try:
+            await self.limiter.acquire()
+        except RateLimitTimeout as e:
+            raise TavilyRateLimitError(str(e))
         
+        self.usage["upstream_calls"] += 1
+        status = None
+        cancelled = False
+        started = time.monotonic()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    endpoint,
-                    json=payload,
-                    headers=self.headers,
-                    timeout=30
-                ) as response:
-                    response.raise_for_status()
-                    return await response.json()
+            session = self.transport.get_async_session()
+            async with session.post(
+                endpoint,
+                json=payload,
+                headers=self.headers
+            ) as response:
+                status = response.status
+                response.raise_for_status()
+                if projection is not None:
+                    return await response.json(loads=projection.loads)
+                return await response.json()
                     
-        except aiohttp.ClientError as e:
+        except asyncio.TimeoutError:
+            self.usage["errors"] += 1
+            raise TavilyTransientError("Async search request timed out")
+        except aiohttp.ClientResponseError as e:
+            self.usage["errors"] += 1
+            if _is_transient_status(e.status):
+                raise TavilyTransientError(f"Async search request failed: {str(e)}")
             raise TavilySearchError(f"Async search request failed: {str(e)}")
+        except aiohttp.ClientError as e:
+            self.usage["errors"] += 1
+            raise TavilyTransientError(f"Async search request failed: {str(e)}")
         except json.JSONDecodeError as e:
+            self.usage["errors"] += 1
             raise TavilySearchError(f"Invalid JSON response: {str(e)}")
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # A losing hedge or an expired deadline says nothing about upstream health
+            if cancelled:
+                self.limiter.release_cancelled()
+            else:
+                self.limiter.release(status, time.monotonic() - started)
+
+def start_shared_resources():
+    """Start the cache expiry task on the running loop"""
+    if default_cache is not None:
+        default_cache.start_expiry_task()
+
+async def close_shared_resources():
+    """Stop the cache expiry task and close the cache backend and pooled transport"""
+    if default_cache is not None:
+        await default_cache.stop_expiry_task()
+        default_cache.close()
+    await default_transport.aclose()
+
+def attach_transport_lifespan(app):
+    """
+    Tie the shared search resources to a Starlette app (e.g. the one returned
+    by mcp.streamable_http_app()): the cache expiry task runs while the app
+    is up, and the pooled transport and cache backend are closed when it
+    shuts down.
+    """
+    inner_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(starlette_app):
+        async with inner_lifespan(starlette_app):
+            start_shared_resources()
+            try:
+                yield
+            finally:
+                await close_shared_resources()
+
+    app.router.lifespan_context = lifespan
+    return app
+
+# multi_search fan-out budget: at most MULTI_SEARCH_CONCURRENCY upstream calls
+# in flight, and at most MULTI_SEARCH_MAX_WAVES rounds of them per tool call
+MULTI_SEARCH_CONCURRENCY = int(os.getenv("MULTI_SEARCH_CONCURRENCY", "5"))
+MULTI_SEARCH_MAX_WAVES = int(os.getenv("MULTI_SEARCH_MAX_WAVES", "2"))
+MULTI_SEARCH_MAX_QUERIES = MULTI_SEARCH_CONCURRENCY * MULTI_SEARCH_MAX_WAVES
+MULTI_SEARCH_QUERY_TIMEOUT = float(os.getenv("MULTI_SEARCH_QUERY_TIMEOUT", "15"))
+MULTI_SEARCH_TOTAL_TIMEOUT = float(os.getenv("MULTI_SEARCH_TOTAL_TIMEOUT", "30"))
+
+async def fan_out_search(
+    client: "TavilySearch",
+    queries: List[str],
+    max_results: int = 3,
+    concurrency: Optional[int] = None,
+    query_timeout: Optional[float] = None,
+    total_timeout: Optional[float] = None,
+    on_result: Optional[Callable[[int, Dict[str, Any]], Awaitable[None]]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run several searches concurrently with bounded parallelism.
+    
+    Each query gets its own deadline and the whole fan-out an overall one.
+    A query that fails or runs out of time gets an error entry; the others
+    keep running.
+    
+    Args:
+        client: Tavily client used for every query
+        queries: Search queries
+        max_results: Maximum results per query
+        concurrency: Upstream calls in flight at once (default MULTI_SEARCH_CONCURRENCY)
+        query_timeout: Seconds allowed per query (default MULTI_SEARCH_QUERY_TIMEOUT)
+        total_timeout: Seconds allowed for the whole fan-out (default MULTI_SEARCH_TOTAL_TIMEOUT)
+        on_result: Awaited with (index, entry) as soon as each query finishes
+    
+    Returns:
+        Dictionary mapping "query_N" (1-based, in input order) to its result entry
+    """
+    concurrency = concurrency or MULTI_SEARCH_CONCURRENCY
+    query_timeout = query_timeout or MULTI_SEARCH_QUERY_TIMEOUT
+    total_timeout = total_timeout or MULTI_SEARCH_TOTAL_TIMEOUT
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def search_one(query: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                results = await asyncio.wait_for(
+                    client.async_search(
+                        query=query,
+                        max_results=max_results,
+                        search_depth="basic",
+                        include_answer=True
+                    ),
+                    timeout=query_timeout
+                )
+            except asyncio.TimeoutError:
+                return {
+                    "query": query,
+                    "error": f"Query timed out after {query_timeout:g}s",
+                    "success": False
+                }
+            except Exception as e:
+                return {
+                    "query": query,
+                    "error": str(e),
+                    "success": False
+                }
+        
+        return {
+            "query": query,
+            "results": results.get("results", []),
+            "answer": results.get("answer", ""),
+            "success": True
+        }
+    
+    async def run_one(index: int, query: str) -> Dict[str, Any]:
+        entry = await search_one(query)
+        if on_result is not None:
+            try:
+                await on_result(index, entry)
+            except Exception as e:
+                # A lost notification must not turn into a failed query
+                print(f"Warning: multi-search result callback failed: {e}")
+        return entry
+    
+    tasks = [asyncio.ensure_future(run_one(i, query)) for i, query in enumerate(queries)]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=total_timeout)
+        for task in pending:
+            task.cancel()
+    
+    all_results = {}
+    for i, (query, task) in enumerate(zip(queries, tasks)):
+        if task.cancelled() or not task.done():
+            all_results[f"query_{i+1}"] = {
+                "query": query,
+                "error": f"Multi-search deadline of {total_timeout:g}s exceeded",
+                "success": False
+            }
+        else:
+            all_results[f"query_{i+1}"] = task.result()
+    
+    return all_results
+
+class TavilyClientRegistry:
+    """
+    Bounded registry of per-API-key Tavily clients.
+    
+    Callers that bring their own key get the same client back on every call,
+    so they share the pooled transport and keep per-key usage counters.
+    Clients idle for longer than idle_timeout, and the least recently used
+    ones beyond max_clients, are dropped.
+    """
+    
+    def __init__(
+        self,
+        max_clients: int = 256,
+        idle_timeout: float = 900.0,
+        transport: Optional[SearchTransport] = None
+    ):
+        """
+        Initialize the registry
+        
+        Args:
+            max_clients: Maximum number of clients kept at once
+            idle_timeout: Seconds after which an unused client is dropped
+            transport: Transport shared by every client (defaults to the module transport)
+        """
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.transport = transport or default_transport
+        self._clients: "OrderedDict[str, Tuple[TavilySearch, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+    
+    @classmethod
+    def from_env(cls) -> "TavilyClientRegistry":
+        """Build a registry from TAVILY_MAX_CLIENTS and TAVILY_CLIENT_IDLE_TIMEOUT"""
+        return cls(
+            max_clients=int(os.getenv("TAVILY_MAX_CLIENTS", "256")),
+            idle_timeout=float(os.getenv("TAVILY_CLIENT_IDLE_TIMEOUT", "900")),
+        )
+    
+    def get(self, api_key: str) -> TavilySearch:
+        """Return the client for api_key, creating it on first use"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(api_key)
+            if entry is None:
+                client = TavilySearch(api_key=api_key, transport=self.transport)
+            else:
+                client = entry[0]
+            self._clients[api_key] = (client, now)
+            self._clients.move_to_end(api_key)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+            return client
+    
+    def _evict_idle(self, now: float):
+        # Entries are ordered by last use, so idle ones are at the front
+        while self._clients:
+            key, (_, last_used) = next(iter(self._clients.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._clients[key]
+            self.evictions += 1
+    
+    def usage(self) -> Dict[str, Any]:
+        """Per-key usage counters, with the keys masked"""
+        with self._lock:
+            clients = {
+                f"{key[:4]}...{key[-4:]}" if len(key) > 8 else "****": {
+                    **client.usage,
+                    "retries": client.retry_policy.retries,
+                    "limits": client.limiter.stats(),
+                    "hedging": client.hedge_policy.stats()
+                }
+                for key, (client, _) in self._clients.items()
+            }
+            return {
+                "clients": len(self._clients),
+                "max_clients": self.max_clients,
+                "evictions": self.evictions,
+                "usage": clients
+            }
+
+# Registry of clients for callers that pass their own api_key
+client_registry = TavilyClientRegistry.from_env()
 
 # Initialize Tavily client
 try:
@@ -165,14 +788,39 @@ except TavilySearchError as e:
     print(f"Warning: Tavily client initialization failed: {e}")
     tavily_client = None
 
+# MCP Resource: Cache statistics
+@mcp.resource("stats://search-cache", mime_type="application/json")
+def search_cache_stats() -> Dict[str, Any]:
+    """Hit, miss and eviction counters of the shared search cache"""
+    if default_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **default_cache.stats()}
+
+# MCP Resource: Per-key client usage
+@mcp.resource("stats://search-clients", mime_type="application/json")
+def search_client_stats() -> Dict[str, Any]:
+    """Usage counters, queue depth and wait times of the default and per-key clients"""
+    return {
+        "default": {
+            **tavily_client.usage,
+            "retries": tavily_client.retry_policy.retries,
+            "limits": tavily_client.limiter.stats(),
+            "hedging": tavily_client.hedge_policy.stats()
+        } if tavily_client else None,
+        **client_registry.usage()
+    }
+
 # MCP Tool: Basic Web Search
 @mcp.tool()
-def web_search(
+async def web_search(
     query: str,
     api_key: Optional[str] = None,
     max_results: int = 5,
     search_depth: str = "basic",
-    include_answer: bool = True
+    include_answer: bool = True,
+    fields: Optional[List[str]] = None,
+    max_content_chars: Optional[int] = None,
+    dedupe_urls: bool = False
 ) -> Dict[str, Any]:
     """
     Search the web for information using Tavily API.
@@ -183,6 +831,9 @@ def web_search(
         max_results: Maximum number of results to return (1-20)
         search_depth: "basic" for faster results, "advanced" for more comprehensive
         include_answer: Whether to include AI-generated answer summary
+        fields: Result fields to return (title, url, content, raw_content, score, published_date); default all
+        max_content_chars: Truncate each result's content to this many characters
+        dedupe_urls: Drop results that repeat an earlier result's URL
     
     Returns:
         Dictionary containing search results with URLs, titles, content, and optional answer
@@ -190,8 +841,8 @@ def web_search(
     try:
         # Use user's API key or fallback to server default
         if api_key:
-            # Create temporary client with user's API key
-            user_client = TavilySearch(api_key=api_key)
+            # Reuse the pooled client registered for the user's API key
+            user_client = client_registry.get(api_key)
         elif tavily_client:
             # Use server's default client
             user_client = tavily_client
@@ -209,12 +860,15 @@ def web_search(
         if search_depth not in ["basic", "advanced"]:
             raise TavilySearchError("search_depth must be 'basic' or 'advanced'")
         
-        results = user_client.search(
+        projection = ResultProjection.build(fields, max_content_chars, dedupe_urls)
+        
+        results = await user_client.async_search(
             query=query,
             max_results=max_results,
             search_depth=search_depth,
             include_answer=include_answer,
-            topic="general"
+            topic="general",
+            projection=projection
         )
         
         return {
@@ -241,7 +895,7 @@ def web_search(
 
 # MCP Tool: News Search
 @mcp.tool()
-def news_search(
+async def news_search(
     query: str,
     api_key: Optional[str] = None,
     days: int = 7,
@@ -264,7 +918,7 @@ def news_search(
     try:
         # Use user's API key or fallback to server default
         if api_key:
-            user_client = TavilySearch(api_key=api_key)
+            user_client = client_registry.get(api_key)
         elif tavily_client:
             user_client = tavily_client
         else:
@@ -281,7 +935,7 @@ def news_search(
         if max_results < 1 or max_results > 20:
             raise TavilySearchError("max_results must be between 1 and 20")
         
-        results = user_client.search(
+        results = await user_client.async_search(
             query=query,
             max_results=max_results,
             search_depth="basic",
@@ -314,14 +968,17 @@ def news_search(
 
 # MCP Tool: Advanced Search with Domain Filtering
 @mcp.tool()
-def advanced_search(
+async def advanced_search(
     query: str,
     max_results: int = 10,
     search_depth: str = "advanced",
     include_images: bool = False,
     include_raw_content: bool = False,
     include_domains: Optional[List[str]] = None,
-    exclude_domains: Optional[List[str]] = None
+    exclude_domains: Optional[List[str]] = None,
+    fields: Optional[List[str]] = None,
+    max_content_chars: Optional[int] = None,
+    dedupe_urls: bool = False
 ) -> Dict[str, Any]:
     """
     Perform advanced web search with domain filtering and additional options.
@@ -334,6 +991,9 @@ def advanced_search(
         include_raw_content: Whether to include raw HTML content
         include_domains: List of domains to include in search
         exclude_domains: List of domains to exclude from search
+        fields: Result fields to return (title, url, content, raw_content, score, published_date); default all
+        max_content_chars: Truncate each result's content and raw content to this many characters
+        dedupe_urls: Drop results that repeat an earlier result's URL
     
     Returns:
         Dictionary containing comprehensive search results
@@ -353,7 +1013,9 @@ def advanced_search(
         if search_depth not in ["basic", "advanced"]:
             raise TavilySearchError("search_depth must be 'basic' or 'advanced'")
         
-        results = tavily_client.search(
+        projection = ResultProjection.build(fields, max_content_chars, dedupe_urls)
+        
+        results = await tavily_client.async_search(
             query=query,
             max_results=max_results,
             search_depth=search_depth,
@@ -361,7 +1023,8 @@ def advanced_search(
             include_raw_content=include_raw_content,
             include_domains=include_domains,
             exclude_domains=exclude_domains,
-            include_answer=True
+            include_answer=True,
+            projection=projection
         )
         
         return {
@@ -393,17 +1056,58 @@ def advanced_search(
 
 # MCP Tool: Multi-query Search
 @mcp.tool()
-def multi_search(queries: List[str], max_results_per_query: int = 3) -> Dict[str, Any]:
+async def multi_search(
+    queries: List[str],
+    max_results_per_query: int = 3,
+    ctx: Context = None
+) -> Dict[str, Any]:
     """
     Perform multiple searches simultaneously.
     
+    Queries run concurrently (MULTI_SEARCH_CONCURRENCY at a time), so the
+    latency is close to that of the slowest query rather than their sum.
+    A progress notification is sent as each query completes.
+    
     Args:
-        queries: List of search queries
+        queries: List of search queries (at most MULTI_SEARCH_MAX_QUERIES)
         max_results_per_query: Maximum results per individual query
     
     Returns:
         Dictionary containing results for all queries
     """
+    return await _run_multi_search(queries, max_results_per_query, ctx, stream_results=False)
+
+# MCP Tool: Streaming Multi-query Search
+@mcp.tool()
+async def multi_search_stream(
+    queries: List[str],
+    max_results_per_query: int = 3,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Perform multiple searches and stream each query's result as it completes.
+    
+    Every finished query is sent immediately as an info log notification
+    whose message is the JSON result entry (logger "multi_search"), along
+    with a progress notification. The aggregate of all queries is still
+    returned at the end.
+    
+    Args:
+        queries: List of search queries (at most MULTI_SEARCH_MAX_QUERIES)
+        max_results_per_query: Maximum results per individual query
+    
+    Returns:
+        Dictionary containing results for all queries
+    """
+    return await _run_multi_search(queries, max_results_per_query, ctx, stream_results=True)
+
+async def _run_multi_search(
+    queries: List[str],
+    max_results_per_query: int,
+    ctx: Optional[Context],
+    stream_results: bool
+) -> Dict[str, Any]:
+    """Shared body of multi_search and multi_search_stream"""
     if not tavily_client:
         return {
             "queries": queries,
@@ -412,33 +1116,36 @@ def multi_search(queries: List[str], max_results_per_query: int = 3) -> Dict[str
         }
     
     try:
-        if len(queries) > 10:
-            raise TavilySearchError("Maximum 10 queries allowed per multi-search")
-        
-        all_results = {}
+        if len(queries) > MULTI_SEARCH_MAX_QUERIES:
+            raise TavilySearchError(
+                f"Maximum {MULTI_SEARCH_MAX_QUERIES} queries allowed per multi-search"
+            )
         
-        for i, query in enumerate(queries):
-            try:
-                results = tavily_client.search(
-                    query=query,
-                    max_results=max_results_per_query,
-                    search_depth="basic",
-                    include_answer=True
+        on_result = None
+        if ctx is not None:
+            completed = 0
+            
+            async def on_result(index: int, entry: Dict[str, Any]):
+                nonlocal completed
+                completed += 1
+                status = "done" if entry["success"] else f"failed: {entry['error']}"
+                await ctx.report_progress(
+                    progress=completed,
+                    total=len(queries),
+                    message=f"query_{index+1} ({entry['query']}) {status}"
                 )
-                
-                all_results[f"query_{i+1}"] = {
-                    "query": query,
-                    "results": results.get("results", []),
-                    "answer": results.get("answer", ""),
-                    "success": True
-                }
-                
-            except Exception as e:
-                all_results[f"query_{i+1}"] = {
-                    "query": query,
-                    "error": str(e),
-                    "success": False
-                }
+                if stream_results:
+                    await ctx.info(
+                        json.dumps({"key": f"query_{index+1}", **entry}),
+                        logger_name="multi_search"
+                    )
+        
+        all_results = await fan_out_search(
+            tavily_client,
+            queries,
+            max_results=max_results_per_query,
+            on_result=on_result
+        )
         
         return {
             "queries": queries,
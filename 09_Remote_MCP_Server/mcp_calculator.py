@@ -3,15 +3,60 @@ Professional Calculator MCP Server Tool using FastMCP SDK
 Provides basic arithmetic operations and advanced mathematical functions.
 """
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
+import ast
+import asyncio
+import atexit
+import decimal
 import math
 import operator
-from typing import Union, Dict, Any
-import re
+import os
+from decimal import Decimal
+from fractions import Fraction
+from typing import Union, Dict, Any, List, Optional, Tuple
+from expression_compiler import CompiledExpression, ExpressionCompiler, ExpressionError
+from expression_sandbox import EvaluationPool, EvaluationTimeout, WorkerCrashed
+from calculator_stats import (
+    RunningStats,
+    decode_operands,
+    describe,
+    numpy_calculate,
+    use_numpy,
+    mode as stats_mode,
+    quantile as stats_quantile,
+    quantiles as stats_quantiles,
+)
+from calculator_sessions import LOCAL_SESSION, AccumulatorStore
+from calculator_bases import DECIMAL_STR_BITS, format_int, parse_int
+from calculator_precision import (
+    DECIMAL_CONSTANTS,
+    DECIMAL_FUNCTIONS,
+    FRACTION_CONSTANTS,
+    FRACTION_FUNCTIONS,
+    format_exact,
+)
+
+# NumPy is optional; batch evaluation falls back to a compiled Python loop
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
 
 # Initialize FastMCP server
 mcp = FastMCP("Calculator Server")
 
+# Longest operand list echoed back in advanced_calculate responses
+OPERAND_ECHO_LIMIT = 1000
+
+# Largest number of values accepted by convert_base_batch
+BASE_BATCH_MAX_NUMBERS = int(os.getenv("CALC_BASE_BATCH_MAX_NUMBERS", "100000"))
+
+# Streaming statistics accumulators, owned by the MCP session that created them
+accumulators = AccumulatorStore(
+    max_per_session=int(os.getenv("CALC_MAX_ACCUMULATORS", "32")),
+    idle_timeout=float(os.getenv("CALC_ACCUMULATOR_IDLE_TIMEOUT", "3600"))
+)
+
 class CalculatorError(Exception):
     """Custom exception for calculator errors"""
     pass
@@ -68,51 +113,198 @@ class Calculator:
         'nan': math.nan,
     }
     
+    # Largest integer result, in decimal digits (Python's int-to-str limit)
+    MAX_DIGITS = int(os.getenv("CALC_MAX_DIGITS", "4300"))
+    
+    # Compiled-expression engine with a bounded LRU of compiled forms
+    COMPILER = ExpressionCompiler(
+        FUNCTIONS,
+        CONSTANTS,
+        cache_size=int(os.getenv("CALC_EXPRESSION_CACHE_SIZE", "1024")),
+        max_digits=MAX_DIGITS
+    )
+    
+    # Evaluation modes: binary floats, decimal at a chosen precision, exact fractions
+    MODES = ("float", "decimal", "fraction")
+    DECIMAL_PRECISION = int(os.getenv("CALC_DECIMAL_PRECISION", "28"))
+    MAX_PRECISION = int(os.getenv("CALC_MAX_PRECISION", "1000"))
+    
+    # Extra digits carried through a decimal evaluation before the final rounding
+    GUARD_DIGITS = 5
+    
+    # Same pipeline, other number types: literals become Decimal/Fraction and
+    # pi/e/tau are computed (once per precision) at evaluation time
+    EXACT_MODES = {
+        "decimal": {
+            "functions": DECIMAL_FUNCTIONS,
+            "constants": DECIMAL_CONSTANTS,
+            "number": Decimal,
+        },
+        "fraction": {
+            "functions": FRACTION_FUNCTIONS,
+            "constants": FRACTION_CONSTANTS,
+            "max_digits": MAX_DIGITS,
+            "number": Fraction,
+            "exact": True,
+        },
+    }
+    DECIMAL_COMPILER = ExpressionCompiler(
+        cache_size=int(os.getenv("CALC_EXPRESSION_CACHE_SIZE", "1024")),
+        **EXACT_MODES["decimal"]
+    )
+    FRACTION_COMPILER = ExpressionCompiler(
+        cache_size=int(os.getenv("CALC_EXPRESSION_CACHE_SIZE", "1024")),
+        **EXACT_MODES["fraction"]
+    )
+    
+    # Evaluations whose estimated cost is above INLINE_COST (or that are only
+    # bounded at runtime) run in worker processes that are killed on timeout
+    INLINE_COST = float(os.getenv("CALC_INLINE_COST", "20000"))
+    SANDBOX = EvaluationPool(
+        FUNCTIONS,
+        CONSTANTS,
+        max_digits=MAX_DIGITS,
+        workers=int(os.getenv("CALC_SANDBOX_WORKERS", "2")),
+        timeout=float(os.getenv("CALC_EVAL_TIMEOUT", "2")),
+        memory_limit_mb=int(os.getenv("CALC_WORKER_MEMORY_MB", "0")),
+        modes=EXACT_MODES
+    )
+    
+    # Largest number of points accepted by a single batch evaluation
+    BATCH_MAX_POINTS = int(os.getenv("CALC_BATCH_MAX_POINTS", "100000"))
+    
+    # Array versions of FUNCTIONS; expressions using anything else
+    # (factorial, gcd, lcm) are evaluated by the Python loop instead
+    VECTOR_COMPILER = None
+    if np is not None:
+        VECTOR_COMPILER = ExpressionCompiler(
+            {
+                'abs': np.abs,
+                'round': np.round,
+                'floor': np.floor,
+                'ceil': np.ceil,
+                'sqrt': np.sqrt,
+                'pow': np.power,
+                'log': lambda x, base=None: np.log(x) if base is None else np.log(x) / np.log(base),
+                'log10': np.log10,
+                'log2': np.log2,
+                'exp': np.exp,
+                'sin': np.sin,
+                'cos': np.cos,
+                'tan': np.tan,
+                'asin': np.arcsin,
+                'acos': np.arccos,
+                'atan': np.arctan,
+                'sinh': np.sinh,
+                'cosh': np.cosh,
+                'tanh': np.tanh,
+                'degrees': np.degrees,
+                'radians': np.radians,
+            },
+            CONSTANTS,
+            cache_size=int(os.getenv("CALC_EXPRESSION_CACHE_SIZE", "1024")),
+            max_digits=MAX_DIGITS
+        )
+    
+    @staticmethod
+    def compiler_for(mode: str) -> ExpressionCompiler:
+        """The expression compiler of an evaluation mode"""
+        if mode == "float":
+            return Calculator.COMPILER
+        if mode == "decimal":
+            return Calculator.DECIMAL_COMPILER
+        if mode == "fraction":
+            return Calculator.FRACTION_COMPILER
+        raise CalculatorError(f"Unknown mode: {mode} (expected one of {', '.join(Calculator.MODES)})")
+    
+    @staticmethod
+    def compile_expression(expression: str, allow_variables: bool = False, mode: str = "float") -> CompiledExpression:
+        """
+        Compile an expression, rejecting it if it is invalid or provably too expensive
+        
+        Raises:
+            CalculatorError: If expression is invalid, unsafe or too large
+        """
+        compiler = Calculator.compiler_for(mode)
+        try:
+            return compiler.compile(expression, allow_variables=allow_variables)
+        except ExpressionError as e:
+            raise CalculatorError(f"Invalid expression: {str(e)}")
+    
+    @staticmethod
+    def needs_sandbox(compiled: CompiledExpression, points: int = 1, mode: str = "float") -> bool:
+        """Whether an evaluation must run in the worker pool rather than inline"""
+        if mode == "decimal":
+            # The estimator does not model decimal work, which grows with the
+            # precision: only plain arithmetic (no functions, no computed
+            # constants) is bounded enough to run inline
+            return any(isinstance(node, ast.Call) for node in ast.walk(compiled.tree))
+        return compiled.guarded or compiled.cost * points > Calculator.INLINE_COST
+    
+    @staticmethod
+    def _run_sandboxed(
+        expression: str,
+        columns: Optional[List[list]] = None,
+        size: int = 0,
+        mode: str = "float",
+        precision: Optional[int] = None
+    ):
+        """Evaluate in the worker pool, turning budget failures into CalculatorError"""
+        try:
+            return Calculator.SANDBOX.evaluate(expression, columns, size, mode=mode, precision=precision)
+        except EvaluationTimeout as e:
+            raise CalculatorError(f"Evaluation aborted: {str(e)}")
+        except WorkerCrashed:
+            raise CalculatorError("Evaluation aborted: resource limit exceeded")
+    
+    @staticmethod
+    async def evaluate_expression_async(
+        expression: str,
+        mode: str = "float",
+        precision: Optional[int] = None
+    ) -> Union[float, int, str]:
+        """evaluate_expression that keeps sandboxed and high-precision evaluations off the event loop"""
+        if mode != "float" or Calculator.needs_sandbox(Calculator.compile_expression(expression)):
+            return await asyncio.to_thread(Calculator.evaluate_expression, expression, mode, precision)
+        return Calculator.evaluate_expression(expression)
+    
     @staticmethod
-    def evaluate_expression(expression: str) -> Union[float, int]:
+    def evaluate_expression(
+        expression: str,
+        mode: str = "float",
+        precision: Optional[int] = None
+    ) -> Union[float, int, str]:
         """
         Safely evaluate a mathematical expression
         
         Args:
             expression (str): Mathematical expression to evaluate
+            mode (str): "float", "decimal" or "fraction" (see evaluate_exact)
+            precision (Optional[int]): Significant digits in decimal mode
             
         Returns:
-            Union[float, int]: Result of the calculation
+            Union[float, int, str]: Result of the calculation (text in the
+            decimal and fraction modes)
             
         Raises:
             CalculatorError: If expression is invalid or unsafe
         """
-        # Remove whitespace
-        expression = expression.replace(' ', '')
-        
-        # Security: Check for dangerous patterns
-        dangerous_patterns = [
-            '__', 'import', 'exec', 'eval', 'open', 'file',
-            'input', 'raw_input', 'compile', 'reload'
-        ]
-        
-        for pattern in dangerous_patterns:
-            if pattern in expression.lower():
-                raise CalculatorError(f"Unsafe expression: contains '{pattern}'")
-        
-        # Replace constants
-        for const_name, const_value in Calculator.CONSTANTS.items():
-            expression = expression.replace(const_name, str(const_value))
+        if mode != "float":
+            return Calculator.evaluate_exact(expression, mode, precision)
         
-        # Replace ^ with ** for power operations
-        expression = expression.replace('^', '**')
+        # Parse, validate and compile once; repeated expressions hit the LRU
+        compiled = Calculator.compile_expression(expression)
         
         try:
-            # Use eval with restricted globals for safety
-            allowed_names = {
-                "__builtins__": {},
-                **Calculator.FUNCTIONS,
-                **Calculator.CONSTANTS
-            }
-            
-            result = eval(expression, allowed_names)
+            if Calculator.needs_sandbox(compiled):
+                result = Calculator._run_sandboxed(expression)
+            else:
+                result = compiled()
+                Calculator.COMPILER.check_result(result)
             
-            # Handle special cases
+            # Handle special cases (large ints would overflow float checks)
+            if isinstance(result, int):
+                return result
             if math.isnan(result):
                 return "NaN"
             elif math.isinf(result):
@@ -124,16 +316,189 @@ class Calculator:
             
             return result
             
+        except CalculatorError:
+            raise
         except ZeroDivisionError:
             raise CalculatorError("Division by zero")
+        except OverflowError as e:
+            raise CalculatorError(f"Result too large: {str(e)}")
         except ValueError as e:
             raise CalculatorError(f"Invalid mathematical operation: {str(e)}")
         except Exception as e:
             raise CalculatorError(f"Invalid expression: {str(e)}")
+    
+    @staticmethod
+    def evaluate_exact(expression: str, mode: str, precision: Optional[int] = None) -> str:
+        """
+        Evaluate in decimal or exact rational arithmetic
+        
+        Literals are read from their text ("0.1" is exactly one tenth). In
+        "decimal" mode every operation is rounded to `precision` significant
+        digits (plus guard digits, removed by a final rounding); "fraction"
+        mode is exact and refuses irrational results (sqrt(2), pi, 2**0.5).
+        Evaluations the cost estimator cannot bound run in the sandbox, with
+        the same time budget as float ones.
+        
+        Args:
+            expression (str): Mathematical expression to evaluate
+            mode (str): "decimal" or "fraction"
+            precision (Optional[int]): Significant digits in decimal mode
+                (defaults to DECIMAL_PRECISION)
+            
+        Returns:
+            str: The result as text (e.g. "0.3", "1/3"), so no digits are lost
+            
+        Raises:
+            CalculatorError: If the expression is invalid or has no result in this mode
+        """
+        compiled = Calculator.compile_expression(expression, mode=mode)
+        if precision is None:
+            precision = Calculator.DECIMAL_PRECISION
+        if not 1 <= precision <= Calculator.MAX_PRECISION:
+            raise CalculatorError(f"Precision must be between 1 and {Calculator.MAX_PRECISION}")
+        
+        try:
+            if mode == "decimal":
+                with decimal.localcontext() as ctx:
+                    ctx.prec = precision + Calculator.GUARD_DIGITS
+                    if Calculator.needs_sandbox(compiled, mode=mode):
+                        result = Calculator._run_sandboxed(expression, mode=mode, precision=ctx.prec)
+                    else:
+                        result = compiled()
+                    result = Decimal(result)
+                    ctx.prec = precision
+                    result = +result
+            else:
+                if Calculator.needs_sandbox(compiled, mode=mode):
+                    result = Calculator._run_sandboxed(expression, mode=mode)
+                else:
+                    result = compiled()
+                if not isinstance(result, (int, Fraction)):
+                    raise CalculatorError("Result is not a rational number; use mode 'decimal'")
+                Calculator.FRACTION_COMPILER.check_result(result)
+            return format_exact(result)
+            
+        except CalculatorError:
+            raise
+        except ZeroDivisionError:
+            raise CalculatorError("Division by zero")
+        except OverflowError as e:
+            raise CalculatorError(f"Result too large: {str(e)}")
+        except decimal.Overflow:
+            raise CalculatorError("Result too large: exponent out of range")
+        except decimal.InvalidOperation:
+            raise CalculatorError("Invalid mathematical operation")
+        except ValueError as e:
+            raise CalculatorError(f"Invalid mathematical operation: {str(e)}")
+        except Exception as e:
+            raise CalculatorError(f"Invalid expression: {str(e)}")
+    
+    @staticmethod
+    def _batch_columns(variables: Dict[str, list], names: Tuple[str, ...]) -> Tuple[List[list], int]:
+        """Pick the arrays for `names` in order and check they have one common length"""
+        if not variables:
+            raise CalculatorError("No variable arrays provided")
+        missing = [name for name in names if name not in variables]
+        if missing:
+            raise CalculatorError(f"Missing values for variables: {', '.join(missing)}")
+        
+        lengths = {len(values) for values in variables.values()}
+        if len(lengths) != 1:
+            raise CalculatorError("All variable arrays must have the same length")
+        size = lengths.pop()
+        if size > Calculator.BATCH_MAX_POINTS:
+            raise CalculatorError(f"Too many points: {size} (max {Calculator.BATCH_MAX_POINTS})")
+        return [variables[name] for name in names], size
+    
+    @staticmethod
+    def evaluate_batch(expression: str, variables: Dict[str, list]) -> Tuple[List[Optional[float]], str]:
+        """
+        Evaluate an expression with free variables over equal-length arrays
+        
+        The expression is compiled once. With NumPy available and only
+        array-capable functions used, it is evaluated as one vectorized call;
+        otherwise a compiled function is mapped over the zipped arrays.
+        
+        Args:
+            expression (str): Expression using free variables, e.g. "x**2 + sin(x)"
+            variables (Dict[str, list]): Variable name -> array of numbers
+            
+        Returns:
+            Tuple[List[Optional[float]], str]: Results (None where undefined,
+            e.g. log(0) or 1/0) and the engine used ("numpy" or "python")
+            
+        Raises:
+            CalculatorError: If the expression or the arrays are invalid
+        """
+        compiled = Calculator.compile_expression(expression, allow_variables=True)
+        columns, size = Calculator._batch_columns(variables, compiled.variables)
+        
+        try:
+            # Integers stay integers so factorial/gcd/lcm work on the Python path
+            # (calculate_batch declares Union[int, float] so validation keeps them too)
+            columns = [[value if type(value) is int else float(value) for value in column] for column in columns]
+        except (TypeError, ValueError):
+            raise CalculatorError("Variable arrays must contain only numbers")
+        
+        vectorized = None
+        if Calculator.VECTOR_COMPILER is not None:
+            try:
+                vectorized = Calculator.VECTOR_COMPILER.compile(expression, allow_variables=True)
+            except ExpressionError:
+                vectorized = None  # uses a function NumPy has no array form for
+        
+        if vectorized is not None:
+            with np.errstate(all='ignore'):
+                values = vectorized(*(np.asarray(column, dtype=np.float64) for column in columns))
+                values = np.broadcast_to(np.asarray(values, dtype=np.float64), (size,))
+            values = np.where(np.isfinite(values), values, np.nan).tolist()
+            return [None if value != value else value for value in values], "numpy"
+        
+        try:
+            if Calculator.needs_sandbox(compiled, size):
+                values = Calculator._run_sandboxed(expression, columns, size)
+            else:
+                values = compiled.map(columns, size)
+        except CalculatorError:
+            raise
+        except Exception as e:
+            raise CalculatorError(f"Invalid expression: {str(e)}")
+        return [
+            value if type(value) is int or (isinstance(value, float) and math.isfinite(value)) else None
+            for value in values
+        ], "python"
+
+atexit.register(Calculator.SANDBOX.close)
+
+# MCP Resource: Expression engine statistics
+@mcp.resource("stats://calculator", mime_type="application/json")
+def calculator_stats() -> Dict[str, Any]:
+    """Compiled-expression cache counters, optimizer savings and evaluation sandbox usage"""
+    cache = Calculator.COMPILER.cache_info()
+    compilers = [Calculator.COMPILER, Calculator.DECIMAL_COMPILER, Calculator.FRACTION_COMPILER]
+    if Calculator.VECTOR_COMPILER is not None:
+        compilers.append(Calculator.VECTOR_COMPILER)
+    return {
+        "expression_cache": {
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "size": cache.currsize,
+            "max_size": cache.maxsize,
+        },
+        # Summed over all compilers; nodes_saved counts operations removed per evaluation
+        "optimizer": {
+            key: sum(compiler.optimizer_stats[key] for compiler in compilers)
+            for key in Calculator.COMPILER.optimizer_stats
+        },
+        "max_digits": Calculator.MAX_DIGITS,
+        "inline_cost": Calculator.INLINE_COST,
+        "sandbox": Calculator.SANDBOX.stats(),
+        "accumulators": accumulators.stats(),
+    }
 
 # MCP Tool: Basic Calculator
 @mcp.tool()
-def calculate(expression: str) -> Dict[str, Any]:
+async def calculate(expression: str, mode: str = "float", precision: Optional[int] = None) -> Dict[str, Any]:
     """
     Evaluate a mathematical expression and return the result.
     
@@ -143,17 +508,66 @@ def calculate(expression: str) -> Dict[str, Any]:
     - Constants: pi, e, tau
     - Parentheses for grouping
     
+    Modes:
+    - "float": fast binary floating point (default)
+    - "decimal": decimal arithmetic to `precision` significant digits, so
+      "0.1 + 0.2" is exactly 0.3; the result is returned as a string
+    - "fraction": exact rational arithmetic ("1/3 + 1/6" -> "1/2"); functions
+      and constants without rational values (sin, log, pi, ...) are refused
+    
     Args:
         expression: Mathematical expression to evaluate (e.g., "2 + 3 * 4", "sin(pi/2)", "sqrt(16)")
+        mode: "float", "decimal" or "fraction"
+        precision: Significant digits in decimal mode (default 28)
     
     Returns:
         Dictionary containing the result and expression
     """
     try:
-        result = Calculator.evaluate_expression(expression)
-        return {
+        result = await Calculator.evaluate_expression_async(expression, mode, precision)
+        response = {
             "expression": expression,
             "result": result,
+            "mode": mode,
+            "success": True
+        }
+        if mode == "decimal":
+            response["precision"] = precision or Calculator.DECIMAL_PRECISION
+        return response
+    except CalculatorError as e:
+        return {
+            "expression": expression,
+            "error": str(e),
+            "success": False
+        }
+
+# MCP Tool: Batch Evaluation over Arrays
+@mcp.tool()
+async def calculate_batch(expression: str, variables: Dict[str, List[Union[int, float]]]) -> Dict[str, Any]:
+    """
+    Evaluate an expression with variables over arrays of values in one call.
+    
+    The expression is compiled once and evaluated for every index i with each
+    variable bound to variables[name][i] (vectorized with NumPy when available).
+    
+    Args:
+        expression: Expression using free variables (e.g., "x**2 + sin(x)", "a*x + b")
+        variables: Mapping of variable name to an array of numbers; all arrays
+            must have the same length (e.g., {"x": [0, 0.5, 1.0]})
+    
+    Returns:
+        Dictionary containing the array of results (null where the expression
+        is undefined, e.g. division by zero) and the variables used
+    """
+    try:
+        # Off the event loop: large batches take a while even when vectorized
+        results, engine = await asyncio.to_thread(Calculator.evaluate_batch, expression, variables)
+        return {
+            "expression": expression,
+            "variables": list(Calculator.COMPILER.compile(expression, allow_variables=True).variables),
+            "count": len(results),
+            "results": results,
+            "engine": engine,
             "success": True
         }
     except CalculatorError as e:
@@ -167,75 +581,204 @@ def calculate(expression: str) -> Dict[str, Any]:
 @mcp.tool()
 def advanced_calculate(
     operation: str,
-    operands: list,
-    **kwargs
+    operands: Union[list, str],
+    quantiles: Optional[List[float]] = None
 ) -> Dict[str, Any]:
     """
     Perform advanced mathematical operations.
     
     Args:
-        operation: Type of operation (sum, product, mean, median, mode, std_dev, variance)
-        operands: List of numbers to operate on
-        **kwargs: Additional parameters for specific operations
+        operation: Type of operation (sum, product, mean, median, mode, std_dev, variance,
+            min, max, range, quantiles, or stats for all of them at once)
+        operands: List of numbers to operate on, or for large inputs the numbers
+            packed as base64-encoded little-endian float64 values
+        quantiles: Quantiles between 0 and 1 for the quantiles and stats operations
     
     Returns:
         Dictionary containing the operation result
     """
+    # Echo small JSON operand lists back; packed or large inputs only report a count
+    echo = operands if isinstance(operands, list) and len(operands) <= OPERAND_ECHO_LIMIT else None
     try:
-        if not operands:
+        nums = decode_operands(operands)
+        if not nums:
             raise CalculatorError("No operands provided")
         
-        # Convert to numbers
-        nums = [float(x) for x in operands]
-        
-        if operation == "sum":
+        # Large inputs go to NumPy when available; small ones stay in Python
+        backend = "python"
+        if use_numpy(operation, len(nums)):
+            backend = "numpy"
+            result = numpy_calculate(operation, nums, quantiles)
+        elif operation == "sum":
             result = sum(nums)
         elif operation == "product":
-            result = 1
-            for num in nums:
-                result *= num
+            result = math.prod(nums)
         elif operation == "mean" or operation == "average":
             result = sum(nums) / len(nums)
         elif operation == "median":
-            sorted_nums = sorted(nums)
-            n = len(sorted_nums)
-            if n % 2 == 0:
-                result = (sorted_nums[n//2 - 1] + sorted_nums[n//2]) / 2
-            else:
-                result = sorted_nums[n//2]
+            result = stats_quantile(nums, 0.5)
         elif operation == "mode":
-            from collections import Counter
-            counts = Counter(nums)
-            max_count = max(counts.values())
-            modes = [k for k, v in counts.items() if v == max_count]
-            result = modes[0] if len(modes) == 1 else modes
+            result = stats_mode(nums)
         elif operation == "std_dev" or operation == "standard_deviation":
-            mean = sum(nums) / len(nums)
-            variance = sum((x - mean) ** 2 for x in nums) / len(nums)
-            result = math.sqrt(variance)
+            result = RunningStats(nums).std_dev
         elif operation == "variance":
-            mean = sum(nums) / len(nums)
-            result = sum((x - mean) ** 2 for x in nums) / len(nums)
+            result = RunningStats(nums).variance
         elif operation == "min":
             result = min(nums)
         elif operation == "max":
             result = max(nums)
         elif operation == "range":
             result = max(nums) - min(nums)
+        elif operation == "quantiles":
+            if not quantiles:
+                raise CalculatorError("No quantiles provided")
+            result = dict(zip((str(q) for q in quantiles), stats_quantiles(nums, quantiles)))
+        elif operation == "stats":
+            result = describe(nums, quantiles)
         else:
             raise CalculatorError(f"Unknown operation: {operation}")
         
+        response = {"operation": operation, "count": len(nums)}
+        if echo is not None:
+            response["operands"] = echo
+        response.update({"result": result, "backend": backend, "success": True})
+        return response
+        
+    except Exception as e:
+        response = {"operation": operation}
+        if echo is not None:
+            response["operands"] = echo
+        response.update({"error": str(e), "success": False})
+        return response
+
+# Accumulators are keyed by MCP session; direct calls share a local one
+def _session_of(ctx: Optional[Context]) -> Any:
+    if ctx is None:
+        return LOCAL_SESSION
+    try:
+        return ctx.session
+    except ValueError:
+        return LOCAL_SESSION
+
+# MCP Tool: Create a Statistics Accumulator
+@mcp.tool()
+def stats_session_create(
+    name: str,
+    window_type: str = "none",
+    window_size: Optional[int] = None,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Create a named statistics accumulator for this session (replacing one with the same name).
+    
+    Push values to it as they arrive with stats_session_push and read statistics
+    with stats_session_query, instead of resending all values to advanced_calculate.
+    
+    Args:
+        name: Accumulator name, unique within the session
+        window_type: "none", "tumbling" (stats per block of window_size values)
+            or "sliding" (stats of the last window_size values)
+        window_size: Number of values per window
+    
+    Returns:
+        Dictionary describing the new accumulator
+    """
+    try:
+        accumulators.create(_session_of(ctx), name, window_type=window_type, window_size=window_size)
         return {
-            "operation": operation,
-            "operands": operands,
-            "result": result,
+            "name": name,
+            "window_type": window_type,
+            "window_size": window_size,
+            "success": True
+        }
+    except Exception as e:
+        return {
+            "name": name,
+            "error": str(e),
+            "success": False
+        }
+
+# MCP Tool: Push Values to an Accumulator
+@mcp.tool()
+def stats_session_push(name: str, values: Union[list, str], ctx: Context = None) -> Dict[str, Any]:
+    """
+    Add values to a statistics accumulator.
+    
+    Args:
+        name: Accumulator name
+        values: New values as a list of numbers, or packed as base64-encoded
+            little-endian float64 values
+    
+    Returns:
+        Dictionary with the number of values added and the running count
+    """
+    try:
+        accumulator = accumulators.get(_session_of(ctx), name)
+        nums = decode_operands(values)
+        accumulator.push(nums)
+        return {
+            "name": name,
+            "added": len(nums),
+            "count": accumulator.total.count,
+            "success": True
+        }
+    except Exception as e:
+        return {
+            "name": name,
+            "error": str(e),
+            "success": False
+        }
+
+# MCP Tool: Query an Accumulator
+@mcp.tool()
+def stats_session_query(name: str, quantiles: Optional[List[float]] = None, ctx: Context = None) -> Dict[str, Any]:
+    """
+    Read the statistics of an accumulator.
+    
+    Args:
+        name: Accumulator name
+        quantiles: Quantiles between 0 and 1 to report (default 0.5, 0.9, 0.99);
+            over all values they are approximate (t-digest), within a sliding window exact
+    
+    Returns:
+        Dictionary with statistics over all values and over the current window
+    """
+    try:
+        accumulator = accumulators.get(_session_of(ctx), name)
+        return {
+            "name": name,
+            "result": accumulator.stats(quantiles),
+            "success": True
+        }
+    except Exception as e:
+        return {
+            "name": name,
+            "error": str(e),
+            "success": False
+        }
+
+# MCP Tool: Close an Accumulator
+@mcp.tool()
+def stats_session_close(name: str, ctx: Context = None) -> Dict[str, Any]:
+    """
+    Remove an accumulator and return its final statistics.
+    
+    Args:
+        name: Accumulator name
+    
+    Returns:
+        Dictionary with the final statistics
+    """
+    try:
+        accumulator = accumulators.close(_session_of(ctx), name)
+        return {
+            "name": name,
+            "result": accumulator.stats(),
             "success": True
         }
-        
     except Exception as e:
         return {
-            "operation": operation,
-            "operands": operands,
+            "name": name,
             "error": str(e),
             "success": False
         }
@@ -259,30 +802,18 @@ def convert_base(number: str, from_base: int, to_base: int) -> Dict[str, Any]:
             raise CalculatorError("Base must be between 2 and 36")
         
         # Convert to decimal first
-        decimal_value = int(number, from_base)
+        decimal_value = parse_int(number, from_base)
         
         # Convert to target base
-        if to_base == 10:
-            result = str(decimal_value)
-        else:
-            digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-            if decimal_value == 0:
-                result = "0"
-            else:
-                result = ""
-                value = abs(decimal_value)
-                while value > 0:
-                    result = digits[value % to_base] + result
-                    value //= to_base
-                if decimal_value < 0:
-                    result = "-" + result
+        result = format_int(decimal_value, to_base)
         
         return {
             "original_number": number,
             "from_base": from_base,
             "to_base": to_base,
             "result": result,
-            "decimal_value": decimal_value,
+            # Past str()'s digit limit the decimal value is only serializable as text
+            "decimal_value": decimal_value if decimal_value.bit_length() <= DECIMAL_STR_BITS else format_int(decimal_value, 10),
             "success": True
         }
         
@@ -295,3 +826,54 @@ def convert_base(number: str, from_base: int, to_base: int) -> Dict[str, Any]:
             "success": False
         }
 
+# MCP Tool: Bulk Number Base Conversion
+@mcp.tool()
+def convert_base_batch(numbers: Union[List[str], str], from_base: int, to_base: int) -> Dict[str, Any]:
+    """
+    Convert many numbers from one base to another in a single call.
+    
+    Args:
+        numbers: Numbers as strings in the source base, either as a list or as
+            one newline-delimited string (e.g. "ff\n10\n7f")
+        from_base: Source base (2-36)
+        to_base: Target base (2-36)
+    
+    Returns:
+        Dictionary containing the converted numbers in the same shape as the
+        input (list, or newline-delimited string), with null/empty entries and
+        an "errors" list for numbers that could not be converted
+    """
+    try:
+        if from_base < 2 or from_base > 36 or to_base < 2 or to_base > 36:
+            raise CalculatorError("Base must be between 2 and 36")
+        
+        delimited = isinstance(numbers, str)
+        values = numbers.splitlines() if delimited else numbers
+        if len(values) > BASE_BATCH_MAX_NUMBERS:
+            raise CalculatorError(f"Too many numbers: {len(values)} (max {BASE_BATCH_MAX_NUMBERS})")
+        
+        results = []
+        errors = []
+        for index, number in enumerate(values):
+            try:
+                results.append(format_int(parse_int(number, from_base), to_base))
+            except (TypeError, ValueError) as e:
+                results.append("" if delimited else None)
+                errors.append({"index": index, "number": number, "error": str(e)})
+        
+        return {
+            "from_base": from_base,
+            "to_base": to_base,
+            "count": len(values),
+            "results": "\n".join(results) if delimited else results,
+            "errors": errors,
+            "success": True
+        }
+        
+    except Exception as e:
+        return {
+            "from_base": from_base,
+            "to_base": to_base,
+            "error": str(e),
+            "success": False
+        }
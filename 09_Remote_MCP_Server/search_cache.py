@@ -0,0 +1,630 @@
+"""
+Result cache for Tavily searches.
+Provides a TTL + LRU cache with single-flight coalescing of identical
+in-flight queries, used by TavilySearch in live_search.py. Storage is
+pluggable: in-process memory (default), SQLite in WAL mode, or a
+memory-mapped file. The persistent backends store zlib-compressed JSON,
+so several uvicorn workers on one host share warm results and a restart
+does not start cold.
+"""
+
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: the mmap backend is then only safe within one process
+    fcntl = None
+
+
+class CacheBackend:
+    """
+    Storage interface for SearchCache.
+
+    Expiry times are wall-clock (time.time()) so that entries written by
+    one process are interpreted correctly by another.
+    """
+
+    # Whether get/set may block on file I/O or cross-process locks, so
+    # async callers must run them in a thread
+    blocking = True
+
+    def __init__(self):
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Return the stored response, or None if missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float):
+        """Store a response until expires_at, evicting if the backend is full"""
+        raise NotImplementedError
+
+    def purge_expired(self, now: float) -> int:
+        """Delete expired entries and return how many were removed"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Delete every entry"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def close(self):
+        """Release files and connections"""
+
+    @staticmethod
+    def encode(value: Dict[str, Any], level: int = 6) -> bytes:
+        """Serialize a response to compressed JSON"""
+        return zlib.compress(json.dumps(value, separators=(",", ":")).encode(), level)
+
+    @staticmethod
+    def decode(blob: bytes) -> Dict[str, Any]:
+        """Inverse of encode"""
+        return json.loads(zlib.decompress(blob))
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU dictionary, the fastest backend but never shared"""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 1024):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+            self.expirations += len(expired)
+            return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    SQLite cache table in WAL mode, shared by every process on the host.
+
+    Each thread gets its own connection; WAL lets readers proceed while a
+    writer commits.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, compress_level: int = 6):
+        """
+        Args:
+            path: Database file path
+            max_entries: Maximum rows before least recently used rows are deleted
+            compress_level: zlib compression level for stored responses
+        """
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.compress_level = compress_level
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS search_cache_expires ON search_cache(expires_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS search_cache_accessed ON search_cache(accessed_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at FROM search_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        blob, expires_at = row
+        with conn:
+            if expires_at <= now:
+                conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self.expirations += 1
+                return None
+            conn.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return self.decode(blob)
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float):
+        conn = self._conn()
+        blob = self.encode(value, self.compress_level)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(blob), expires_at, time.time()),
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM search_cache WHERE key IN"
+                    " (SELECT key FROM search_cache ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+
+    def purge_expired(self, now: float) -> int:
+        conn = self._conn()
+        with conn:
+            removed = conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,)).rowcount
+        self.expirations += removed
+        return removed
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM search_cache")
+
+    def __len__(self) -> int:
+        (count,) = self._conn().execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        return count
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+class MmapBackend(CacheBackend):
+    """
+    Fixed-size hash table in a memory-mapped file.
+
+    The file holds `slots` fixed-size slots; a key hashes to a short probe
+    window and, when the window is full, the least recently used slot in it
+    is overwritten. Responses that do not fit in one slot are not cached.
+    Writers take an flock on the file so several processes can share it.
+    """
+
+    MAGIC = b"TVC1"
+    FILE_HEADER = struct.Struct("<4sII")
+    SLOT_HEADER = struct.Struct("<16sddI")
+    PROBES = 8
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = 4096,
+        slot_size: int = 32768,
+        compress_level: int = 6
+    ):
+        """
+        Args:
+            path: Backing file path (created and sized on first use)
+            slots: Number of slots in the table
+            slot_size: Bytes per slot, including the slot header
+            compress_level: zlib compression level for stored responses
+        """
+        super().__init__()
+        self.path = path
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+
+        size = self.FILE_HEADER.size + slots * slot_size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._file_lock():
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            header = os.read(self._fd, self.FILE_HEADER.size)
+            if len(header) == self.FILE_HEADER.size and header[:4] == self.MAGIC:
+                # Reuse an existing table with its own geometry
+                _, slots, slot_size = self.FILE_HEADER.unpack(header)
+                size = self.FILE_HEADER.size + slots * slot_size
+            else:
+                os.ftruncate(self._fd, size)
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                os.write(self._fd, self.FILE_HEADER.pack(self.MAGIC, slots, slot_size))
+        self.slots = slots
+        self.slot_size = slot_size
+        self._map = mmap.mmap(self._fd, size)
+
+    @contextmanager
+    def _file_lock(self):
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, index: int) -> int:
+        return self.FILE_HEADER.size + index * self.slot_size
+
+    def _probe(self, digest: bytes) -> range:
+        start = int.from_bytes(digest[:8], "little") % self.slots
+        return range(start, start + min(self.PROBES, self.slots))
+
+    def _read_header(self, index: int) -> Tuple[bytes, float, float, int]:
+        return self.SLOT_HEADER.unpack_from(self._map, self._offset(index % self.slots))
+
+    def _clear_slot(self, index: int):
+        self.SLOT_HEADER.pack_into(self._map, self._offset(index % self.slots), b"", 0.0, 0.0, 0)
+
+    def get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        with self._file_lock():
+            for index in self._probe(digest):
+                slot_digest, expires_at, _, length = self._read_header(index)
+                if length == 0 or slot_digest != digest:
+                    continue
+                if expires_at <= now:
+                    self._clear_slot(index)
+                    self.expirations += 1
+                    return None
+                offset = self._offset(index % self.slots)
+                self.SLOT_HEADER.pack_into(self._map, offset, digest, expires_at, now, length)
+                start = offset + self.SLOT_HEADER.size
+                blob = self._map[start:start + length]
+                break
+            else:
+                return None
+        return self.decode(blob)
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float):
+        blob = self.encode(value, self.compress_level)
+        if len(blob) > self.slot_size - self.SLOT_HEADER.size:
+            return
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        now = time.time()
+        with self._file_lock():
+            target, evicting, oldest = None, False, None
+            for index in self._probe(digest):
+                slot_digest, slot_expires, accessed_at, length = self._read_header(index)
+                if length and slot_digest == digest:
+                    target, evicting = index, False
+                    break
+                if target is None and (length == 0 or slot_expires <= now):
+                    target = index
+                if oldest is None or accessed_at < oldest[1]:
+                    oldest = (index, accessed_at)
+            if target is None:
+                target, evicting = oldest[0], True
+            offset = self._offset(target % self.slots)
+            self.SLOT_HEADER.pack_into(self._map, offset, digest, expires_at, now, len(blob))
+            start = offset + self.SLOT_HEADER.size
+            self._map[start:start + len(blob)] = blob
+            if evicting:
+                self.evictions += 1
+
+    def purge_expired(self, now: float) -> int:
+        removed = 0
+        with self._file_lock():
+            for index in range(self.slots):
+                _, expires_at, _, length = self._read_header(index)
+                if length and expires_at <= now:
+                    self._clear_slot(index)
+                    removed += 1
+        self.expirations += removed
+        return removed
+
+    def clear(self):
+        with self._file_lock():
+            for index in range(self.slots):
+                self._clear_slot(index)
+
+    def __len__(self) -> int:
+        with self._file_lock():
+            return sum(1 for index in range(self.slots) if self._read_header(index)[3])
+
+    def close(self):
+        if not self._map.closed:
+            self._map.flush()
+            self._map.close()
+            os.close(self._fd)
+
+
+def backend_from_env(max_entries: int) -> CacheBackend:
+    """
+    Build the backend selected by TAVILY_CACHE_BACKEND ("memory", "sqlite"
+    or "mmap"), stored at TAVILY_CACHE_PATH for the persistent ones.
+    """
+    kind = os.getenv("TAVILY_CACHE_BACKEND", "memory").lower()
+    if kind == "memory":
+        return MemoryBackend(max_entries=max_entries)
+    if kind == "sqlite":
+        return SQLiteBackend(os.getenv("TAVILY_CACHE_PATH", "tavily_cache.sqlite3"), max_entries=max_entries)
+    if kind == "mmap":
+        return MmapBackend(os.getenv("TAVILY_CACHE_PATH", "tavily_cache.mmap"), slots=max_entries)
+    raise ValueError(f"Unknown TAVILY_CACHE_BACKEND: {kind}")
+
+
+class SearchCache:
+    """TTL + LRU cache for search responses, scoped per API key"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        general_ttl: float = 600.0,
+        news_ttl: float = 60.0,
+        backend: Optional[CacheBackend] = None
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of cached responses before LRU eviction
+            general_ttl: Seconds a topic="general" response stays fresh
+            news_ttl: Seconds a topic="news" response stays fresh
+            backend: Storage backend (defaults to an in-process MemoryBackend)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self.general_ttl = general_ttl
+        self.news_ttl = news_ttl
+        self.backend = backend if backend is not None else MemoryBackend(max_entries=max_entries)
+
+        self._lock = threading.Lock()
+        self._expiry_task: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._inflight_sync: Dict[str, threading.Event] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls) -> "SearchCache":
+        """Build a cache from TAVILY_CACHE_MAX_ENTRIES, TAVILY_CACHE_TTL,
+        TAVILY_NEWS_CACHE_TTL and the TAVILY_CACHE_BACKEND settings"""
+        max_entries = int(os.getenv("TAVILY_CACHE_MAX_ENTRIES", "1024"))
+        return cls(
+            max_entries=max_entries,
+            general_ttl=float(os.getenv("TAVILY_CACHE_TTL", "600")),
+            news_ttl=float(os.getenv("TAVILY_NEWS_CACHE_TTL", "60")),
+            backend=backend_from_env(max_entries),
+        )
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a /search payload.
+
+        The api_key is removed from the normalized payload but a hash of it
+        scopes the key, so tenants never share entries. The query is
+        case-folded and whitespace-collapsed, domain lists are sorted.
+        """
+        normalized = {}
+        for name, value in payload.items():
+            if name == "api_key":
+                continue
+            if name == "query":
+                value = " ".join(str(value).split()).casefold()
+            elif isinstance(value, list):
+                value = sorted(str(item).strip().lower() for item in value)
+            normalized[name] = value
+
+        scope = hashlib.sha256(str(payload.get("api_key", "")).encode()).hexdigest()[:16]
+        body = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+        return f"{scope}:{hashlib.sha256(body.encode()).hexdigest()}"
+
+    def ttl_for(self, payload: Dict[str, Any]) -> float:
+        """Freshness lifetime for a payload, based on its topic"""
+        return self.news_ttl if payload.get("topic") == "news" else self.general_ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for key, or None if missing or expired"""
+        value = self.backend.get(key, time.time())
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float):
+        """Store a response, evicting least recently used entries if full"""
+        if ttl <= 0:
+            return
+        self.backend.set(key, value, time.time() + ttl)
+
+    async def get_async(self, key: str) -> Optional[Dict[str, Any]]:
+        """get() that keeps blocking backends off the event loop"""
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.get, key)
+        return self.get(key)
+
+    async def set_async(self, key: str, value: Dict[str, Any], ttl: float):
+        """set() that keeps blocking backends off the event loop"""
+        if self.backend.blocking:
+            await asyncio.to_thread(self.set, key, value, ttl)
+        else:
+            self.set(key, value, ttl)
+
+    def clear(self):
+        """Drop every cached response"""
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters describing cache effectiveness (this process only)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "entries": len(self.backend),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.backend.evictions,
+                "expirations": self.backend.expirations,
+                "coalesced": self.coalesced,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    async def run_expiry(self, interval: float = 60.0):
+        """Periodically delete expired entries from the backend"""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.backend.purge_expired, time.time())
+
+    def start_expiry_task(self, interval: Optional[float] = None) -> asyncio.Task:
+        """Start run_expiry on the running loop (TAVILY_CACHE_EXPIRY_INTERVAL seconds)"""
+        if interval is None:
+            interval = float(os.getenv("TAVILY_CACHE_EXPIRY_INTERVAL", "60"))
+        if self._expiry_task is None or self._expiry_task.done():
+            self._expiry_task = asyncio.create_task(self.run_expiry(interval))
+        return self._expiry_task
+
+    async def stop_expiry_task(self):
+        """Cancel the expiry task started by start_expiry_task"""
+        task, self._expiry_task = self._expiry_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def close(self):
+        """Release the backend's files and connections"""
+        self.backend.close()
+
+    async def get_or_fetch(
+        self,
+        payload: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Return a cached response or fetch it once.
+
+        Concurrent callers asking for the same key while a fetch is running
+        await that fetch instead of starting their own.
+        """
+        key = self.make_key(payload)
+        cached = await self.get_async(key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is loop:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Only the leader was cancelled: fetch on our own below
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            # Waiters get the value without waiting for the store; until the
+            # entry is stored, new callers still find this future
+            future.set_result(value)
+            await self.set_async(key, value, self.ttl_for(payload))
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def get_or_fetch_sync(
+        self,
+        payload: Dict[str, Any],
+        fetch: Callable[[], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Blocking counterpart of get_or_fetch for the sync search path"""
+        key = self.make_key(payload)
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+            with self._lock:
+                event = self._inflight_sync.get(key)
+                leader = event is None
+                if leader:
+                    event = self._inflight_sync[key] = threading.Event()
+
+            if leader:
+                break
+            # Another thread is fetching this key: wait, then re-check the cache.
+            # If its fetch failed the entry is still missing and we fetch ourselves.
+            self.coalesced += 1
+            event.wait()
+
+        try:
+            value = fetch()
+            self.set(key, value, self.ttl_for(payload))
+            return value
+        finally:
+            with self._lock:
+                del self._inflight_sync[key]
+            event.set()
@@ -0,0 +1,291 @@
+"""
+Upstream rate control for Tavily searches.
+Provides a token-bucket rate limiter and an adaptive (AIMD) concurrency
+limit that queues callers up to a deadline instead of failing fast. Each
+TavilySearch client owns one UpstreamLimiter, so limits apply per API key.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a caller cannot be admitted before its deadline"""
+    pass
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts of `burst`"""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> float:
+        """
+        Take one token, possibly ahead of time.
+
+        Returns:
+            Seconds the caller must wait before using the token
+
+        Raises:
+            RateLimitTimeout: If the token would not be available within max_wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1.0 - self._tokens) / self.rate)
+            if wait > max_wait:
+                raise RateLimitTimeout(f"Rate limit: next slot in {wait:.2f}s exceeds deadline")
+            # Going negative reserves future tokens for queued callers
+            self._tokens -= 1.0
+            return wait
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit.
+
+    The limit grows by roughly one per round of successful calls under the
+    latency target and halves on a 429/5xx or a slow call. Callers over the
+    limit wait in FIFO order.
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_target: float = 5.0,
+        backoff: float = 0.5
+    ):
+        """
+        Args:
+            initial: Starting concurrency limit
+            min_limit: Lowest the limit can shrink to
+            max_limit: Highest the limit can grow to
+            latency_target: Seconds above which a call counts as congestion
+            backoff: Multiplicative decrease factor
+        """
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.inflight = 0
+        # Sync callers take and return slots from worker threads: counters and
+        # the queue are guarded, and waiters are woken on their own loop
+        self._lock = threading.Lock()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        """Callers currently waiting for a slot"""
+        return len(self._waiters)
+
+    def has_room(self) -> bool:
+        """Whether a caller would be admitted without queueing"""
+        return self.inflight < int(self.limit) and not self._waiters
+
+    async def acquire(self, timeout: float):
+        """Wait for a slot; raise RateLimitTimeout after `timeout` seconds"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.has_room():
+                self.inflight += 1
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+
+        admitted = False
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+            admitted = True
+        except asyncio.TimeoutError:
+            raise RateLimitTimeout(f"Waited {timeout:g}s for an upstream slot")
+        finally:
+            if not admitted:
+                # Timed out or cancelled: leave the queue, handing back a slot
+                # that may have been granted just as we gave up (a grant still
+                # on its way hands it back itself, see _grant)
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                if future.done() and not future.cancelled():
+                    self.release_unused()
+                else:
+                    future.cancel()
+
+    def acquire_nowait(self):
+        """Take a slot without queueing (sync callers cannot await the queue)"""
+        with self._lock:
+            self.inflight += 1
+
+    def release(self, status: Optional[int], latency: float):
+        """
+        Return a slot and adapt the limit to the outcome.
+
+        Args:
+            status: HTTP status of the call, or None if it failed without one
+            latency: Seconds the call took
+        """
+        congested = status is None or status == 429 or status >= 500 or latency > self.latency_target
+        with self._lock:
+            self.inflight -= 1
+            if congested:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+            self._wake()
+
+    def release_unused(self):
+        """Return a slot without adapting the limit (e.g. the call was cancelled)"""
+        with self._lock:
+            self.inflight -= 1
+            self._wake()
+
+    def _wake(self):
+        """Hand free slots to queued callers; called with the lock held"""
+        while self._waiters and self.inflight < int(self.limit):
+            loop, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.inflight += 1
+            try:
+                loop.call_soon_threadsafe(self._grant, future)
+            except RuntimeError:
+                # The waiter's loop is closed: nobody will use the slot
+                self.inflight -= 1
+
+    def _grant(self, future: asyncio.Future):
+        """Admit a woken caller on its loop, or return the slot if it gave up meanwhile"""
+        if future.done():
+            self.release_unused()
+        else:
+            future.set_result(None)
+
+
+class UpstreamLimiter:
+    """Token bucket plus adaptive concurrency limit for one API key"""
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        queue_timeout: float = 10.0,
+        adaptive: Optional[AdaptiveLimiter] = None
+    ):
+        """
+        Args:
+            rate: Sustained requests per second
+            burst: Requests allowed at once after an idle period
+            queue_timeout: Seconds a caller may wait for admission
+            adaptive: Concurrency limiter (defaults to AdaptiveLimiter())
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.adaptive = adaptive or AdaptiveLimiter()
+        self.queue_timeout = queue_timeout
+
+        self.admitted = 0
+        self.rejected = 0
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @classmethod
+    def from_env(cls) -> "UpstreamLimiter":
+        """Build a limiter from TAVILY_RATE_LIMIT, TAVILY_RATE_BURST, TAVILY_QUEUE_TIMEOUT,
+        TAVILY_MAX_CONCURRENCY and TAVILY_LATENCY_TARGET"""
+        max_concurrency = int(os.getenv("TAVILY_MAX_CONCURRENCY", "64"))
+        return cls(
+            rate=float(os.getenv("TAVILY_RATE_LIMIT", "10")),
+            burst=int(os.getenv("TAVILY_RATE_BURST", "20")),
+            queue_timeout=float(os.getenv("TAVILY_QUEUE_TIMEOUT", "10")),
+            adaptive=AdaptiveLimiter(
+                initial=min(8, max_concurrency),
+                max_limit=max_concurrency,
+                latency_target=float(os.getenv("TAVILY_LATENCY_TARGET", "5")),
+            ),
+        )
+
+    def _record_wait(self, waited: float):
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """
+        Wait for both a rate token and a concurrency slot.
+
+        Raises:
+            RateLimitTimeout: If admission would take longer than the deadline
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        started = time.monotonic()
+        try:
+            wait = self.bucket.reserve(timeout)
+            if wait > 0 or not self.adaptive.has_room():
+                self.queued += 1
+                self.max_queue_depth = max(self.max_queue_depth, self.adaptive.queue_depth + 1)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self.adaptive.acquire(max(0.0, timeout - (time.monotonic() - started)))
+        except RateLimitTimeout:
+            self.rejected += 1
+            raise
+        self._record_wait(time.monotonic() - started)
+
+    def acquire_sync(self, timeout: Optional[float] = None):
+        """Blocking counterpart of acquire; only the rate limit makes sync callers wait"""
+        timeout = self.queue_timeout if timeout is None else timeout
+        try:
+            wait = self.bucket.reserve(timeout)
+        except RateLimitTimeout:
+            self.rejected += 1
+            raise
+        if wait > 0:
+            self.queued += 1
+            time.sleep(wait)
+        self.adaptive.acquire_nowait()
+        self._record_wait(wait)
+
+    def release(self, status: Optional[int], latency: float):
+        """Report the outcome of an admitted call"""
+        self.adaptive.release(status, latency)
+
+    def release_cancelled(self):
+        """Return the slot of an admitted call that was cancelled, e.g. a losing hedge"""
+        self.adaptive.release_unused()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times and the current concurrency limit"""
+        return {
+            "rate": self.bucket.rate,
+            "burst": self.bucket.burst,
+            "concurrency_limit": int(self.adaptive.limit),
+            "inflight": self.adaptive.inflight,
+            "queue_depth": self.adaptive.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "avg_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+            "max_wait": self.max_wait,
+        }
@@ -0,0 +1,201 @@
+"""
+Retry and hedging policies for Tavily searches.
+Searches are idempotent, so transient failures are retried with jittered
+exponential backoff inside a per-call time budget, and a slow call can be
+hedged with a second request once it passes a latency percentile.
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class RetryPolicy:
+    """Jittered exponential backoff bounded by attempts and a total time budget"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        budget: float = 25.0
+    ):
+        """
+        Args:
+            max_attempts: Total attempts including the first one
+            base_delay: Backoff cap for the first retry, doubled per retry
+            max_delay: Upper bound for a single backoff
+            budget: Seconds the whole call, retries included, may take
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.retries = 0
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Build a policy from TAVILY_RETRY_ATTEMPTS, TAVILY_RETRY_BASE_DELAY,
+        TAVILY_RETRY_MAX_DELAY and TAVILY_CALL_BUDGET"""
+        return cls(
+            max_attempts=int(os.getenv("TAVILY_RETRY_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("TAVILY_RETRY_BASE_DELAY", "0.25")),
+            max_delay=float(os.getenv("TAVILY_RETRY_MAX_DELAY", "4")),
+            budget=float(os.getenv("TAVILY_CALL_BUDGET", "25")),
+        )
+
+    def backoff(self, retry: int) -> float:
+        """Full-jitter delay before the given retry (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        is_retryable: Callable[[BaseException], bool],
+        on_timeout: Callable[[float], BaseException]
+    ) -> T:
+        """
+        Run `call`, retrying retryable failures while attempts and budget remain.
+
+        Args:
+            call: Coroutine factory for one attempt
+            is_retryable: Whether an exception is worth another attempt
+            on_timeout: Builds the exception raised when the budget runs out
+        """
+        deadline = time.monotonic() + self.budget
+        for attempt in range(self.max_attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise on_timeout(self.budget)
+            try:
+                return await asyncio.wait_for(call(), remaining)
+            except asyncio.TimeoutError:
+                raise on_timeout(self.budget)
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(delay)
+        raise on_timeout(self.budget)  # pragma: no cover - loop always returns or raises
+
+    def run_sync(
+        self,
+        call: Callable[[], T],
+        is_retryable: Callable[[BaseException], bool]
+    ) -> T:
+        """Blocking counterpart of run; each attempt relies on its own socket timeouts"""
+        deadline = time.monotonic() + self.budget
+        for attempt in range(self.max_attempts):
+            try:
+                return call()
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                self.retries += 1
+                time.sleep(delay)
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+
+class HedgePolicy:
+    """
+    Send a second request when the first one is slower than a latency percentile.
+
+    Latencies of completed attempts are kept in a rolling window; hedging
+    starts once `min_samples` are known. The first successful attempt wins
+    and the other one is cancelled.
+    """
+
+    def __init__(
+        self,
+        percentile: Optional[float] = None,
+        min_samples: int = 20,
+        window: int = 200
+    ):
+        """
+        Args:
+            percentile: Latency percentile (e.g. 95) after which to hedge; None disables hedging
+            min_samples: Latencies needed before the percentile is trusted
+            window: Number of recent latencies kept
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        """Build a policy from TAVILY_HEDGE_PERCENTILE (unset or 0 disables hedging)"""
+        percentile = float(os.getenv("TAVILY_HEDGE_PERCENTILE", "0"))
+        return cls(percentile=percentile or None)
+
+    def record(self, latency: float):
+        """Add the latency of a completed attempt"""
+        self._latencies.append(latency)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is off or unprimed"""
+        if self.percentile is None or len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+
+    async def _timed(self, call: Callable[[], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        result = await call()
+        self.record(time.monotonic() - started)
+        return result
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run `call`, hedging it with a second attempt if it is slow"""
+        delay = self.hedge_delay()
+        primary = asyncio.ensure_future(self._timed(call))
+        if delay is None:
+            return await primary
+
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.hedged += 1
+            hedge = asyncio.ensure_future(self._timed(call))
+            pending = {primary, hedge}
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        """Hedging counters and the current hedge delay"""
+        return {
+            "hedge_percentile": self.percentile,
+            "hedge_delay": self.hedge_delay(),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }